@@ -4,7 +4,9 @@ from config import Config
 
 db = SQLAlchemy()
 
-def create_app():
+def create_app(with_worker=False):
+    """Build the app. Only the web server passes with_worker=True; scripts that
+    call this never start the compliance worker thread."""
     app = Flask(__name__)
     app.config.from_object(Config)
     
@@ -18,6 +20,20 @@ def create_app():
     
     with app.app_context():
         db.create_all()
+
+        from app.migrations import ensure_child_property_ids, ensure_summary_columns
+        ensure_child_property_ids()
+        ensure_summary_columns()
+
+        from app.indexes import ensure_indexes
+        ensure_indexes()
+        
+        from app.search import ensure_search_index
+        ensure_search_index()
+    
+    if with_worker and app.config['COMPLIANCE_WORKER_ENABLED']:
+        from app.compliance_worker import start_worker
+        start_worker(app)
     
     return app
 
@@ -0,0 +1,162 @@
+"""
+Set-based compliance scenario engine.
+
+Recomputes Property.compliance_scenario for the whole roll (or just the
+properties touched since the last run) in one SQL pass:
+
+    1: Not registered, did not pay
+    2: Not registered, but paid
+    3: Registered, did not pay
+    4: Registered, paid wrong amount (any payment off its expected_amount
+       by more than AMOUNT_TOLERANCE)
+    None: Registered and paid correctly
+
+These are the same rules as scripts/seed_data.assign_compliance_scenario.
+
+Payments are aggregated per property (has payments, any mismatch) in a GROUP BY,
+left-joined to properties, and only the rows whose derived scenario differs
+from the stored one come back to Python. Those are written with one
+UPDATE ... WHERE id IN (...) per target scenario and chunk. Core UPDATEs skip
+the mapper events, so the compliance summary, data version and map index are
+updated explicitly.
+
+Incremental runs pick up properties updated, and payments created, since the
+start of the last completed run. Edits to or deletes of existing payments
+aren't visible through created_at; run a full pass after those.
+"""
+
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from sqlalchemy import case, func, select, update
+
+from app import db
+from app.http_cache import bump_data_version
+from app.models import ComplianceRun, Property, TDTPayment
+from app.spatial import grid_index
+from app.summary import get_summary, record_scenario_changes
+
+AMOUNT_TOLERANCE = 0.01
+IN_CLAUSE_CHUNK = 900
+
+
+def _chunks(values, size=IN_CLAUSE_CHUNK):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _changed_scenarios_query(property_ids=None):
+    """SELECT id, stored scenario, derived scenario for every property whose scenario is out of date."""
+    payments = select(
+        TDTPayment.property_id.label('property_id'),
+        func.max(case(
+            (TDTPayment.expected_amount.isnot(None)
+             & (func.abs(TDTPayment.amount - TDTPayment.expected_amount) > AMOUNT_TOLERANCE), 1),
+            else_=0
+        )).label('mismatch')
+    ).group_by(TDTPayment.property_id)
+    if property_ids is not None:
+        payments = payments.where(TDTPayment.property_id.in_(property_ids))
+    payments = payments.subquery()
+
+    derived = case(
+        (Property.is_registered.isnot(True), case((payments.c.property_id.is_(None), 1), else_=2)),
+        (payments.c.property_id.is_(None), 3),
+        (payments.c.mismatch == 1, 4),
+        else_=None
+    )
+
+    query = select(Property.id, Property.compliance_scenario, derived) \
+        .select_from(Property) \
+        .outerjoin(payments, payments.c.property_id == Property.id) \
+        .where(Property.compliance_scenario.is_distinct_from(derived))
+    if property_ids is not None:
+        query = query.where(Property.id.in_(property_ids))
+    return query
+
+
+def _changed_since_last_run():
+    last = db.session.execute(
+        select(ComplianceRun.started_at)
+        .where(ComplianceRun.finished_at.isnot(None))
+        .order_by(ComplianceRun.started_at.desc())
+        .limit(1)
+    ).scalar()
+    if last is None:
+        return None
+
+    ids = set(db.session.scalars(select(Property.id).where(Property.updated_at >= last)))
+    ids.update(db.session.scalars(select(TDTPayment.property_id).where(TDTPayment.created_at >= last)))
+    return sorted(ids)
+
+
+def recompute_compliance(property_ids=None, incremental=False):
+    """Recompute compliance scenarios and store the ones that changed.
+
+    With neither argument every property is checked. `incremental=True`
+    checks only properties changed since the last completed run (falling back
+    to a full pass if there is none); `property_ids` checks exactly those and
+    isn't recorded as a run. Returns a stats dict.
+    """
+    started = time.perf_counter()
+    # Targeted runs (the write-hook worker) aren't recorded: they must not advance
+    # the watermark incremental runs use
+    targeted = property_ids is not None
+    run = ComplianceRun(mode='incremental' if incremental else 'full', started_at=datetime.utcnow())
+
+    if incremental and not targeted:
+        property_ids = _changed_since_last_run()
+        if property_ids is None:
+            run.mode = 'full'
+
+    connection = db.session.connection()
+    if property_ids is None:
+        changes = connection.execute(_changed_scenarios_query()).fetchall()
+        checked = get_summary()['total_properties']
+    else:
+        property_ids = list(property_ids)
+        changes = []
+        for chunk in _chunks(property_ids):
+            changes.extend(connection.execute(_changed_scenarios_query(chunk)).fetchall())
+        checked = len(property_ids)
+
+    by_target = defaultdict(list)
+    for property_id, _, scenario in changes:
+        by_target[scenario].append(property_id)
+
+    for scenario, ids in by_target.items():
+        for chunk in _chunks(ids):
+            db.session.execute(
+                update(Property)
+                .where(Property.id.in_(chunk))
+                # Derived field: keep updated_at so incremental runs don't re-check these rows
+                .values(compliance_scenario=scenario, updated_at=Property.updated_at),
+                execution_options={'synchronize_session': False}
+            )
+
+    if changes:
+        record_scenario_changes(
+            Counter(old for _, old, _ in changes),
+            Counter(new for _, _, new in changes),
+        )
+        bump_data_version('properties')
+
+    if targeted:
+        run.mode = 'targeted'
+    else:
+        run.finished_at = datetime.utcnow()
+        run.properties_checked = checked
+        run.properties_changed = len(changes)
+        db.session.add(run)
+    db.session.commit()
+
+    if changes:
+        grid_index.mark_stale()
+
+    return {
+        'mode': run.mode,
+        'checked': checked,
+        'changed': len(changes),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,139 @@
+"""
+Write-hook driven recompute of derived property state.
+
+ORM writes that can change a property's compliance scenario (payment inserts,
+updates and deletes; property inserts and registration changes) record the
+affected property IDs on the session at flush. After the transaction commits
+they are added to a process-wide dirty set; on rollback they are dropped.
+
+A daemon worker thread drains the set in batches of up to BATCH_SIZE and runs
+`recompute_compliance(property_ids=...)` on them, so the request that wrote the
+payment never pays for the recompute and the stored scenario converges within
+about DEBOUNCE_SECONDS. A failed batch is put back and retried after
+RETRY_SECONDS.
+
+Only committed IDs are queued, so the worker never reads a write before it is
+visible. Bulk INSERTs and Core UPDATEs skip the mapper events and call
+`mark_dirty` themselves. IDs are only collected while the worker runs in this
+process. It runs only in the web server (run.py, which passes with_worker=True
+to create_app; COMPLIANCE_WORKER_ENABLED=false turns it off there too);
+scripts never start it and run `scripts/recompute_compliance.py` instead.
+"""
+
+import logging
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.models import Property, TDTPayment
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+# Wait this long after the first dirty ID so a burst of writes becomes one batch
+DEBOUNCE_SECONDS = 1.0
+RETRY_SECONDS = 5.0
+
+_dirty = set()
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_worker = None
+
+
+def mark_dirty(property_ids):
+    """Queue committed property IDs for recompute."""
+    if _worker is None:
+        return
+    with _lock:
+        _dirty.update(pid for pid in property_ids if pid is not None)
+    _wakeup.set()
+
+
+def pending_count():
+    with _lock:
+        return len(_dirty)
+
+
+def _take_batch():
+    with _lock:
+        batch = []
+        while _dirty and len(batch) < BATCH_SIZE:
+            batch.append(_dirty.pop())
+        return batch
+
+
+def _run(app):
+    from app import db
+    from app.compliance import recompute_compliance
+
+    while True:
+        _wakeup.wait()
+        _wakeup.clear()
+        time.sleep(DEBOUNCE_SECONDS)
+
+        batch = _take_batch()
+        while batch:
+            with app.app_context():
+                try:
+                    stats = recompute_compliance(property_ids=batch)
+                except Exception:
+                    logger.exception('Compliance recompute failed for %d properties; retrying', len(batch))
+                    db.session.rollback()
+                    with _lock:
+                        _dirty.update(batch)
+                    time.sleep(RETRY_SECONDS)
+                    _wakeup.set()
+                    break
+            if stats['changed']:
+                logger.info('Recomputed compliance for %d properties, %d changed',
+                            stats['checked'], stats['changed'])
+            batch = _take_batch()
+
+
+def start_worker(app):
+    """Start the recompute thread for this process (idempotent)."""
+    global _worker
+    if _worker is not None:
+        return _worker
+    _worker = threading.Thread(target=_run, args=(app,), name='compliance-worker', daemon=True)
+    _worker.start()
+    return _worker
+
+
+def _record(session, property_ids):
+    if _worker is not None and session is not None:
+        session.info.setdefault('dirty_property_ids', set()).update(property_ids)
+
+
+def _payment_changed(mapper, connection, target):
+    history = inspect(target).attrs.property_id.history
+    _record(object_session(target), {target.property_id, *history.deleted})
+
+
+def _property_inserted(mapper, connection, target):
+    _record(object_session(target), {target.id})
+
+
+def _property_updated(mapper, connection, target):
+    if inspect(target).attrs.is_registered.history.has_changes():
+        _record(object_session(target), {target.id})
+
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(TDTPayment, _event, _payment_changed)
+event.listen(Property, 'after_insert', _property_inserted)
+event.listen(Property, 'after_update', _property_updated)
+
+
+@event.listens_for(Session, 'after_commit')
+def _queue_after_commit(session):
+    property_ids = session.info.pop('dirty_property_ids', None)
+    if property_ids:
+        mark_dirty(property_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('dirty_property_ids', None)
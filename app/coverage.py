@@ -0,0 +1,157 @@
+"""
+Period-coverage gap detector for registered properties.
+
+For a tax year, the payments of registered properties overlapping the year
+are streamed once, a chunk at a time, as datetime64 arrays parsed from ISO
+date strings, and split into one piece per month they touch (clipped to the
+month), as in app/reconciliation.py. Within each (property, month) the pieces
+are sorted by start and swept with a running maximum of the end day, giving
+the days covered at least once (the union). From that:
+
+    gaps      months with a day no payment covers (union < days in month)
+    overlaps  months with a day two payments cover (sum of piece days > union)
+
+so weekly or semi-monthly payments that tile a month exactly are neither,
+whatever the length of each period. Each is packed into a 12-bit mask, bit 0 =
+January. Only months up to `through` are checked; for the current year that
+defaults to the last full month.
+
+Reports are cached per (year, through) and data version, so paging through
+the API endpoint recomputes only after payments or properties change.
+"""
+
+import time
+from datetime import date
+
+import numpy as np
+from sqlalchemy import String, cast, select
+
+from app import db
+from app.cache import LRUCache
+from app.http_cache import get_data_versions
+from app.models import Property, TDTPayment
+from app.reconciliation import split_by_month, union_days_added
+
+STREAM_CHUNK_SIZE = 50000
+MONTH_BITS = 1 << np.arange(12, dtype=np.uint16)
+
+MAX_CACHED_REPORTS = 8
+REPORT_TTL_SECONDS = 3600
+
+report_cache = LRUCache(max_entries=MAX_CACHED_REPORTS, ttl=REPORT_TTL_SECONDS)
+
+
+def default_through(year, today=None):
+    """Last month of `year` that has fully elapsed (12 for past years)."""
+    today = today or date.today()
+    if year < today.year:
+        return 12
+    if year > today.year:
+        return 0
+    return today.month - 1
+
+
+def mask_to_months(mask):
+    return [m + 1 for m in range(12) if mask >> m & 1]
+
+
+def _month_coverage(year, property_ids):
+    """Covered days and covered-twice days per property and month: two (len(property_ids), 12) arrays."""
+    n = len(property_ids)
+    first_month = np.datetime64(f'{year}-01', 'M')
+    keys, piece_starts, piece_ends = [], [], []
+
+    # Dates come back as ISO strings, which NumPy parses to datetime64 in C
+    query = select(TDTPayment.property_id,
+                   cast(TDTPayment.period_start, String), cast(TDTPayment.period_end, String)) \
+        .join(Property, Property.id == TDTPayment.property_id) \
+        .where(Property.is_registered.is_(True),
+               TDTPayment.period_start <= date(year, 12, 31),
+               TDTPayment.period_end >= date(year, 1, 1))
+
+    result = db.session.connection().execute(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+    for partition in result.partitions():
+        pids, starts, ends = zip(*partition)
+        pids = np.array(pids, dtype=np.int64)
+        starts = np.array(starts, dtype='datetime64[D]')
+        ends = np.array(ends, dtype='datetime64[D]')
+
+        rows = np.minimum(np.searchsorted(property_ids, pids), n - 1)
+        known = property_ids[rows] == pids
+        rows, starts, ends = rows[known], starts[known], ends[known]
+
+        payment, month, piece_start, piece_end = split_by_month(rows, starts, ends, year)
+        keys.append(rows[payment] * 12 + (month - first_month).astype(np.int64))
+        piece_starts.append(piece_start)
+        piece_ends.append(piece_end)
+
+    covered = np.zeros(n * 12, dtype=np.int64)
+    doubled = np.zeros(n * 12, dtype=np.int64)
+    if keys:
+        keys = np.concatenate(keys)
+        piece_start = np.concatenate(piece_starts)
+        piece_end = np.concatenate(piece_ends)
+        order = np.lexsort((piece_start, keys))
+        keys, piece_start, piece_end = keys[order], piece_start[order], piece_end[order]
+
+        new_group = np.r_[True, keys[1:] != keys[:-1]] if len(keys) else np.zeros(0, dtype=bool)
+        union = union_days_added(new_group, piece_start, piece_end)
+        days = (piece_end - piece_start).astype(np.int64) + 1
+        np.add.at(covered, keys, union)
+        np.add.at(doubled, keys, days - union)
+
+    return covered.reshape(n, 12), doubled.reshape(n, 12)
+
+
+def build_coverage_report(year, through=None):
+    """Compute gaps and overlaps for every registered property in `year`.
+
+    Returns a dict of totals plus `rows`: (property_id, parcel_id, gap_mask,
+    overlap_mask) for properties with at least one gap or overlap, ordered by
+    property id.
+    """
+    started = time.perf_counter()
+    through = default_through(year) if through is None else max(0, min(12, through))
+
+    properties = db.session.execute(
+        select(Property.id, Property.parcel_id)
+        .where(Property.is_registered.is_(True))
+        .order_by(Property.id)
+    ).all()
+    property_ids = np.fromiter((p[0] for p in properties), dtype=np.int64, count=len(properties))
+
+    if len(properties) and through:
+        covered, doubled = _month_coverage(year, property_ids)
+        months = np.arange(np.datetime64(f'{year}-01', 'M'), np.datetime64(f'{year + 1}-01', 'M'))
+        month_days = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+        bits = MONTH_BITS[:through]
+        gap_masks = ((covered[:, :through] < month_days[:through]) * bits).sum(axis=1)
+        overlap_masks = ((doubled[:, :through] > 0) * bits).sum(axis=1)
+    else:
+        gap_masks = overlap_masks = np.zeros(len(properties), dtype=np.uint16)
+
+    flagged = np.flatnonzero(gap_masks | overlap_masks)
+    rows = [(properties[i][0], properties[i][1], int(gap_masks[i]), int(overlap_masks[i]))
+            for i in flagged]
+
+    return {
+        'year': year,
+        'through': through,
+        'properties': len(properties),
+        'with_gaps': int(np.count_nonzero(gap_masks)),
+        'with_overlaps': int(np.count_nonzero(overlap_masks)),
+        'fully_covered': int(np.count_nonzero(gap_masks == 0)),
+        'rows': rows,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def get_coverage_report(year, through=None):
+    """Cached build_coverage_report; recomputed when properties or payments change."""
+    through = default_through(year) if through is None else max(0, min(12, through))
+    key = (year, through, get_data_versions(('properties', 'payments')))
+    report = report_cache.get(key)
+    if report is None:
+        report = build_coverage_report(year, through)
+        report_cache.put(key, report)
+    return report
@@ -0,0 +1,119 @@
+"""
+ETag / conditional-GET support for read-only API endpoints.
+
+Each data scope ('properties', 'payments', 'dealers') has a version counter in
+the `data_versions` table. ORM writes to the matching models bump it once per
+flush on the flush connection, so the bump commits with the write and is seen
+by every process. Bulk INSERTs that skip mapper events call bump_data_version
+themselves.
+
+`@conditional_get(*scopes)` derives an ETag from the endpoint, its query
+string and the current versions of its scopes, plus `vary()` for endpoints
+whose defaults depend on something else (such as today's date). A matching If-None-Match gets
+304 Not Modified; otherwise the serialized body is served from a bounded LRU
+keyed by that ETag, or rendered and stored. Each poll costs one primary-key
+read of the version rows.
+"""
+
+import hashlib
+from functools import wraps
+
+from flask import Response, make_response, request
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.cache import LRUCache
+from app.models import DataVersion, Dealer, Property, TDTPayment
+
+MAX_CACHED_RESPONSES = 256
+# Versions are authoritative; the TTL only bounds how long unused bodies linger
+RESPONSE_TTL_SECONDS = 3600
+MAX_CACHED_BODY_BYTES = 4 * 1024 * 1024
+
+MODEL_SCOPES = {
+    Property: 'properties',
+    TDTPayment: 'payments',
+    Dealer: 'dealers',
+}
+
+response_cache = LRUCache(max_entries=MAX_CACHED_RESPONSES, ttl=RESPONSE_TTL_SECONDS)
+
+
+def bump_data_version(*scopes, connection=None):
+    """Increment the version of each scope on the given (or the session's) connection."""
+    connection = connection or db.session.connection()
+    table = DataVersion.__table__
+    for scope in scopes:
+        result = connection.execute(
+            update(table).where(table.c.scope == scope).values(version=table.c.version + 1)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(scope=scope, version=1))
+
+
+def get_data_versions(scopes):
+    rows = dict(db.session.execute(
+        select(DataVersion.scope, DataVersion.version).where(DataVersion.scope.in_(scopes))
+    ).all())
+    return tuple(rows.get(scope, 0) for scope in scopes)
+
+
+def _etag_for(scopes, vary=None):
+    versions = get_data_versions(scopes)
+    if vary is not None:
+        versions = (versions, vary())
+    args = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+    # List endpoints negotiate their representation, so the Accept header is part of the key
+    accept = request.headers.get('Accept', '')
+    return hashlib.sha1(f'{request.endpoint}?{args}|{accept}|{versions}'.encode()).hexdigest()[:20]
+
+
+def conditional_get(*scopes, vary=None):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = _etag_for(scopes, vary)
+
+            if etag in request.if_none_match:
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+
+            cached = response_cache.get(etag)
+            if cached is not None:
+                body, mimetype, headers = cached
+                response = Response(body, mimetype=mimetype, headers=headers)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed:
+                    body = response.get_data()
+                    if len(body) <= MAX_CACHED_BODY_BYTES:
+                        headers = [(k, v) for k, v in response.headers
+                                   if k not in ('Content-Type', 'Content-Length')]
+                        response_cache.put(etag, (body, response.mimetype, headers))
+
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+def _record_scope(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('dirty_data_scopes', set()).add(MODEL_SCOPES[mapper.class_])
+
+
+for _model in MODEL_SCOPES:
+    for _event in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _event, _record_scope)
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_after_flush(session, flush_context):
+    scopes = session.info.pop('dirty_data_scopes', None)
+    if scopes:
+        bump_data_version(*sorted(scopes), connection=session.connection())
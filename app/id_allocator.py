@@ -0,0 +1,182 @@
+"""
+Block-allocated TDT numbers and payment transaction IDs.
+
+Both used to be random draws against a unique column, which collides more
+often the fuller the year gets and turns a bulk registration into a string of
+failed commits and retries. Instead each identifier family has a sequence row
+in `id_sequences` holding the first value no process has reserved yet. A
+process reserves a block of values with one UPDATE of that row and then hands
+them out from memory, so values are unique across workers without checking the
+target table, and allocating thousands of them costs one statement.
+
+Values reserved by a process that exits are skipped, so numbering has gaps.
+
+Blocks are reserved in a short transaction of their own, like nextval(), so
+the sequence row is never locked for the length of the caller's transaction
+and a caller's rollback can't hand a block back while other sessions are
+using it. SQLite has a single writer: once the session has written, a second
+connection would wait on the session's own lock (and an in-memory database has
+only the one connection). Such a session reserves on its own connection into
+a block private to it, which is dropped when its transaction ends, so a
+rolled-back reservation was never seen by anyone else.
+
+TDT numbers are TDT-<year>-<n>, numbered per year from just past the highest
+number already issued that year, so they grow past six digits instead of
+running out. Transaction IDs keep the XXXX-XXXX-XXXX-XXXX format; the sequence
+value is put through a fixed permutation of the 36^16 ID space so consecutive
+payments don't get visibly consecutive IDs.
+"""
+
+import threading
+from datetime import datetime
+
+from sqlalchemy import Integer, cast, event, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import IdSequence, Property
+
+TDT_BLOCK_SIZE = 100
+TRANSACTION_BLOCK_SIZE = 1000
+TDT_FIRST_NUMBER = 100000
+
+ID_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+ID_LENGTH = 16
+ID_SPACE = len(ID_ALPHABET) ** ID_LENGTH
+# Coprime with 36, so n -> n * ID_MULTIPLIER mod ID_SPACE is a bijection; close to
+# ID_SPACE / golden ratio, so consecutive values land far apart
+ID_MULTIPLIER = 4918723070888839569782483
+
+
+class BlockAllocator:
+    """Hands out unique integers from blocks reserved on an `id_sequences` row."""
+
+    def __init__(self, name, block_size, first_value):
+        self.name = name
+        self.block_size = block_size
+        self.first_value = first_value
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+
+    def take(self, count):
+        """Return `count` unused values, reserving a new block when this one runs out."""
+        session = db.session()
+        if _holds_sqlite_write(session):
+            block = session.info.setdefault('private_id_blocks', {}).setdefault(self.name, [0, 0])
+            return self._take_from(block, count, lambda n: self._reserve_on(session.connection(), n))
+
+        with self._lock:
+            block = [self._next, self._end]
+            values = self._take_from(block, count, self._reserve)
+            self._next, self._end = block
+        return values
+
+    def _take_from(self, block, count, reserve):
+        values = []
+        while len(values) < count:
+            if block[0] >= block[1]:
+                block[:] = reserve(max(self.block_size, count - len(values)))
+            n = min(block[1] - block[0], count - len(values))
+            values.extend(range(block[0], block[0] + n))
+            block[0] += n
+        return values
+
+    def _reserve(self, count):
+        while True:
+            try:
+                with db.engine.begin() as conn:
+                    return self._reserve_on(conn, count)
+            except IntegrityError:
+                # Another process created the sequence row first; reserve from it
+                continue
+
+    def _reserve_on(self, connection, count):
+        table = IdSequence.__table__
+        end = connection.execute(
+            update(table).where(table.c.name == self.name)
+            .values(next_value=table.c.next_value + count)
+            .returning(table.c.next_value)
+        ).scalar()
+        if end is None:
+            start = self.first_value(connection) if callable(self.first_value) else self.first_value
+            connection.execute(insert(table).values(name=self.name, next_value=start + count))
+            return start, start + count
+        return end - count, end
+
+
+def _holds_sqlite_write(session):
+    """True when a second connection can't reserve for this session: an in-memory
+    SQLite database, or a SQLite session whose transaction has already written."""
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    if db.engine.url.database in (None, '', ':memory:'):
+        return True
+    if not session.in_transaction():
+        return False
+    return session.connection().connection.dbapi_connection.in_transaction
+
+
+_allocators = {}
+_allocators_lock = threading.Lock()
+
+
+def _allocator(name, block_size, first_value):
+    key = (str(db.engine.url), name)
+    with _allocators_lock:
+        if key not in _allocators:
+            _allocators[key] = BlockAllocator(name, block_size, first_value)
+        return _allocators[key]
+
+
+def _tdt_prefix(year):
+    return f'TDT-{year}-'
+
+
+def _first_tdt_number(year):
+    """Start a year's sequence after the numbers issued before it existed."""
+    prefix = _tdt_prefix(year)
+
+    def first_value(connection):
+        highest = connection.execute(
+            select(func.max(cast(func.substr(Property.tdt_number, len(prefix) + 1), Integer)))
+            .where(Property.tdt_number.like(prefix + '%'))
+        ).scalar()
+        return max(TDT_FIRST_NUMBER, (highest or 0) + 1)
+
+    return first_value
+
+
+def next_tdt_numbers(count, year=None):
+    """Reserve `count` new TDT numbers for the year (default: this year)."""
+    year = year or datetime.now().year
+    allocator = _allocator(f'tdt_number:{year}', TDT_BLOCK_SIZE, _first_tdt_number(year))
+    prefix = _tdt_prefix(year)
+    return [f'{prefix}{n:06d}' for n in allocator.take(count)]
+
+
+def generate_tdt_number(year=None):
+    return next_tdt_numbers(1, year)[0]
+
+
+def _format_transaction_id(n):
+    n = (n * ID_MULTIPLIER) % ID_SPACE
+    chars = []
+    for _ in range(ID_LENGTH):
+        n, digit = divmod(n, len(ID_ALPHABET))
+        chars.append(ID_ALPHABET[digit])
+    raw = ''.join(reversed(chars))
+    return f'{raw[0:4]}-{raw[4:8]}-{raw[8:12]}-{raw[12:16]}'
+
+
+def next_transaction_ids(count):
+    """Reserve `count` new payment transaction IDs."""
+    allocator = _allocator('transaction_id', TRANSACTION_BLOCK_SIZE, 1)
+    return [_format_transaction_id(n) for n in allocator.take(count)]
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _drop_private_blocks(session):
+    session.info.pop('private_id_blocks', None)
@@ -0,0 +1,62 @@
+"""
+Managed index set.
+
+Indexes are declared on the models (`__table_args__`), so `db.create_all()`
+builds them with new tables. It does not add indexes to tables that already
+exist, so `ensure_indexes()` runs at startup and creates any declared index
+missing from the live database. Each check is a catalog lookup, and CREATE
+INDEX only runs the first time. Indexes that were renamed are listed in
+RENAMED_INDEXES; the old name is dropped so the index isn't kept twice.
+
+Names match the Supabase schema (supabase/schema.sql and
+supabase/add_performance_indexes.sql), so the same index isn't built twice
+under two names. tests/test_query_plans.py verifies the hot queries use them.
+"""
+
+import logging
+
+from sqlalchemy import inspect, text
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Old name -> current name, for indexes renamed to the idx_<table>_<columns> convention
+RENAMED_INDEXES = {
+    'ix_payment_reconciliations_property_period': 'idx_payment_reconciliations_property_period',
+    'ix_payment_reconciliations_status': 'idx_payment_reconciliations_status',
+    'ix_rental_risk_scores_score': 'idx_rental_risk_scores_score',
+}
+
+
+def _index_names(conn, inspector, table):
+    # SQLite reflection skips expression indexes (lower(address)); its catalog lists every index
+    if conn.dialect.name == 'sqlite':
+        return set(conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+            {'table': table},
+        ).scalars())
+    return {ix['name'] for ix in inspector.get_indexes(table)}
+
+
+def ensure_indexes():
+    """Create every index declared on the models that the database lacks. Returns the names created."""
+    created = []
+    with db.engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = _index_names(conn, inspector, table.name)
+            for name in existing & RENAMED_INDEXES.keys():
+                conn.execute(text(f'DROP INDEX {name}'))
+                logger.info('Dropped %s, renamed to %s', name, RENAMED_INDEXES[name])
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+                    created.append(index.name)
+
+    if created:
+        logger.info('Created %d missing indexes: %s', len(created), ', '.join(created))
+    return created
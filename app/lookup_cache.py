@@ -0,0 +1,70 @@
+"""
+In-process LRU cache for single property lookups by parcel ID or TDT number.
+
+Dealer integrations hit the same hot listings repeatedly, so the serialized
+lookup result is cached per (field, value). Entries are evicted least recently
+used first once MAX_ENTRIES is reached and expire after TTL_SECONDS so writes
+made outside this process are eventually picked up. Property inserts, updates
+and deletes in this process invalidate the affected keys at flush and again
+after commit, so a concurrent reader can't re-cache the pre-commit row.
+The lookup fields load their committed value when set (active history), so
+renaming an expired property still invalidates the key it moved from.
+
+Misses are not cached: a property imported by another process would otherwise
+stay invisible until the entry expired.
+"""
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.cache import LRUCache
+from app.models import Property
+
+MAX_ENTRIES = 50000
+TTL_SECONDS = 300
+LOOKUP_FIELDS = ('parcel_id', 'tdt_number')
+
+
+lookup_cache = LRUCache(max_entries=MAX_ENTRIES, ttl=TTL_SECONDS)
+
+
+def _keys_for(target):
+    state = inspect(target)
+    keys = set()
+    for field in LOOKUP_FIELDS:
+        history = state.attrs[field].history
+        for value in (*history.deleted, *history.added, *history.unchanged):
+            if value is not None:
+                keys.add((field, value))
+    return keys
+
+
+def _invalidate(mapper, connection, target):
+    keys = _keys_for(target)
+    lookup_cache.invalidate(keys)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('lookup_cache_keys', set()).update(keys)
+
+
+def _load_old_value_on_set(target, value, oldvalue, initiator):
+    pass  # Registered with active_history=True, which is what loads the old value
+
+
+for _field in LOOKUP_FIELDS:
+    event.listen(getattr(Property, _field), 'set', _load_old_value_on_set, active_history=True)
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Property, _event, _invalidate)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    keys = session.info.pop('lookup_cache_keys', None)
+    if keys:
+        lookup_cache.invalidate(keys)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('lookup_cache_keys', None)
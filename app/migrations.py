@@ -0,0 +1,97 @@
+"""
+Column migrations for tables that predate a model change.
+
+`db.create_all()` creates missing tables but never alters existing ones, so a
+column added to a model has to be added to older databases here. Runs at
+startup before `ensure_indexes()`, since the new columns carry indexes.
+
+The parcel child tables (sales, buildings, land, property_values, exemptions)
+gained an integer `property_id` foreign key alongside the county `parcel_id`,
+so relationship loads and joins compare integers on an indexed column instead
+of 50-character strings. `backfill_property_ids()` resolves it from parcel_id
+for rows written without it; the Supabase side is
+supabase/add_child_property_ids.sql.
+
+`compliance_summary` gained `total_payments`, so the unfiltered ledger can
+show its page count without counting the payments table on every request.
+`ensure_summary_columns()` adds it and fills it with one count.
+"""
+
+import logging
+
+from sqlalchemy import func, inspect, select, text, update
+
+from app import db
+from app.models import Building, ComplianceSummary, Exemption, Land, Property, PropertyValue, Sale, TDTPayment
+
+logger = logging.getLogger(__name__)
+
+CHILD_MODELS = (Sale, Building, Land, PropertyValue, Exemption)
+
+
+def ensure_child_property_ids():
+    """Add property_id to child tables that lack it and backfill those tables.
+    Returns {table name: rows backfilled} for the tables migrated."""
+    migrated = []
+    with db.engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for model in CHILD_MODELS:
+            table = model.__tablename__
+            if table not in existing_tables:
+                continue
+            if 'property_id' in {c['name'] for c in inspector.get_columns(table)}:
+                continue
+            conn.execute(text(f'ALTER TABLE {table} ADD COLUMN property_id INTEGER REFERENCES properties(id)'))
+            migrated.append(model)
+
+    if not migrated:
+        return {}
+    counts = backfill_property_ids(migrated)
+    logger.info('Added property_id to %s', ', '.join(f'{t} ({n} rows)' for t, n in counts.items()))
+    return counts
+
+
+def ensure_summary_columns():
+    """Add total_payments to an existing compliance_summary and fill it.
+    Returns True when the column was added."""
+    summary = ComplianceSummary.__tablename__
+    with db.engine.begin() as conn:
+        inspector = inspect(conn)
+        if summary not in inspector.get_table_names():
+            return False
+        if 'total_payments' in {c['name'] for c in inspector.get_columns(summary)}:
+            return False
+        conn.execute(text(f'ALTER TABLE {summary} ADD COLUMN total_payments INTEGER NOT NULL DEFAULT 0'))
+        conn.execute(
+            update(ComplianceSummary.__table__)
+            .values(total_payments=select(func.count(TDTPayment.id)).scalar_subquery())
+        )
+    logger.info('Added total_payments to %s', summary)
+    return True
+
+
+def backfill_property_ids(models=CHILD_MODELS):
+    """Set property_id from parcel_id on child rows that don't have it yet.
+    Returns {table name: rows updated}."""
+    counts = {}
+    with db.engine.begin() as conn:
+        for model in models:
+            match = select(Property.id).where(Property.parcel_id == model.parcel_id)
+            result = conn.execute(
+                update(model.__table__)
+                .where(model.__table__.c.property_id.is_(None), match.exists())
+                .values(property_id=match.scalar_subquery())
+            )
+            counts[model.__tablename__] = result.rowcount
+    return counts
+
+
+def unresolved_counts(models=CHILD_MODELS):
+    """Child rows whose parcel_id has no matching property, by table."""
+    return {
+        model.__tablename__: db.session.scalar(
+            select(func.count()).select_from(model).where(model.property_id.is_(None))
+        )
+        for model in models
+    }
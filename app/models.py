@@ -1,17 +1,28 @@
 from app import db
 from datetime import datetime
-import random
-import string
 
 
 def generate_transaction_id():
-    """Generate a 16-character alphanumeric ID with dashes: XXXX-XXXX-XXXX-XXXX"""
-    chars = string.ascii_uppercase + string.digits
-    raw = ''.join(random.choices(chars, k=16))
-    return f"{raw[0:4]}-{raw[4:8]}-{raw[8:12]}-{raw[12:16]}"
+    """Next 16-character alphanumeric ID with dashes: XXXX-XXXX-XXXX-XXXX"""
+    from app.id_allocator import next_transaction_ids
+    return next_transaction_ids(1)[0]
 
 class Property(db.Model):
     __tablename__ = 'properties'
+    __table_args__ = (
+        db.Index('idx_properties_compliance', 'compliance_scenario'),
+        db.Index('idx_properties_registered', 'is_registered'),
+        db.Index('idx_properties_lat_lng', 'lat', 'lng'),
+        db.Index('idx_properties_updated_at', 'updated_at'),
+        # Property list sorts (app/routes/properties.py SORT_OPTIONS)
+        db.Index('idx_properties_address_id', 'address', 'id'),
+        db.Index('idx_properties_city_id', 'city', 'id'),
+        db.Index('idx_properties_tdt_number_id', 'tdt_number', 'id'),
+        # Short typeahead prefixes (app.search.prefix_filter)
+        db.Index('idx_properties_address_lower', db.text('lower(address)')),
+        db.Index('idx_properties_parcel_lower', db.text('lower(parcel_id)')),
+        db.Index('idx_properties_tdt_number_lower', db.text('lower(tdt_number)')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     parcel_id = db.Column(db.String(50), unique=True, nullable=False)
@@ -79,11 +90,11 @@ class Property(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     payments = db.relationship('TDTPayment', backref='property', lazy=True)
-    sales = db.relationship('Sale', backref='property', lazy=True, foreign_keys='Sale.parcel_id', primaryjoin='Property.parcel_id==Sale.parcel_id')
-    buildings = db.relationship('Building', backref='property', lazy=True, foreign_keys='Building.parcel_id', primaryjoin='Property.parcel_id==Building.parcel_id')
-    land_parcels = db.relationship('Land', backref='property', lazy=True, foreign_keys='Land.parcel_id', primaryjoin='Property.parcel_id==Land.parcel_id')
-    values = db.relationship('PropertyValue', backref='property', lazy=True, foreign_keys='PropertyValue.parcel_id', primaryjoin='Property.parcel_id==PropertyValue.parcel_id')
-    exemptions = db.relationship('Exemption', backref='property', lazy=True, foreign_keys='Exemption.parcel_id', primaryjoin='Property.parcel_id==Exemption.parcel_id')
+    sales = db.relationship('Sale', backref='property', lazy=True)
+    buildings = db.relationship('Building', backref='property', lazy=True)
+    land_parcels = db.relationship('Land', backref='property', lazy=True)
+    values = db.relationship('PropertyValue', backref='property', lazy=True)
+    exemptions = db.relationship('Exemption', backref='property', lazy=True)
     
     def __repr__(self):
         return f'<Property {self.address}>'
@@ -109,6 +120,14 @@ class Dealer(db.Model):
 
 class TDTPayment(db.Model):
     __tablename__ = 'tdt_payments'
+    __table_args__ = (
+        db.Index('idx_payments_property', 'property_id'),
+        db.Index('idx_payments_created_at', 'created_at'),
+        # Ledger filters, each walked in the ledger's created_at order
+        db.Index('idx_payments_dealer_created', 'dealer_id', 'created_at', 'id'),
+        db.Index('idx_payments_verified_created', 'verified', 'created_at', 'id'),
+        db.Index('idx_payments_period', 'period_end', 'period_start'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     transaction_id = db.Column(db.String(19), unique=True, nullable=False, default=generate_transaction_id)
@@ -130,10 +149,27 @@ class TDTPayment(db.Model):
         return f'<TDTPayment ${self.amount} for Property {self.property_id}>'
 
 
+class PaymentIdempotencyKey(db.Model):
+    __tablename__ = 'payment_idempotency_keys'
+    
+    key = db.Column(db.String(100), primary_key=True)
+    payment_id = db.Column(db.Integer, db.ForeignKey('tdt_payments.id'), nullable=False)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<PaymentIdempotencyKey {self.key}>'
+
+
 class Sale(db.Model):
     __tablename__ = 'sales'
+    __table_args__ = (
+        db.Index('idx_sales_parcel', 'parcel_id'),
+        db.Index('idx_sales_property', 'property_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=True)
     parcel_id = db.Column(db.String(50), nullable=False)
     sale_date = db.Column(db.DateTime, nullable=True)
     sequence = db.Column(db.Integer, nullable=True)
@@ -153,8 +189,13 @@ class Sale(db.Model):
 
 class Building(db.Model):
     __tablename__ = 'buildings'
+    __table_args__ = (
+        db.Index('idx_buildings_parcel', 'parcel_id'),
+        db.Index('idx_buildings_property', 'property_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=True)
     parcel_id = db.Column(db.String(50), nullable=False)
     card_number = db.Column(db.String(10), nullable=True)
     avg_height_floor = db.Column(db.Numeric(6, 2), nullable=True)
@@ -201,8 +242,13 @@ class Building(db.Model):
 
 class Land(db.Model):
     __tablename__ = 'land'
+    __table_args__ = (
+        db.Index('idx_land_parcel', 'parcel_id'),
+        db.Index('idx_land_property', 'property_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=True)
     parcel_id = db.Column(db.String(50), nullable=False)
     seq_number = db.Column(db.String(10), nullable=True)
     line_type = db.Column(db.String(10), nullable=True)
@@ -218,8 +264,13 @@ class Land(db.Model):
 
 class PropertyValue(db.Model):
     __tablename__ = 'property_values'
+    __table_args__ = (
+        db.Index('idx_values_parcel', 'parcel_id'),
+        db.Index('idx_values_property', 'property_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=True)
     parcel_id = db.Column(db.String(50), nullable=False)
     total_value = db.Column(db.Numeric(12, 2), nullable=True)
     land_value = db.Column(db.Numeric(12, 2), nullable=True)
@@ -239,8 +290,13 @@ class PropertyValue(db.Model):
 
 class Exemption(db.Model):
     __tablename__ = 'exemptions'
+    __table_args__ = (
+        db.Index('idx_exemptions_parcel', 'parcel_id'),
+        db.Index('idx_exemptions_property', 'property_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=True)
     parcel_id = db.Column(db.String(50), nullable=False)
     exemption_code = db.Column(db.String(10), nullable=True)
     amount_off_total_assessment = db.Column(db.Numeric(12, 2), nullable=True)
@@ -250,3 +306,116 @@ class Exemption(db.Model):
     def __repr__(self):
         return f'<Exemption {self.parcel_id}>'
 
+
+
+class ComplianceSummary(db.Model):
+    __tablename__ = 'compliance_summary'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    total_properties = db.Column(db.Integer, nullable=False, default=0)
+    registered_properties = db.Column(db.Integer, nullable=False, default=0)
+    scenario_1 = db.Column(db.Integer, nullable=False, default=0)
+    scenario_2 = db.Column(db.Integer, nullable=False, default=0)
+    scenario_3 = db.Column(db.Integer, nullable=False, default=0)
+    scenario_4 = db.Column(db.Integer, nullable=False, default=0)
+    total_payments = db.Column(db.Integer, nullable=False, default=0)
+    total_tdt_collected = db.Column(db.Float, nullable=False, default=0)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ComplianceSummary {self.total_properties} properties>'
+
+
+class DataVersion(db.Model):
+    __tablename__ = 'data_versions'
+    
+    scope = db.Column(db.String(50), primary_key=True)  # 'properties', 'payments' or 'dealers'
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<DataVersion {self.scope}={self.version}>'
+
+
+class IdSequence(db.Model):
+    __tablename__ = 'id_sequences'
+    
+    name = db.Column(db.String(50), primary_key=True)  # 'tdt_number:2025', 'transaction_id'
+    next_value = db.Column(db.BigInteger, nullable=False)  # first value not yet reserved by any process
+    
+    def __repr__(self):
+        return f'<IdSequence {self.name}={self.next_value}>'
+
+
+class ComplianceRun(db.Model):
+    __tablename__ = 'compliance_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    mode = db.Column(db.String(20), nullable=False)  # 'full' or 'incremental'
+    started_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    properties_checked = db.Column(db.Integer, nullable=True)
+    properties_changed = db.Column(db.Integer, nullable=True)
+    
+    def __repr__(self):
+        return f'<ComplianceRun {self.mode} {self.started_at}>'
+
+
+class PaymentReconciliation(db.Model):
+    __tablename__ = 'payment_reconciliations'
+    __table_args__ = (
+        db.Index('idx_payment_reconciliations_property_period', 'property_id', 'period'),
+        db.Index('idx_payment_reconciliations_status', 'status'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=False)
+    period = db.Column(db.Date, nullable=False)  # First day of the reconciled month
+    
+    actual_amount = db.Column(db.Float, nullable=False)
+    expected_amount = db.Column(db.Float, nullable=False)
+    difference = db.Column(db.Float, nullable=False)  # actual - expected
+    status = db.Column(db.String(20), nullable=False)  # 'underpaid' or 'overpaid'
+    payment_count = db.Column(db.Integer, nullable=False)
+    overlap_days = db.Column(db.Integer, nullable=False, default=0)
+    
+    reconciled_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<PaymentReconciliation {self.property_id} {self.period} {self.status}>'
+
+
+class RevenueRollup(db.Model):
+    __tablename__ = 'revenue_rollup'
+    __table_args__ = (
+        db.Index('idx_revenue_rollup_month', 'month'),
+    )
+    
+    city = db.Column(db.String(100), primary_key=True)
+    zip_code = db.Column(db.String(10), primary_key=True)
+    dealer_id = db.Column(db.Integer, primary_key=True)  # 0 for direct payments
+    month = db.Column(db.Date, primary_key=True)  # First day of the payment period's month
+    
+    amount = db.Column(db.Float, nullable=False, default=0)
+    payment_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<RevenueRollup {self.city} {self.zip_code} {self.dealer_id} {self.month}>'
+
+
+class RentalRiskScore(db.Model):
+    __tablename__ = 'rental_risk_scores'
+    __table_args__ = (
+        db.Index('idx_rental_risk_scores_score', 'score', 'property_id'),
+    )
+    
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), primary_key=True)
+    score = db.Column(db.Integer, nullable=False)  # 0-100, sum of the weights of the signals present
+    signals = db.Column(db.Integer, nullable=False, default=0)  # bit mask, see app.rental_risk.SIGNALS
+    
+    scored_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<RentalRiskScore {self.property_id} {self.score}>'
@@ -0,0 +1,79 @@
+"""
+Property detail loader shared by the property page and /api/v1/properties/<id>/full.
+
+The property and every related collection come back in a fixed number of
+statements regardless of how many rows hang off it: payments (with their
+dealer joined in), values, buildings, land and exemptions are selectin-loaded,
+and the latest SALES_LIMIT sales are fetched ordered and limited in SQL
+instead of loading the whole history and slicing it in the template.
+
+The JSON API passes DETAIL_FIELDS so only the listed property columns (the
+identity, compliance and owner fields) are loaded and serialized; the page
+loads the whole row.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.orm import load_only, noload, selectinload
+
+from app import db
+from app.models import Dealer, Property, Sale, TDTPayment
+
+SALES_LIMIT = 10
+# property, payments + dealers, values, buildings, land, exemptions, sales
+DETAIL_QUERY_COUNT = 7
+
+DETAIL_FIELDS = (
+    'id', 'parcel_id', 'address', 'city', 'zip_code', 'lat', 'lng',
+    'tdt_number', 'is_registered', 'registration_date', 'compliance_scenario', 'homestead_status',
+    'owner_name', 'owner_name2', 'owner_name3', 'owner_street1', 'owner_street2',
+    'owner_city', 'owner_state', 'owner_postal',
+)
+DETAIL_COLLECTIONS = ('values', 'buildings', 'land_parcels', 'exemptions')
+# Already on the parent property
+CHILD_KEYS = ('parcel_id', 'property_id')
+
+
+def load_property_detail(property_id, fields=None):
+    """Return (property, latest sales) or (None, []) if there is no such property.
+    `fields` limits the property columns loaded; by default the whole row is."""
+    options = [load_only(*(getattr(Property, name) for name in fields))] if fields else []
+    prop = db.session.execute(
+        select(Property)
+        .where(Property.id == property_id)
+        .options(
+            *options,
+            selectinload(Property.payments).joinedload(TDTPayment.dealer).load_only(Dealer.id, Dealer.name),
+            selectinload(Property.values),
+            selectinload(Property.buildings),
+            selectinload(Property.land_parcels),
+            selectinload(Property.exemptions),
+            noload(Property.sales),
+        )
+    ).scalar_one_or_none()
+    if prop is None:
+        return None, []
+
+    sales = db.session.scalars(
+        select(Sale)
+        .where(Sale.property_id == prop.id)
+        .order_by(Sale.sale_date.desc().nulls_last(), Sale.id.desc())
+        .limit(SALES_LIMIT)
+    ).all()
+    return prop, sales
+
+
+def _columns(obj, exclude=()):
+    return {c.key: getattr(obj, c.key) for c in obj.__table__.columns if c.key not in exclude}
+
+
+def detail_payload(prop, sales, fields=DETAIL_FIELDS):
+    """Plain-dict form of a loaded property detail, for the JSON API."""
+    payload = {name: getattr(prop, name) for name in fields}
+    payload['payments'] = [
+        {**_columns(p), 'dealer_name': p.dealer.name if p.dealer else None}
+        for p in prop.payments
+    ]
+    for name in DETAIL_COLLECTIONS:
+        payload[name] = [_columns(row, exclude=CHILD_KEYS) for row in getattr(prop, name)]
+    payload['sales'] = [_columns(s, exclude=CHILD_KEYS) for s in sales]
+    return payload
@@ -0,0 +1,50 @@
+"""
+Per-page SQL statement budget.
+
+Wrap a view (including its render_template call, since lazy loads happen in
+templates) in `query_budget(limit, label)` to count the statements it issues.
+Going over the limit raises QueryBudgetExceeded when the app runs in debug or
+testing mode, and logs a warning otherwise, so an N+1 regression shows up in
+development instead of at county scale.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    for counter in getattr(_local, 'counters', ()):
+        counter['count'] += 1
+
+
+@contextmanager
+def query_budget(limit, label):
+    counter = {'count': 0}
+    counters = getattr(_local, 'counters', None)
+    if counters is None:
+        counters = _local.counters = []
+    counters.append(counter)
+    try:
+        yield counter
+    finally:
+        counters.remove(counter)
+
+    if counter['count'] > limit:
+        message = f"{label} issued {counter['count']} queries (budget {limit})"
+        if current_app.debug or current_app.testing:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,185 @@
+"""
+Expected-vs-actual payment reconciliation per property and month.
+
+Payments are streamed once into flat NumPy arrays and split into
+(property, month) pieces, each carrying the days of the payment period that
+fall in that month. Both `amount` and `expected_amount` are allocated to the
+pieces pro rata by day, so a quarterly payment or one spanning Jan 15 -
+Feb 14 reconciles against the right months.
+
+Actual is the sum of allocated amounts. Expected can't be summed the same
+way: two payments for overlapping periods are one liability paid twice, not
+two liabilities. Within each property-month the pieces that carry an
+expected amount are sorted by start day and swept with a running maximum of
+the end day, which gives the days covered at least once (the union). The
+expected amount is the allocated expected total scaled by union / total
+days, i.e. overlapping days count once.
+
+Property-months whose actual differs from expected by more than the tolerance
+are written to payment_reconciliations as 'underpaid' or 'overpaid',
+replacing the previous results for the same scope. Months with no expected
+amount on any payment are skipped.
+"""
+
+import time
+from datetime import date, datetime
+
+import numpy as np
+from sqlalchemy import String, cast, delete, insert, select
+
+from app import db
+from app.models import PaymentReconciliation, TDTPayment
+
+STREAM_CHUNK_SIZE = 50000
+INSERT_CHUNK_SIZE = 5000
+DEFAULT_TOLERANCE = 1.00
+# Months since 1970 fit well under this, so property_id * MONTH_KEY + month is unique
+MONTH_KEY = 100000
+# Days since 1970 fit well under this, for the grouped running maximum
+DAY_KEY = 1000000
+
+
+def _load_payments(year=None):
+    """Stream payments (optionally only those overlapping `year`) into column arrays."""
+    query = select(TDTPayment.property_id,
+                   cast(TDTPayment.period_start, String), cast(TDTPayment.period_end, String),
+                   TDTPayment.amount, TDTPayment.expected_amount)
+    if year is not None:
+        query = query.where(TDTPayment.period_start <= date(year, 12, 31),
+                            TDTPayment.period_end >= date(year, 1, 1))
+
+    columns = ([], [], [], [], [])
+    result = db.session.connection().execute(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+    for partition in result.partitions():
+        pids, starts, ends, amounts, expected = zip(*partition)
+        columns[0].append(np.array(pids, dtype=np.int64))
+        columns[1].append(np.array(starts, dtype='datetime64[D]'))
+        columns[2].append(np.array(ends, dtype='datetime64[D]'))
+        columns[3].append(np.array(amounts, dtype=np.float64))
+        # None becomes NaN
+        columns[4].append(np.array(expected, dtype=np.float64))
+
+    if not columns[0]:
+        return None
+    return [np.concatenate(c) for c in columns]
+
+
+def split_by_month(pids, starts, ends, year=None):
+    """Expand payments into one piece per month they touch.
+
+    Returns (payment index, month as datetime64[M], piece start, piece end)
+    with start/end clipped to the month.
+    """
+    first = starts.astype('datetime64[M]')
+    last = ends.astype('datetime64[M]')
+    if year is not None:
+        first = np.maximum(first, np.datetime64(f'{year}-01', 'M'))
+        last = np.minimum(last, np.datetime64(f'{year}-12', 'M'))
+    spans = np.maximum((last - first).astype(np.int64) + 1, 0)
+
+    payment = np.repeat(np.arange(len(pids)), spans)
+    offsets = np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+    month = np.repeat(first, spans) + offsets
+
+    piece_start = np.maximum(starts[payment], month.astype('datetime64[D]'))
+    piece_end = np.minimum(ends[payment], (month + 1).astype('datetime64[D]') - 1)
+    return payment, month, piece_start, piece_end
+
+
+def union_days_added(new_group, piece_start, piece_end):
+    """Days each piece adds to its group's union, for pieces sorted by (group, start)."""
+    start = piece_start.astype(np.int64)
+    end = piece_end.astype(np.int64)
+    rank = np.cumsum(new_group)
+
+    # Running max of end within each group: offsetting by rank keeps earlier groups below later ones
+    running_end = np.maximum.accumulate(rank * DAY_KEY + end) - rank * DAY_KEY
+    prev_end = np.empty_like(running_end)
+    prev_end[1:] = running_end[:-1]
+    prev_end[new_group] = np.iinfo(np.int64).min // 2
+
+    return np.maximum(end - np.maximum(start, prev_end + 1) + 1, 0)
+
+
+def reconcile_payments(year=None, tolerance=DEFAULT_TOLERANCE):
+    """Reconcile payments by property-month and store under/over-payments.
+
+    With `year` only months in that year are reconciled and only that year's
+    stored results are replaced. Returns a stats dict.
+    """
+    started = time.perf_counter()
+    stats = {'year': year, 'payments': 0, 'periods': 0, 'underpaid': 0, 'overpaid': 0}
+
+    loaded = _load_payments(year)
+    records = []
+    if loaded is not None:
+        pids, starts, ends, amounts, expected = loaded
+        stats['payments'] = len(pids)
+
+        period_days = np.maximum((ends - starts).astype(np.int64) + 1, 1)
+        payment, month, piece_start, piece_end = split_by_month(pids, starts, ends, year)
+        days = (piece_end - piece_start).astype(np.int64) + 1
+        share = days / period_days[payment]
+
+        keys = pids[payment] * MONTH_KEY + month.astype(np.int64)
+        piece_actual = amounts[payment] * share
+        piece_expected = expected[payment] * share
+
+        # Actual: every piece counts
+        order = np.argsort(keys, kind='stable')
+        keys_sorted = keys[order]
+        group_keys, group_starts, payment_counts = np.unique(keys_sorted, return_index=True, return_counts=True)
+        actual = np.add.reduceat(piece_actual[order], group_starts)
+
+        # Expected: only pieces with an expected amount, overlapping days counted once
+        has_expected = np.flatnonzero(~np.isnan(piece_expected))
+        has_expected = has_expected[np.lexsort((piece_start[has_expected], keys[has_expected]))]
+        exp_keys = keys[has_expected]
+        new_group = np.r_[True, exp_keys[1:] != exp_keys[:-1]] if len(exp_keys) else np.zeros(0, dtype=bool)
+        union = union_days_added(new_group, piece_start[has_expected], piece_end[has_expected])
+
+        exp_starts = np.flatnonzero(new_group)
+        exp_group_keys = exp_keys[exp_starts]
+        if len(exp_starts):
+            expected_total = np.add.reduceat(piece_expected[has_expected], exp_starts)
+            total_days = np.add.reduceat(days[has_expected], exp_starts)
+            union_days = np.add.reduceat(union, exp_starts)
+        else:
+            expected_total = total_days = union_days = np.zeros(0)
+        expected_month = expected_total * union_days / np.maximum(total_days, 1)
+
+        # Line up with the actual groups (every expected key is also an actual key)
+        idx = np.searchsorted(group_keys, exp_group_keys)
+        actual_month = actual[idx]
+        difference = actual_month - expected_month
+        stats['periods'] = len(exp_group_keys)
+
+        flagged = np.flatnonzero(np.abs(difference) > tolerance)
+        reconciled_at = datetime.utcnow()
+        for i in flagged:
+            key = int(exp_group_keys[i])
+            status = 'overpaid' if difference[i] > 0 else 'underpaid'
+            stats[status] += 1
+            records.append({
+                'property_id': key // MONTH_KEY,
+                'period': np.datetime64(key % MONTH_KEY, 'M').astype('datetime64[D]').item(),
+                'actual_amount': round(float(actual_month[i]), 2),
+                'expected_amount': round(float(expected_month[i]), 2),
+                'difference': round(float(difference[i]), 2),
+                'status': status,
+                'payment_count': int(payment_counts[idx[i]]),
+                'overlap_days': int(total_days[i] - union_days[i]),
+                'reconciled_at': reconciled_at,
+            })
+
+    scope = delete(PaymentReconciliation)
+    if year is not None:
+        scope = scope.where(PaymentReconciliation.period >= date(year, 1, 1),
+                            PaymentReconciliation.period <= date(year, 12, 1))
+    db.session.execute(scope)
+    for i in range(0, len(records), INSERT_CHUNK_SIZE):
+        db.session.execute(insert(PaymentReconciliation), records[i:i + INSERT_CHUNK_SIZE])
+    db.session.commit()
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
@@ -0,0 +1,84 @@
+"""
+Bulk property registration for the API and scripts/register_properties.py.
+
+Registers every listed property that isn't registered yet in one transaction.
+TDT numbers for the whole batch come from a single block reservation
+(app.id_allocator), and the rows are written with one executemany UPDATE by
+primary key rather than a flush per property.
+
+That UPDATE skips the mapper events, so this module does what they would:
+moves the registered count on the compliance summary and bumps the
+'properties' data version in the same transaction, then after commit queues
+the properties for a compliance recompute and drops their cached lookups and
+the map index.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from app import db
+from app.compliance_worker import mark_dirty
+from app.http_cache import bump_data_version
+from app.id_allocator import next_tdt_numbers
+from app.lookup_cache import lookup_cache
+from app.models import Property
+from app.spatial import grid_index
+from app.summary import record_registrations
+
+IN_CLAUSE_CHUNK = 900
+KEY_FIELDS = ('id', 'parcel_id')
+
+
+def register_properties(keys, key_field='id', year=None):
+    """Register the properties whose `key_field` ('id' or 'parcel_id') is in `keys`.
+
+    Returns one result per distinct key, in order, with a status of
+    'registered', 'already_registered' or 'not_found'; found properties also
+    carry property_id, parcel_id and tdt_number.
+    """
+    if key_field not in KEY_FIELDS:
+        raise ValueError(f'key_field must be one of {KEY_FIELDS}')
+    keys = list(dict.fromkeys(keys))
+    column = getattr(Property, key_field)
+
+    found = {}
+    for i in range(0, len(keys), IN_CLAUSE_CHUNK):
+        for row in db.session.execute(
+            select(Property.id, Property.parcel_id, Property.is_registered, Property.tdt_number)
+            .where(column.in_(keys[i:i + IN_CLAUSE_CHUNK]))
+        ):
+            found[getattr(row, key_field)] = row
+
+    pending = [found[key] for key in keys if key in found and not found[key].is_registered]
+    numbers = dict(zip((row.id for row in pending), next_tdt_numbers(len(pending), year))) if pending else {}
+
+    if pending:
+        now = datetime.utcnow()
+        db.session.execute(update(Property), [
+            {'id': row.id, 'is_registered': True, 'tdt_number': numbers[row.id],
+             'registration_date': now, 'updated_at': now}
+            for row in pending
+        ])
+        record_registrations(len(pending))
+        bump_data_version('properties')
+        db.session.commit()
+
+        mark_dirty(set(numbers))
+        grid_index.mark_stale()
+        lookup_cache.invalidate(
+            {('parcel_id', row.parcel_id) for row in pending}
+            | {('tdt_number', row.tdt_number) for row in pending if row.tdt_number}
+        )
+
+    label = 'property_id' if key_field == 'id' else 'parcel_id'
+    results = []
+    for key in keys:
+        row = found.get(key)
+        if row is None:
+            results.append({label: key, 'status': 'not_found'})
+            continue
+        status = 'registered' if row.id in numbers else 'already_registered'
+        results.append({'property_id': row.id, 'parcel_id': row.parcel_id, 'status': status,
+                        'tdt_number': numbers.get(row.id, row.tdt_number)})
+    return results
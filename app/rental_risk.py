@@ -0,0 +1,187 @@
+"""
+Likely-unregistered vacation rental scoring over the appraiser data.
+
+Every parcel gets a 0-100 score: the summed weights of the signals below that
+it shows. None of them proves a rental on its own; together they rank the
+roll so the unregistered properties most worth a look come first.
+
+    no_homestead   no homestead flag and no homestead exemption row
+    out_of_state   owner mailing address outside Florida
+    absentee       owner mailing ZIP differs from the property ZIP
+    tourist_area   property ZIP on the barrier islands / beach areas
+    condo          condo land use code or a building in a condo complex
+    recent_sale    sold within RECENT_SALE_DAYS
+
+The roll is streamed once into column arrays (properties plus the property
+ids matching each child-table condition, filtered in SQL), every signal is a
+vectorized mask over the property array, and the scores replace the contents
+of rental_risk_scores. Top-N reads walk idx_rental_risk_scores_score from the
+top instead of sorting the roll.
+"""
+
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, insert, select, tuple_
+
+from app import db
+from app.http_cache import bump_data_version
+from app.models import Building, Exemption, Property, RentalRiskScore, Sale
+
+STREAM_CHUNK_SIZE = 50000
+INSERT_CHUNK_SIZE = 5000
+RECENT_SALE_DAYS = 3 * 365
+HIGH_RISK_SCORE = 60
+TOP_RISK_PAGE_SIZE = 500
+
+# (name, weight); the bit for signal i is 1 << i
+SIGNALS = (
+    ('no_homestead', 30),
+    ('out_of_state', 20),
+    ('absentee', 15),
+    ('tourist_area', 15),
+    ('condo', 10),
+    ('recent_sale', 10),
+)
+
+HOMESTEAD_EXEMPTION_CODES = ('HX',)
+FLORIDA = ('FL', 'FLORIDA')
+# Siesta Key, Longboat Key, Lido Key / St. Armands, Casey Key / Nokomis, Venice Island, Manasota Key
+TOURIST_ZIP_CODES = ('34242', '34228', '34236', '34275', '34285', '34223')
+# Florida DOR land use 04xx: condominium
+CONDO_LAND_USE_PREFIX = '04'
+
+TOP_RISK_FIELDS = ('id', 'parcel_id', 'address', 'city', 'zip_code', 'owner_name', 'is_registered')
+
+PROPERTY_COLUMNS = ('id', 'is_registered', 'homestead_status', 'zip_code',
+                    'owner_state', 'owner_postal', 'land_use_code')
+
+
+def _stream(query):
+    result = db.session.connection().execute(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+    return result.partitions()
+
+
+def _load_properties():
+    columns = [[] for _ in PROPERTY_COLUMNS]
+    query = select(*(Property.__table__.c[name] for name in PROPERTY_COLUMNS)).order_by(Property.id)
+    for partition in _stream(query):
+        for column, values in zip(columns, zip(*partition)):
+            column.extend(values)
+    return pd.DataFrame(dict(zip(PROPERTY_COLUMNS, columns)))
+
+
+def _property_ids(query):
+    """Distinct non-null property ids returned by a one-column query."""
+    chunks = [np.array([row[0] for row in partition], dtype=np.int64) for partition in _stream(query)]
+    return np.unique(np.concatenate(chunks)) if chunks else np.zeros(0, dtype=np.int64)
+
+
+def _text(series):
+    return series.fillna('').astype(str).str.strip().str.upper()
+
+
+def _signal_masks(props, as_of):
+    ids = props['id'].to_numpy(dtype=np.int64)
+
+    homestead_exempt = _property_ids(
+        select(Exemption.property_id).distinct()
+        .where(Exemption.property_id.isnot(None), Exemption.exemption_code.in_(HOMESTEAD_EXEMPTION_CODES))
+    )
+    condo_buildings = _property_ids(
+        select(Building.property_id).distinct()
+        .where(Building.property_id.isnot(None), Building.condo_complex_name.isnot(None))
+    )
+    recent_sales = _property_ids(
+        select(Sale.property_id).distinct()
+        .where(Sale.property_id.isnot(None), Sale.sale_date >= as_of - timedelta(days=RECENT_SALE_DAYS))
+    )
+
+    zip5 = _text(props['zip_code']).str[:5]
+    owner_state = _text(props['owner_state'])
+    owner_zip = _text(props['owner_postal']).str[:5]
+    homestead = props['homestead_status'].fillna(False).astype(bool).to_numpy()
+
+    return {
+        'no_homestead': ~homestead & ~np.isin(ids, homestead_exempt),
+        'out_of_state': ((owner_state != '') & ~owner_state.isin(FLORIDA)).to_numpy(),
+        'absentee': ((owner_zip != '') & (owner_zip != zip5)).to_numpy(),
+        'tourist_area': zip5.isin(TOURIST_ZIP_CODES).to_numpy(),
+        'condo': _text(props['land_use_code']).str.startswith(CONDO_LAND_USE_PREFIX).to_numpy()
+                 | np.isin(ids, condo_buildings),
+        'recent_sale': np.isin(ids, recent_sales),
+    }
+
+
+def score_properties(as_of=None):
+    """Score every property and replace the stored scores. Returns a stats dict."""
+    started = time.perf_counter()
+    as_of = as_of or date.today()
+    props = _load_properties()
+    stats = {'properties': len(props), 'high_risk_unregistered': 0,
+             'signals': {name: 0 for name, _ in SIGNALS}}
+
+    records = []
+    if len(props):
+        masks = _signal_masks(props, as_of)
+        score = np.zeros(len(props), dtype=np.int64)
+        bits = np.zeros(len(props), dtype=np.int64)
+        for i, (name, weight) in enumerate(SIGNALS):
+            score += masks[name] * weight
+            bits |= masks[name].astype(np.int64) << i
+            stats['signals'][name] = int(masks[name].sum())
+
+        registered = props['is_registered'].fillna(False).astype(bool).to_numpy()
+        stats['high_risk_unregistered'] = int(((score >= HIGH_RISK_SCORE) & ~registered).sum())
+
+        scored_at = datetime.utcnow()
+        records = [
+            {'property_id': pid, 'score': s, 'signals': b, 'scored_at': scored_at}
+            for pid, s, b in zip(props['id'].tolist(), score.tolist(), bits.tolist())
+        ]
+
+    db.session.execute(delete(RentalRiskScore))
+    for i in range(0, len(records), INSERT_CHUNK_SIZE):
+        db.session.execute(insert(RentalRiskScore), records[i:i + INSERT_CHUNK_SIZE])
+    bump_data_version('risk_scores')
+    db.session.commit()
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def signal_names(bits):
+    return [name for i, (name, _) in enumerate(SIGNALS) if bits & (1 << i)]
+
+
+def top_risk(limit, min_score=0, include_registered=False):
+    """Highest-scoring properties, best first: rows of (*TOP_RISK_FIELDS, score, signals, scored_at).
+
+    Reads the score index from the top a page at a time and skips registered
+    properties in Python; filtering them in SQL lets the planner start from
+    properties and sort every score instead.
+    """
+    query = (
+        select(*(Property.__table__.c[name] for name in TOP_RISK_FIELDS),
+               RentalRiskScore.score, RentalRiskScore.signals, RentalRiskScore.scored_at)
+        .select_from(RentalRiskScore)
+        .join(Property, Property.id == RentalRiskScore.property_id)
+        .where(RentalRiskScore.score >= min_score)
+        .order_by(RentalRiskScore.score.desc(), RentalRiskScore.property_id.desc())
+    )
+    page_size = max(limit, TOP_RISK_PAGE_SIZE)
+
+    rows = []
+    last = None
+    while len(rows) < limit:
+        page_query = query
+        if last is not None:
+            page_query = page_query.where(tuple_(RentalRiskScore.score, RentalRiskScore.property_id) < last)
+        page = db.session.execute(page_query.limit(page_size)).all()
+        rows.extend(row for row in page if include_registered or not row.is_registered)
+        if len(page) < page_size:
+            break
+        last = (page[-1].score, page[-1].id)
+    return rows[:limit]
@@ -0,0 +1,201 @@
+"""
+Pre-aggregated revenue rollup: city x zip x dealer x month.
+
+`revenue_rollup` holds one row per (city, zip_code, dealer_id, month) with the
+summed payment amount and count. Dealer 0 is direct payments; month is the
+first day of the month the payment period starts in. The /api/v1/revenue
+endpoint sums the cells matching its filters, so any slice or drill-down
+costs O(cells) instead of a GROUP BY over raw payments.
+
+Like the compliance summary, ORM inserts, updates and deletes of TDTPayment
+apply their delta to the matching cell on the flush connection, and a change
+to a property's city or zip moves its payments between cells. The tracked
+attributes load their committed value when set (active history), so editing an
+expired payment or property still takes its old cell out. The batch
+payments endpoint calls record_bulk_revenue for its bulk INSERT. Anything
+else that bypasses the mapper events needs scripts/rebuild_revenue.py.
+"""
+
+from datetime import date
+
+from sqlalchemy import delete, event, extract, func, inspect, insert, select, update
+
+from app import db
+from app.models import Property, RevenueRollup, TDTPayment
+
+DIMENSIONS = ('city', 'zip_code', 'dealer_id', 'month')
+DIRECT_DEALER = 0
+INSERT_CHUNK_SIZE = 5000
+IN_CLAUSE_CHUNK = 900
+
+
+def month_of(value):
+    return date(value.year, value.month, 1)
+
+
+def _apply(connection, cells):
+    """Add {(city, zip_code, dealer_id, month): [amount, count]} deltas to the rollup."""
+    table = RevenueRollup.__table__
+    for (city, zip_code, dealer_id, month), (amount, count) in cells.items():
+        if not amount and not count:
+            continue
+        where = (table.c.city == city) & (table.c.zip_code == zip_code) \
+            & (table.c.dealer_id == dealer_id) & (table.c.month == month)
+        result = connection.execute(
+            update(table).where(where)
+            .values(amount=table.c.amount + amount, payment_count=table.c.payment_count + count)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(
+                city=city, zip_code=zip_code, dealer_id=dealer_id, month=month,
+                amount=amount, payment_count=count
+            ))
+
+
+def _location(connection, property_id):
+    return connection.execute(
+        select(Property.city, Property.zip_code).where(Property.id == property_id)
+    ).one_or_none()
+
+
+def _cell(location, dealer_id, period_start):
+    return (location[0], location[1], dealer_id or DIRECT_DEALER, month_of(period_start))
+
+
+def _add(cells, key, amount, count):
+    cell = cells.setdefault(key, [0.0, 0])
+    cell[0] += amount
+    cell[1] += count
+
+
+def record_bulk_revenue(payments):
+    """Apply payments written with a bulk INSERT, which skips the mapper events.
+    `payments` are dicts with property_id, dealer_id, period_start and amount."""
+    payments = list(payments)
+    property_ids = list({p['property_id'] for p in payments})
+    locations = {}
+    for i in range(0, len(property_ids), IN_CLAUSE_CHUNK):
+        locations.update((pid, (city, zip_code)) for pid, city, zip_code in db.session.execute(
+            select(Property.id, Property.city, Property.zip_code)
+            .where(Property.id.in_(property_ids[i:i + IN_CLAUSE_CHUNK]))
+        ))
+
+    cells = {}
+    for p in payments:
+        _add(cells, _cell(locations[p['property_id']], p.get('dealer_id'), p['period_start']),
+             float(p['amount']), 1)
+    _apply(db.session.connection(), cells)
+
+
+def rebuild_revenue():
+    """Recompute the whole rollup from payments. Returns the number of cells."""
+    dealer = func.coalesce(TDTPayment.dealer_id, DIRECT_DEALER)
+    year = extract('year', TDTPayment.period_start)
+    month = extract('month', TDTPayment.period_start)
+    rows = db.session.execute(
+        select(Property.city, Property.zip_code, dealer, year, month,
+               func.sum(TDTPayment.amount), func.count(TDTPayment.id))
+        .join(Property, Property.id == TDTPayment.property_id)
+        .group_by(Property.city, Property.zip_code, dealer, year, month)
+    ).all()
+
+    records = [{
+        'city': city, 'zip_code': zip_code, 'dealer_id': dealer_id,
+        'month': date(int(y), int(m), 1), 'amount': float(amount or 0), 'payment_count': count,
+    } for city, zip_code, dealer_id, y, m, amount, count in rows]
+
+    db.session.execute(delete(RevenueRollup))
+    for i in range(0, len(records), INSERT_CHUNK_SIZE):
+        db.session.execute(insert(RevenueRollup), records[i:i + INSERT_CHUNK_SIZE])
+    db.session.commit()
+    return len(records)
+
+
+def query_revenue(group_by=(), city=None, zip_code=None, dealer_id=None, month_from=None, month_to=None):
+    """Sum rollup cells matching the filters, grouped by the given dimensions.
+    Returns rows of (*group_by values, amount, payment_count)."""
+    columns = [RevenueRollup.__table__.c[d] for d in group_by]
+    query = select(*columns, func.sum(RevenueRollup.amount), func.sum(RevenueRollup.payment_count))
+    if city is not None:
+        query = query.where(RevenueRollup.city == city)
+    if zip_code is not None:
+        query = query.where(RevenueRollup.zip_code == zip_code)
+    if dealer_id is not None:
+        query = query.where(RevenueRollup.dealer_id == dealer_id)
+    if month_from is not None:
+        query = query.where(RevenueRollup.month >= month_from)
+    if month_to is not None:
+        query = query.where(RevenueRollup.month <= month_to)
+    if columns:
+        query = query.group_by(*columns).order_by(*columns)
+    return db.session.execute(query).all()
+
+
+def _old_value(state, attr):
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    # Changed with no committed value recorded: it was NULL (active history loads it otherwise)
+    return None
+
+
+def _load_old_value_on_set(target, value, oldvalue, initiator):
+    pass  # Registered with active_history=True, which is what loads the old value
+
+
+for _attr in (TDTPayment.amount, TDTPayment.dealer_id, TDTPayment.period_start, TDTPayment.property_id,
+              Property.city, Property.zip_code):
+    event.listen(_attr, 'set', _load_old_value_on_set, active_history=True)
+
+
+@event.listens_for(TDTPayment, 'after_insert')
+def _payment_inserted(mapper, connection, target):
+    location = _location(connection, target.property_id)
+    if location is not None:
+        _apply(connection, {_cell(location, target.dealer_id, target.period_start): (float(target.amount or 0), 1)})
+
+
+@event.listens_for(TDTPayment, 'after_update')
+def _payment_updated(mapper, connection, target):
+    state = inspect(target)
+    tracked = ('amount', 'dealer_id', 'period_start', 'property_id')
+    if not any(state.attrs[attr].history.has_changes() for attr in tracked):
+        return
+
+    cells = {}
+    old_location = _location(connection, _old_value(state, 'property_id'))
+    if old_location is not None:
+        _add(cells, _cell(old_location, _old_value(state, 'dealer_id'), _old_value(state, 'period_start')),
+             -float(_old_value(state, 'amount') or 0), -1)
+    new_location = _location(connection, target.property_id)
+    if new_location is not None:
+        _add(cells, _cell(new_location, target.dealer_id, target.period_start), float(target.amount or 0), 1)
+    _apply(connection, cells)
+
+
+@event.listens_for(TDTPayment, 'after_delete')
+def _payment_deleted(mapper, connection, target):
+    location = _location(connection, target.property_id)
+    if location is not None:
+        _apply(connection, {_cell(location, target.dealer_id, target.period_start): (-float(target.amount or 0), -1)})
+
+
+@event.listens_for(Property, 'after_update')
+def _property_moved(mapper, connection, target):
+    state = inspect(target)
+    if not (state.attrs.city.history.has_changes() or state.attrs.zip_code.history.has_changes()):
+        return
+
+    old_location = (_old_value(state, 'city'), _old_value(state, 'zip_code'))
+    new_location = (target.city, target.zip_code)
+    cells = {}
+    for dealer_id, period_start, amount in connection.execute(
+        select(TDTPayment.dealer_id, TDTPayment.period_start, TDTPayment.amount)
+        .where(TDTPayment.property_id == target.id)
+    ):
+        amount = float(amount or 0)
+        _add(cells, _cell(old_location, dealer_id, period_start), -amount, -1)
+        _add(cells, _cell(new_location, dealer_id, period_start), amount, 1)
+    _apply(connection, cells)
@@ -1,46 +1,170 @@
-from flask import Blueprint, jsonify, request
-from app.models import Property, TDTPayment, Dealer
+from flask import Blueprint, jsonify, request, Response, stream_with_context, url_for
+from sqlalchemy import case, insert, select
+from sqlalchemy.exc import IntegrityError
+from app.models import Property, TDTPayment, Dealer, PaymentIdempotencyKey
+from app.http_cache import bump_data_version, conditional_get, response_cache
+from app.lookup_cache import lookup_cache
+from app.serializers import dumps, rows_response
+from app.search import MIN_INDEXED_TERM, SEARCH_COLUMNS, prefix_filter, search_filter
+from app.spatial import grid_index
+from app.summary import get_summary, record_bulk_payments
+from app.compliance_worker import mark_dirty
+from app.coverage import get_coverage_report, mask_to_months
+from app.property_detail import DETAIL_FIELDS, load_property_detail, detail_payload
+from app.registration import register_properties
+from app.rental_risk import SIGNALS as RISK_SIGNALS, TOP_RISK_FIELDS, signal_names, top_risk
+from app.id_allocator import next_transaction_ids
+from app.revenue import DIMENSIONS as REVENUE_DIMENSIONS, DIRECT_DEALER, query_revenue, record_bulk_revenue
 from app import db
+from datetime import datetime, date
+from bisect import bisect_right
+from operator import itemgetter
 
 bp = Blueprint('api', __name__, url_prefix='/api/v1')
 
+PROPERTY_LIST_FIELDS = (
+    'id', 'parcel_id', 'address', 'city', 'zip_code', 'lat', 'lng',
+    'tdt_number', 'is_registered', 'compliance_scenario'
+)
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+STREAM_CHUNK_SIZE = 1000
+IN_CLAUSE_CHUNK = 900
+
+
+def _chunks(values, size=IN_CLAUSE_CHUNK):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _parse_fields(default_fields):
+    """Resolve the ?fields= projection into Property columns. 'id' is always included."""
+    raw = request.args.get('fields')
+    if not raw:
+        names = list(default_fields)
+    else:
+        names = [f.strip() for f in raw.split(',') if f.strip()]
+        unknown = [f for f in names if f not in Property.__table__.columns]
+        if unknown:
+            return None, f"Unknown field(s): {', '.join(unknown)}"
+    if 'id' not in names:
+        names.insert(0, 'id')
+    return names, None
+
+
 @bp.route('/properties', methods=['GET'])
+@conditional_get('properties')
 def get_properties():
-    properties = Property.query.all()
-    return jsonify([{
-        'id': p.id,
-        'parcel_id': p.parcel_id,
-        'address': p.address,
-        'city': p.city,
-        'zip_code': p.zip_code,
-        'lat': p.lat,
-        'lng': p.lng,
-        'tdt_number': p.tdt_number,
-        'is_registered': p.is_registered,
-        'compliance_scenario': p.compliance_scenario
-    } for p in properties])
+    """List properties with keyset pagination on id.
+
+    Query params:
+        fields  - comma-separated column projection (default PROPERTY_LIST_FIELDS)
+        after   - cursor; only rows with id > after are returned
+        limit   - page size (default 500, max 5000)
+        format  - 'ndjson' streams every row after the cursor, one object per line
+    """
+    names, error = _parse_fields(PROPERTY_LIST_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
+
+    after = request.args.get('after', 0, type=int)
+    query = select(*[Property.__table__.c[n] for n in names]) \
+        .where(Property.id > after) \
+        .order_by(Property.id)
+
+    if request.args.get('format') == 'ndjson':
+        def generate():
+            rows = db.session.execute(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+            for row in rows:
+                yield dumps(dict(zip(names, row))) + b'\n'
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    rows = db.session.execute(query.limit(limit)).all()
+
+    headers = {}
+    if len(rows) == limit:
+        next_cursor = rows[-1][0]
+        next_args = request.args.to_dict()
+        next_args['after'] = next_cursor
+        headers['X-Next-Cursor'] = str(next_cursor)
+        headers['Link'] = f'<{url_for("api.get_properties", **next_args)}>; rel="next"'
+    return rows_response(names, rows, headers=headers)
+
+MAP_POINT_FIELDS = (
+    'id', 'parcel_id', 'address', 'city', 'zip_code', 'lat', 'lng', 'tdt_number',
+    'is_registered', 'compliance_scenario', 'homestead_status', 'zoning_type'
+)
+
 
 @bp.route('/properties/map', methods=['GET'])
+@conditional_get('properties')
 def get_properties_for_map():
-    """Get properties with coordinates for map display"""
-    properties = Property.query.filter(
-        Property.lat.isnot(None),
-        Property.lng.isnot(None)
-    ).all()
-    return jsonify([{
-        'id': p.id,
-        'parcel_id': p.parcel_id,
-        'address': p.address,
-        'city': p.city,
-        'zip_code': p.zip_code,
-        'lat': p.lat,
-        'lng': p.lng,
-        'tdt_number': p.tdt_number,
-        'is_registered': p.is_registered,
-        'compliance_scenario': p.compliance_scenario,
-        'homestead_status': p.homestead_status,
-        'zoning_type': p.zoning_type
-    } for p in properties])
+    """Get properties with coordinates for map display.
+
+    ?bbox=west,south,east,north (required) and ?zoom=N limit the response to
+    the viewport: server-side clusters at low zoom or in dense viewports, raw
+    points otherwise. Optional filters: ?scenario=1..4, ?registered=true|false.
+    """
+    columns = [Property.__table__.c[n] for n in MAP_POINT_FIELDS]
+    bbox = request.args.get('bbox')
+
+    if not bbox:
+        return jsonify({'error': 'bbox is required: west,south,east,north'}), 400
+
+    try:
+        west, south, east, north = (float(v) for v in bbox.split(','))
+    except ValueError:
+        return jsonify({'error': 'bbox must be west,south,east,north'}), 400
+
+    zoom = max(0, min(request.args.get('zoom', 10, type=int), 22))
+    scenario = request.args.get('scenario', type=int)
+    registered = request.args.get('registered')
+    if registered is not None:
+        registered = registered.lower() in ('1', 'true', 'yes')
+
+    mode, total, result = grid_index.query(west, south, east, north, zoom,
+                                           scenario=scenario, registered=registered)
+
+    if mode == 'clusters':
+        return jsonify({'mode': mode, 'zoom': zoom, 'total': total, 'clusters': result})
+
+    rows = db.session.execute(select(*columns).where(Property.id.in_(result))).all() if result else []
+    return rows_response(MAP_POINT_FIELDS, rows,
+                         envelope={'mode': mode, 'zoom': zoom, 'total': total}, key='points')
+
+TYPEAHEAD_FIELDS = ('id', 'address', 'city', 'parcel_id', 'tdt_number')
+TYPEAHEAD_MIN_CHARS = 2
+TYPEAHEAD_DEFAULT_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 50
+
+
+@bp.route('/properties/typeahead', methods=['GET'])
+def typeahead_properties():
+    """Top matches for a partial address, parcel ID or TDT number (?q=, ?limit=).
+
+    Terms of three or more characters use the trigram search index and rank
+    prefix matches first; shorter terms match prefixes only.
+    """
+    term = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', TYPEAHEAD_DEFAULT_LIMIT, type=int), TYPEAHEAD_MAX_LIMIT))
+    
+    if len(term) < TYPEAHEAD_MIN_CHARS:
+        return jsonify([])
+    
+    query = select(*[Property.__table__.c[n] for n in TYPEAHEAD_FIELDS])
+    
+    if len(term) >= MIN_INDEXED_TERM:
+        prefix = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        is_prefix = db.or_(*[getattr(Property, column).ilike(prefix, escape='\\') for column in SEARCH_COLUMNS])
+        query = query.where(search_filter(term)) \
+            .order_by(case((is_prefix, 0), else_=1), Property.address, Property.id)
+    else:
+        query = query.where(prefix_filter(term)).order_by(Property.id)
+    
+    rows = db.session.execute(query.limit(limit)).all()
+    return rows_response(TYPEAHEAD_FIELDS, rows)
 
 @bp.route('/properties/<int:id>', methods=['GET'])
 def get_property(id):
@@ -60,6 +184,18 @@ def get_property(id):
         'homestead_status': p.homestead_status
     })
 
+@bp.route('/properties/<int:id>/full', methods=['GET'])
+def get_property_full(id):
+    """Property with payments, values, buildings, land, exemptions and latest sales in one payload"""
+    prop, sales = load_property_detail(id, fields=DETAIL_FIELDS)
+    if prop is None:
+        return jsonify({'error': 'Property not found'}), 404
+    return Response(dumps(detail_payload(prop, sales, DETAIL_FIELDS)), mimetype='application/json')
+
+LOOKUP_COLUMNS = ('id', 'parcel_id', 'address', 'tdt_number', 'is_registered')
+MAX_LOOKUP_BATCH = 10000
+
+
 @bp.route('/properties/lookup', methods=['GET'])
 def lookup_property():
     """Lookup property by parcel ID or TDT number - for dealer integration"""
@@ -67,22 +203,99 @@ def lookup_property():
     tdt_number = request.args.get('tdt_number')
     
     if parcel_id:
-        p = Property.query.filter_by(parcel_id=parcel_id).first()
+        field, value = 'parcel_id', parcel_id
     elif tdt_number:
-        p = Property.query.filter_by(tdt_number=tdt_number).first()
+        field, value = 'tdt_number', tdt_number
     else:
         return jsonify({'error': 'Provide parcel_id or tdt_number'}), 400
     
-    if not p:
-        return jsonify({'error': 'Property not found'}), 404
+    result = lookup_cache.get((field, value))
+    if result is None:
+        row = db.session.execute(
+            select(*[Property.__table__.c[n] for n in LOOKUP_COLUMNS])
+            .where(Property.__table__.c[field] == value)
+        ).first()
+        if not row:
+            return jsonify({'error': 'Property not found'}), 404
+        result = dict(zip(LOOKUP_COLUMNS, row))
+        lookup_cache.put((field, value), result)
     
-    return jsonify({
-        'id': p.id,
-        'parcel_id': p.parcel_id,
-        'address': p.address,
-        'tdt_number': p.tdt_number,
-        'is_registered': p.is_registered
-    })
+    return jsonify(result)
+
+@bp.route('/properties/lookup/batch', methods=['POST'])
+def lookup_properties_batch():
+    """Resolve many parcel IDs and/or TDT numbers at once - for dealer integration.
+
+    Body: {"parcel_ids": [...], "tdt_numbers": [...]} (up to 10k values total).
+    Returns each requested value mapped to its property, or null if not found.
+    """
+    data = request.get_json(silent=True) or {}
+    requested = {
+        'parcel_id': data.get('parcel_ids') or [],
+        'tdt_number': data.get('tdt_numbers') or [],
+    }
+    
+    if not all(isinstance(v, list) for v in requested.values()):
+        return jsonify({'error': 'parcel_ids and tdt_numbers must be lists'}), 400
+    total = sum(len(v) for v in requested.values())
+    if not total:
+        return jsonify({'error': 'Provide parcel_ids or tdt_numbers'}), 400
+    if total > MAX_LOOKUP_BATCH:
+        return jsonify({'error': f'Batch exceeds {MAX_LOOKUP_BATCH} lookups'}), 400
+    
+    columns = [Property.__table__.c[n] for n in LOOKUP_COLUMNS]
+    response = {'found': 0, 'not_found': 0}
+    
+    for field, values in requested.items():
+        values = {str(v) for v in values}
+        matches = {}
+        for chunk in _chunks(values):
+            for row in db.session.execute(select(*columns).where(Property.__table__.c[field].in_(chunk))):
+                result = dict(zip(LOOKUP_COLUMNS, row))
+                matches[result[field]] = result
+        
+        response[f'{field}s'] = {value: matches.get(value) for value in values}
+        response['found'] += len(matches)
+        response['not_found'] += len(values) - len(matches)
+    
+    return jsonify(response)
+
+@bp.route('/properties/register/batch', methods=['POST'])
+def register_properties_batch():
+    """Register many properties in one transaction.
+
+    Body: {"property_ids": [...]} or {"parcel_ids": [...]} (up to 10k), optional "year"
+    for the TDT numbers. Each property gets a result with status 'registered',
+    'already_registered' or 'not_found' and its TDT number.
+    """
+    data = request.get_json(silent=True) or {}
+    if 'property_ids' in data:
+        key_field, keys = 'id', data['property_ids']
+    else:
+        key_field, keys = 'parcel_id', data.get('parcel_ids')
+    
+    if not isinstance(keys, list) or not keys:
+        return jsonify({'error': 'Provide a non-empty "property_ids" or "parcel_ids" list'}), 400
+    if len(keys) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Batch exceeds {MAX_BATCH_SIZE} properties'}), 400
+    try:
+        keys = [int(k) for k in keys] if key_field == 'id' else [str(k) for k in keys]
+        year = int(data['year']) if data.get('year') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'property_ids and year must be integers'}), 400
+    
+    results = register_properties(keys, key_field=key_field, year=year)
+    
+    counts = {'registered': 0, 'already_registered': 0, 'not_found': 0}
+    for result in results:
+        counts[result['status']] += 1
+    
+    return jsonify({**counts, 'results': results}), 201 if counts['registered'] else 200
+
+@bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Hit/miss counters for the in-process caches"""
+    return jsonify({'lookup': lookup_cache.stats(), 'responses': response_cache.stats()})
 
 @bp.route('/payments', methods=['POST'])
 def record_payment():
@@ -97,6 +310,15 @@ def record_payment():
         if field not in data:
             return jsonify({'error': f'Missing required field: {field}'}), 400
     
+    # The revenue rollup buckets payments by the month of period_start, so both must be dates
+    try:
+        period_start = date.fromisoformat(data['period_start'])
+        period_end = date.fromisoformat(data['period_end'])
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid value: {e}'}), 400
+    if period_end < period_start:
+        return jsonify({'error': 'period_end is before period_start'}), 400
+    
     prop = Property.query.get(data['property_id'])
     if not prop:
         return jsonify({'error': 'Property not found'}), 404
@@ -105,8 +327,8 @@ def record_payment():
         property_id=data['property_id'],
         dealer_id=data.get('dealer_id'),
         amount=data['amount'],
-        period_start=data['period_start'],
-        period_end=data['period_end']
+        period_start=period_start,
+        period_end=period_end
     )
     
     db.session.add(payment)
@@ -114,34 +336,283 @@ def record_payment():
     
     return jsonify({'success': True, 'payment_id': payment.id}), 201
 
+MAX_BATCH_SIZE = 10000
+
+
+def _parse_batch_payment(item):
+    """Validate one batch item. Returns (row, error)."""
+    if not isinstance(item, dict):
+        return None, 'Item must be an object'
+    
+    for field in ('property_id', 'amount', 'period_start', 'period_end'):
+        if item.get(field) in (None, ''):
+            return None, f'Missing required field: {field}'
+    
+    try:
+        row = {
+            'property_id': int(item['property_id']),
+            'dealer_id': int(item['dealer_id']) if item.get('dealer_id') is not None else None,
+            'amount': float(item['amount']),
+            'period_start': date.fromisoformat(item['period_start']),
+            'period_end': date.fromisoformat(item['period_end']),
+            'expected_amount': float(item['expected_amount']) if item.get('expected_amount') is not None else None,
+            'payment_date': datetime.utcnow(),
+            'notes': item.get('notes'),
+        }
+    except (TypeError, ValueError) as e:
+        return None, f'Invalid value: {e}'
+    
+    if row['period_end'] < row['period_start']:
+        return None, 'period_end is before period_start'
+    return row, None
+
+
+@bp.route('/payments/batch', methods=['POST'])
+def record_payments_batch():
+    """Bulk endpoint for platform dealers to submit many TDT payments at once.
+
+    Body: {"payments": [{property_id, amount, period_start, period_end,
+    dealer_id?, expected_amount?, notes?, idempotency_key?}, ...]}
+
+    Valid items are inserted in a single transaction; each item gets a result
+    with status 'created', 'duplicate' (idempotency key already used) or 'error'.
+    """
+    data = request.get_json(silent=True)
+    items = data.get('payments') if isinstance(data, dict) else None
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Provide a non-empty "payments" list'}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Batch exceeds {MAX_BATCH_SIZE} payments'}), 400
+    
+    results = [None] * len(items)
+    parsed = {}
+    keys = {}
+    
+    for index, item in enumerate(items):
+        row, error = _parse_batch_payment(item)
+        if error:
+            results[index] = {'index': index, 'status': 'error', 'error': error}
+            continue
+        parsed[index] = row
+        key = item.get('idempotency_key')
+        if key is not None:
+            keys[index] = str(key)
+    
+    existing_keys = {}
+    for chunk in _chunks(set(keys.values())):
+        existing_keys.update(db.session.execute(
+            select(PaymentIdempotencyKey.key, PaymentIdempotencyKey.payment_id)
+            .where(PaymentIdempotencyKey.key.in_(chunk))
+        ).all())
+    
+    property_ids = {row['property_id'] for row in parsed.values()}
+    known_properties = set()
+    for chunk in _chunks(property_ids):
+        known_properties.update(db.session.scalars(select(Property.id).where(Property.id.in_(chunk))))
+    
+    dealer_ids = {row['dealer_id'] for row in parsed.values() if row['dealer_id'] is not None}
+    known_dealers = set()
+    for chunk in _chunks(dealer_ids):
+        known_dealers.update(db.session.scalars(select(Dealer.id).where(Dealer.id.in_(chunk))))
+    
+    to_insert = []
+    seen_keys = {}
+    for index, row in parsed.items():
+        key = keys.get(index)
+        if key in existing_keys:
+            results[index] = {'index': index, 'status': 'duplicate', 'payment_id': existing_keys[key]}
+        elif key in seen_keys:
+            results[index] = {'index': index, 'status': 'duplicate', 'duplicate_of': seen_keys[key]}
+        elif row['property_id'] not in known_properties:
+            results[index] = {'index': index, 'status': 'error', 'error': 'Property not found'}
+        elif row['dealer_id'] is not None and row['dealer_id'] not in known_dealers:
+            results[index] = {'index': index, 'status': 'error', 'error': 'Dealer not found'}
+        else:
+            if key is not None:
+                seen_keys[key] = index
+            to_insert.append(index)
+    
+    if to_insert:
+        # One block reservation for the whole batch instead of one per row
+        for i, transaction_id in zip(to_insert, next_transaction_ids(len(to_insert))):
+            parsed[i]['transaction_id'] = transaction_id
+        try:
+            created = db.session.execute(
+                insert(TDTPayment).returning(TDTPayment.id, TDTPayment.transaction_id,
+                                             sort_by_parameter_order=True),
+                [parsed[i] for i in to_insert]
+            ).all()
+            
+            key_rows = [{'key': keys[i], 'payment_id': payment_id}
+                        for i, (payment_id, _) in zip(to_insert, created) if i in keys]
+            if key_rows:
+                db.session.execute(insert(PaymentIdempotencyKey), key_rows)
+            
+            record_bulk_payments(len(to_insert), sum(parsed[i]['amount'] for i in to_insert))
+            record_bulk_revenue(parsed[i] for i in to_insert)
+            bump_data_version('payments')
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': 'Batch conflicted with a concurrent submission; retry it'}), 409
+        
+        # Bulk INSERT skips the mapper events the compliance worker listens on
+        mark_dirty({parsed[i]['property_id'] for i in to_insert})
+        
+        for i, (payment_id, transaction_id) in zip(to_insert, created):
+            results[i] = {'index': i, 'status': 'created', 'payment_id': payment_id,
+                          'transaction_id': transaction_id}
+        for result in results:
+            if result.get('duplicate_of') is not None:
+                result['payment_id'] = results[result.pop('duplicate_of')]['payment_id']
+    
+    counts = {'created': 0, 'duplicate': 0, 'error': 0}
+    for result in results:
+        counts[result['status']] += 1
+    
+    return jsonify({**counts, 'results': results}), 201 if counts['created'] else 200
+
 @bp.route('/dealers', methods=['GET'])
+@conditional_get('dealers')
 def get_dealers():
-    dealers = Dealer.query.filter_by(is_active=True).filter(~Dealer.name.like('Local Rentals%')).all()
-    return jsonify([{
-        'id': d.id,
-        'name': d.name,
-        'dealer_type': d.dealer_type
-    } for d in dealers])
+    rows = db.session.execute(
+        select(Dealer.id, Dealer.name, Dealer.dealer_type)
+        .where(Dealer.is_active.is_(True), ~Dealer.name.like('Local Rentals%'))
+    ).all()
+    return rows_response(('id', 'name', 'dealer_type'), rows)
 
 @bp.route('/stats', methods=['GET'])
+@conditional_get('properties', 'payments')
 def get_stats():
     """Get compliance statistics"""
-    from sqlalchemy import func
+    summary = get_summary()
     
-    total = Property.query.count()
-    registered = Property.query.filter_by(is_registered=True).count()
+    return jsonify({
+        'total_properties': summary['total_properties'],
+        'registered_properties': summary['registered_properties'],
+        'unregistered_properties': summary['total_properties'] - summary['registered_properties'],
+        **{f'scenario_{i}': summary[f'scenario_{i}'] for i in range(1, 5)},
+        'total_tdt_collected': float(summary['total_tdt_collected'])
+    })
+
+COVERAGE_FIELDS = ('property_id', 'parcel_id', 'gap_months', 'overlap_months')
+
+
+def _current_month():
+    # The default year and through-month come from today's date
+    return date.today().strftime('%Y-%m')
+
+
+@bp.route('/coverage', methods=['GET'])
+@conditional_get('properties', 'payments', vary=_current_month)
+def get_coverage():
+    """Months of a tax year not covered (or covered twice) by a registered property's payments.
+
+    Query params:
+        year    - tax year (default: current year)
+        through - last month to check (default: last full month)
+        issue   - 'gaps' or 'overlaps' to list only those properties
+        after   - cursor; only properties with id > after are returned
+        limit   - page size (default 500, max 5000)
+    """
+    year = request.args.get('year', date.today().year, type=int)
+    through = request.args.get('through', type=int)
+    issue = request.args.get('issue')
+    if issue not in (None, 'gaps', 'overlaps'):
+        return jsonify({'error': "issue must be 'gaps' or 'overlaps'"}), 400
     
-    scenario_counts = {}
-    for i in range(1, 5):
-        scenario_counts[f'scenario_{i}'] = Property.query.filter_by(compliance_scenario=i).count()
+    report = get_coverage_report(year, through)
+    after = request.args.get('after', 0, type=int)
+    limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
     
-    total_collected = db.session.query(func.sum(TDTPayment.amount)).scalar() or 0
+    rows = []
+    start = bisect_right(report['rows'], after, key=itemgetter(0))
+    for property_id, parcel_id, gap_mask, overlap_mask in report['rows'][start:]:
+        if (issue == 'gaps' and not gap_mask) or (issue == 'overlaps' and not overlap_mask):
+            continue
+        rows.append((property_id, parcel_id, mask_to_months(gap_mask), mask_to_months(overlap_mask)))
+        if len(rows) == limit:
+            break
     
-    return jsonify({
-        'total_properties': total,
-        'registered_properties': registered,
-        'unregistered_properties': total - registered,
-        **scenario_counts,
-        'total_tdt_collected': float(total_collected)
-    })
+    headers = {}
+    if len(rows) == limit:
+        next_args = request.args.to_dict()
+        next_args['after'] = rows[-1][0]
+        headers['X-Next-Cursor'] = str(rows[-1][0])
+        headers['Link'] = f'<{url_for("api.get_coverage", **next_args)}>; rel="next"'
+    
+    envelope = {key: report[key] for key in
+                ('year', 'through', 'with_gaps', 'with_overlaps', 'fully_covered')}
+    envelope['registered_properties'] = report['properties']
+    return rows_response(COVERAGE_FIELDS, rows, envelope=envelope, key='properties', headers=headers)
 
+
+def _parse_month(value):
+    year, month = value.split('-')
+    return date(int(year), int(month), 1)
+
+
+@bp.route('/revenue', methods=['GET'])
+@conditional_get('properties', 'payments')
+def get_revenue():
+    """TDT revenue from the rollup, grouped by any of city, zip_code, dealer_id, month.
+
+    Query params:
+        group_by   - comma-separated dimensions (default: none, grand total)
+        city, zip_code
+        dealer_id  - dealer id or 'direct'
+        from, to   - YYYY-MM month range (inclusive)
+    """
+    group_by = tuple(d.strip() for d in request.args.get('group_by', '').split(',') if d.strip())
+    unknown = [d for d in group_by if d not in REVENUE_DIMENSIONS]
+    if unknown:
+        return jsonify({'error': f"Unknown dimensions: {', '.join(unknown)}",
+                        'dimensions': list(REVENUE_DIMENSIONS)}), 400
+    
+    dealer_id = request.args.get('dealer_id')
+    if dealer_id == 'direct':
+        dealer_id = DIRECT_DEALER
+    elif dealer_id is not None:
+        if not dealer_id.isdigit():
+            return jsonify({'error': "dealer_id must be an id or 'direct'"}), 400
+        dealer_id = int(dealer_id)
+    
+    try:
+        month_from = _parse_month(request.args['from']) if request.args.get('from') else None
+        month_to = _parse_month(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'error': 'from and to must be YYYY-MM'}), 400
+    
+    rows = query_revenue(group_by, city=request.args.get('city'), zip_code=request.args.get('zip_code'),
+                         dealer_id=dealer_id, month_from=month_from, month_to=month_to)
+    rows = [(*row[:-2], round(float(row[-2] or 0), 2), int(row[-1] or 0)) for row in rows]
+    total = round(sum(row[-2] for row in rows), 2)
+    
+    return rows_response((*group_by, 'amount', 'payment_count'), rows,
+                         envelope={'group_by': list(group_by), 'total': total}, key='cells')
+
+
+RISK_FIELDS = (*TOP_RISK_FIELDS, 'score', 'signals')
+
+
+@bp.route('/risk', methods=['GET'])
+@conditional_get('properties', 'risk_scores')
+def get_rental_risk():
+    """Properties most likely to be unregistered vacation rentals, highest score first.
+
+    Query params:
+        limit              - number of properties (default 500, max 5000)
+        min_score          - only scores at or above this (0-100)
+        include_registered - 'true' to rank registered properties too
+    """
+    limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    min_score = request.args.get('min_score', 0, type=int)
+    include_registered = request.args.get('include_registered', '').lower() == 'true'
+    
+    rows = top_risk(limit, min_score=min_score, include_registered=include_registered)
+    scored_at = rows[0].scored_at if rows else None
+    rows = [(*row[:len(TOP_RISK_FIELDS)], row.score, signal_names(row.signals)) for row in rows]
+    
+    return rows_response(RISK_FIELDS, rows, envelope={'scored_at': scored_at, 'signals': dict(RISK_SIGNALS)},
+                         key='properties')
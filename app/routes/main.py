@@ -1,23 +1,18 @@
 from flask import Blueprint, render_template, current_app
-from app.models import Property, TDTPayment, Dealer
-from app import db
-from sqlalchemy import func
+from app.models import TDTPayment, Dealer
+from app.summary import get_summary
 
 bp = Blueprint('main', __name__)
 
 @bp.route('/')
 def dashboard():
-    total_properties = Property.query.count()
-    registered_count = Property.query.filter_by(is_registered=True).count()
+    summary = get_summary()
+    total_properties = summary['total_properties']
+    registered_count = summary['registered_properties']
     
-    scenario_counts = {
-        1: Property.query.filter_by(compliance_scenario=1).count(),
-        2: Property.query.filter_by(compliance_scenario=2).count(),
-        3: Property.query.filter_by(compliance_scenario=3).count(),
-        4: Property.query.filter_by(compliance_scenario=4).count(),
-    }
+    scenario_counts = {i: summary[f'scenario_{i}'] for i in range(1, 5)}
     
-    total_tdt_collected = db.session.query(func.sum(TDTPayment.amount)).scalar() or 0
+    total_tdt_collected = summary['total_tdt_collected']
     dealer_count = Dealer.query.count()
     
     recent_transactions = TDTPayment.query.order_by(TDTPayment.created_at.desc()).limit(10).all()
@@ -1,14 +1,70 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from app.models import TDTPayment, Property, Dealer
 from app import db
-from datetime import datetime
+from app.query_budget import query_budget
+from app.summary import get_summary
+from sqlalchemy.orm import joinedload
+from datetime import datetime, timedelta
 
 bp = Blueprint('payments', __name__, url_prefix='/payments')
 
+PER_PAGE = 50
+MAX_PER_PAGE = 200
+# Page count query (the summary row when unfiltered), page rows (with property and dealer
+# joined), dealer filter options
+LEDGER_QUERY_BUDGET = 3
+
 @bp.route('/')
 def list_payments():
-    payments = TDTPayment.query.order_by(TDTPayment.created_at.desc()).all()
-    return render_template('payments/list.html', payments=payments)
+    dealer_filter = request.args.get('dealer', '')
+    period_filter = request.args.get('period', '')
+    verified_filter = request.args.get('verified', '')
+    page = request.args.get('page', 1, type=int)
+    per_page = max(1, min(request.args.get('per_page', PER_PAGE, type=int), MAX_PER_PAGE))
+    
+    with query_budget(LEDGER_QUERY_BUDGET, 'payments ledger'):
+        filtered = False
+        query = TDTPayment.query.options(
+            joinedload(TDTPayment.property).load_only(Property.id, Property.address),
+            joinedload(TDTPayment.dealer).load_only(Dealer.id, Dealer.name),
+        )
+        
+        if dealer_filter == 'direct':
+            query = query.filter(TDTPayment.dealer_id.is_(None))
+            filtered = True
+        elif dealer_filter.isdigit():
+            query = query.filter(TDTPayment.dealer_id == int(dealer_filter))
+            filtered = True
+        
+        if period_filter:
+            try:
+                month_start = datetime.strptime(period_filter, '%Y-%m').date()
+            except ValueError:
+                period_filter = ''
+            else:
+                month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+                query = query.filter(TDTPayment.period_start <= month_end, TDTPayment.period_end >= month_start)
+                filtered = True
+        
+        if verified_filter in ('yes', 'no'):
+            query = query.filter(TDTPayment.verified.is_(verified_filter == 'yes'))
+            filtered = True
+        
+        # Counting the whole ledger reads every payment; the summary keeps that count
+        pagination = query.order_by(TDTPayment.created_at.desc(), TDTPayment.id.desc()) \
+            .paginate(page=page, per_page=per_page, error_out=False, count=filtered)
+        if not filtered:
+            pagination.total = get_summary()['total_payments']
+        dealers = Dealer.query.order_by(Dealer.name).all()
+        
+        return render_template('payments/list.html',
+            payments=pagination.items,
+            pagination=pagination,
+            dealers=dealers,
+            dealer_filter=dealer_filter,
+            period_filter=period_filter,
+            verified_filter=verified_filter
+        )
 
 @bp.route('/add', methods=['GET', 'POST'])
 def add_payment():
@@ -30,9 +86,12 @@ def add_payment():
         flash('Payment recorded successfully.', 'success')
         return redirect(url_for('payments.list_payments'))
     
-    properties = Property.query.all()
+    # The property picker queries /api/v1/properties/typeahead; only a preselected property is loaded here
+    selected_property = None
+    if request.args.get('property_id', type=int):
+        selected_property = db.session.get(Property, request.args.get('property_id', type=int))
     dealers = Dealer.query.filter_by(is_active=True).filter(~Dealer.name.like('Local Rentals%')).all()
-    return render_template('payments/add.html', properties=properties, dealers=dealers)
+    return render_template('payments/add.html', selected_property=selected_property, dealers=dealers)
 
 @bp.route('/<int:id>')
 def view_payment(id):
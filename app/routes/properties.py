@@ -1,41 +1,60 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify, abort
 from app.models import Property
 from app import db
+from app.search import search_filter
+from app.summary import get_summary
+from app.property_detail import DETAIL_QUERY_COUNT, load_property_detail
+from app.query_budget import query_budget
+from app.id_allocator import generate_tdt_number
 from datetime import datetime
-import random
 
 bp = Blueprint('properties', __name__, url_prefix='/properties')
 
-def generate_tdt_number():
-    year = datetime.now().year
-    random_num = random.randint(100000, 999999)
-    return f"TDT-{year}-{random_num}"
+PER_PAGE = 50
+MAX_PER_PAGE = 200
+# Ties break on id in the same direction, so each sort walks its (column, id) index without a sort step
+SORT_OPTIONS = {
+    'newest': (Property.id.desc(),),
+    'oldest': (Property.id.asc(),),
+    'address': (Property.address.asc(), Property.id.asc()),
+    'city': (Property.city.asc(), Property.id.asc()),
+    'parcel_id': (Property.parcel_id.asc(),),
+    'tdt_number': (Property.tdt_number.asc(), Property.id.asc()),
+}
 
 @bp.route('/')
 def list_properties():
     scenario_filter = request.args.get('scenario', type=int)
     search = request.args.get('search', '')
+    sort = request.args.get('sort', 'newest')
+    if sort not in SORT_OPTIONS:
+        sort = 'newest'
+    page = request.args.get('page', 1, type=int)
+    per_page = max(1, min(request.args.get('per_page', PER_PAGE, type=int), MAX_PER_PAGE))
     
     query = Property.query
     
     if scenario_filter:
         query = query.filter_by(compliance_scenario=scenario_filter)
     
-    if search:
-        query = query.filter(
-            db.or_(
-                Property.address.ilike(f'%{search}%'),
-                Property.parcel_id.ilike(f'%{search}%'),
-                Property.tdt_number.ilike(f'%{search}%')
-            )
-        )
+    if search.strip():
+        query = query.filter(search_filter(search))
+    
+    query = query.order_by(*SORT_OPTIONS[sort])
     
-    properties = query.order_by(Property.created_at.desc()).all()
+    # Unfiltered totals come from the maintained summary instead of a COUNT(*) over the roll
+    filtered = bool(scenario_filter or search.strip())
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False, count=filtered)
+    if not filtered:
+        pagination.total = get_summary()['total_properties']
     
     return render_template('properties/list.html', 
-        properties=properties,
+        properties=pagination.items,
+        pagination=pagination,
         scenario_filter=scenario_filter,
-        search=search
+        search=search,
+        sort=sort,
+        sort_options=SORT_OPTIONS
     )
 
 @bp.route('/add', methods=['GET', 'POST'])
@@ -65,9 +84,14 @@ def add_property():
 
 @bp.route('/<int:id>')
 def view_property(id):
-    prop = Property.query.get_or_404(id)
-    google_api_key = current_app.config.get('GOOGLE_API_KEY', '')
-    return render_template('properties/view.html', property=prop, google_api_key=google_api_key)
+    # The template must not lazy-load anything the loader didn't
+    with query_budget(DETAIL_QUERY_COUNT, 'property detail'):
+        prop, sales = load_property_detail(id)
+        if prop is None:
+            abort(404)
+        google_api_key = current_app.config.get('GOOGLE_API_KEY', '')
+        return render_template('properties/view.html', property=prop, sales=sales,
+                               google_api_key=google_api_key)
 
 @bp.route('/<int:id>/edit', methods=['GET', 'POST'])
 def edit_property(id):
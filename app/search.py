@@ -0,0 +1,113 @@
+"""
+Substring search index for the property list (address, parcel ID, TDT number).
+
+SQLite: an external-content FTS5 table using the trigram tokenizer, kept in
+sync with `properties` by triggers, so every writer (routes, scripts, raw SQL)
+maintains it. Trigram MATCH answers `%term%` queries without scanning the table.
+
+PostgreSQL: pg_trgm GIN indexes on the three columns, which the planner uses
+directly for ILIKE '%term%'.
+
+Terms shorter than three characters can't use a trigram index. The typeahead
+matches them as prefixes through `prefix_filter()`, a range on the lower()
+expression indexes declared on Property; the property list falls back to a
+plain ILIKE.
+"""
+
+import logging
+
+from sqlalchemy import func, select, text
+
+from app import db
+from app.models import Property
+
+logger = logging.getLogger(__name__)
+
+SEARCH_COLUMNS = ('address', 'parcel_id', 'tdt_number')
+MIN_INDEXED_TERM = 3
+
+_SQLITE_DDL = (
+    """CREATE VIRTUAL TABLE property_search USING fts5(
+        address, parcel_id, tdt_number,
+        content='properties', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS property_search_ai AFTER INSERT ON properties BEGIN
+        INSERT INTO property_search(rowid, address, parcel_id, tdt_number)
+        VALUES (new.id, new.address, new.parcel_id, new.tdt_number);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS property_search_ad AFTER DELETE ON properties BEGIN
+        INSERT INTO property_search(property_search, rowid, address, parcel_id, tdt_number)
+        VALUES ('delete', old.id, old.address, old.parcel_id, old.tdt_number);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS property_search_au
+        AFTER UPDATE OF address, parcel_id, tdt_number ON properties BEGIN
+        INSERT INTO property_search(property_search, rowid, address, parcel_id, tdt_number)
+        VALUES ('delete', old.id, old.address, old.parcel_id, old.tdt_number);
+        INSERT INTO property_search(rowid, address, parcel_id, tdt_number)
+        VALUES (new.id, new.address, new.parcel_id, new.tdt_number);
+    END""",
+    "INSERT INTO property_search(property_search) VALUES ('rebuild')",
+)
+
+_POSTGRES_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS idx_properties_address_trgm ON properties USING gin (address gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_properties_parcel_trgm ON properties USING gin (parcel_id gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_properties_tdt_trgm ON properties USING gin (tdt_number gin_trgm_ops)",
+)
+
+_fts_available = False
+
+
+def ensure_search_index():
+    """Create the search index for the current database if it doesn't exist yet."""
+    global _fts_available
+    engine = db.engine
+
+    try:
+        with engine.begin() as conn:
+            if engine.dialect.name == 'sqlite':
+                exists = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='property_search'"
+                )).first()
+                if not exists:
+                    for statement in _SQLITE_DDL:
+                        conn.execute(text(statement))
+                _fts_available = True
+            elif engine.dialect.name == 'postgresql':
+                for statement in _POSTGRES_DDL:
+                    conn.execute(text(statement))
+    except Exception as e:
+        # Old SQLite without the trigram tokenizer, or no rights to create the extension
+        logger.warning("Property search index unavailable, falling back to ILIKE: %s", e)
+
+
+def search_filter(term):
+    """Return a WHERE clause matching properties whose address, parcel ID or TDT number contains term."""
+    term = term.strip()
+
+    if _fts_available and len(term) >= MIN_INDEXED_TERM:
+        phrase = '"' + term.replace('"', '""') + '"'
+        return Property.id.in_(
+            select(text('rowid')).select_from(text('property_search'))
+            .where(text('property_search MATCH :phrase').bindparams(phrase=phrase))
+        )
+
+    pattern = f'%{term}%'
+    return db.or_(*[getattr(Property, column).ilike(pattern) for column in SEARCH_COLUMNS])
+
+
+def prefix_filter(term):
+    """Return a WHERE clause matching properties whose address, parcel ID or TDT number starts with term.
+
+    Each column is matched as a range on lower(column), which the lower()
+    indexes answer for any term length; the ILIKE rechecks the range rows.
+    """
+    low = term.strip().lower()
+    high = low[:-1] + chr(ord(low[-1]) + 1)
+    prefix = low.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    columns = [getattr(Property, name) for name in SEARCH_COLUMNS]
+    return db.or_(*[
+        db.and_(func.lower(column) >= low, func.lower(column) < high, column.ilike(prefix, escape='\\'))
+        for column in columns
+    ])
@@ -0,0 +1,106 @@
+"""
+Fast serialization for API list endpoints.
+
+List endpoints select plain column tuples (no ORM hydration or identity map)
+and hand them to `rows_response`, which encodes with orjson when it is
+installed and negotiates the representation from the Accept header (or
+?format=):
+
+    application/json                   list of objects (default)
+    application/vnd.tdt.columnar+json  {"columns": [...], "count": n, "data": {column: [values]}}
+    application/x-msgpack              the columnar form, msgpack-encoded (needs msgpack)
+
+The columnar forms repeat no keys, which roughly halves the payload for wide
+lists and decodes straight into dataframes on the client side.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = 'application/json'
+COLUMNAR_JSON = 'application/vnd.tdt.columnar+json'
+MSGPACK = 'application/x-msgpack'
+
+FORMAT_ALIASES = {
+    'json': JSON,
+    'columnar': COLUMNAR_JSON,
+    'msgpack': MSGPACK,
+}
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(obj):
+    """Encode obj as JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode()
+
+
+def available_formats():
+    formats = [JSON, COLUMNAR_JSON]
+    if msgpack is not None:
+        formats.append(MSGPACK)
+    return formats
+
+
+def negotiate_format():
+    """Pick the response representation from ?format= or the Accept header."""
+    requested = FORMAT_ALIASES.get(request.args.get('format', ''))
+    if requested in available_formats():
+        return requested
+    return request.accept_mimetypes.best_match(available_formats(), default=JSON)
+
+
+def _columnar(names, rows):
+    data = {name: [] for name in names}
+    columns = [data[name] for name in names]
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(value)
+    return {'columns': list(names), 'count': len(rows), 'data': data}
+
+
+def rows_response(names, rows, envelope=None, key='items', headers=None):
+    """Serialize column tuples as a list of objects or a columnar body.
+
+    `envelope` is an optional dict the rows are embedded in under `key`, for
+    endpoints whose body carries metadata alongside the list.
+    """
+    mimetype = negotiate_format()
+
+    if mimetype == JSON:
+        payload = [dict(zip(names, row)) for row in rows]
+    else:
+        payload = _columnar(names, rows)
+
+    if envelope is not None:
+        payload = {**envelope, key: payload}
+
+    if mimetype == MSGPACK:
+        body = msgpack.packb(payload, default=_default)
+    else:
+        body = dumps(payload)
+
+    response = Response(body, mimetype=mimetype, headers=headers)
+    response.vary.add('Accept')
+    return response
@@ -0,0 +1,253 @@
+"""
+In-process spatial grid index over Property.lat/lng for the map endpoint.
+
+Coordinates are loaded once into NumPy arrays sorted by latitude, so a
+viewport's points are a binary search on the latitude band followed by a
+vectorised longitude/filter mask. Clusters come from a zoom-dependent grid:
+each rebuild aggregates count and coordinate sums per (cell, scenario,
+registered) group for every zoom below POINT_ZOOM, sorted by cell row, so a
+clustered request only selects the viewport's cells and merges their groups.
+A cluster's centroid is over its whole cell, including points just outside
+the viewport.
+
+The index is rebuilt after any committed Property insert/update/delete in
+this process, and at least every MAX_INDEX_AGE seconds to pick up writes made
+by other processes (imports, seed scripts). Writes are counted in a
+generation number when their transaction commits; a rebuild only counts as
+current for the generation it started at, so a commit that lands while it
+reads triggers another. Only the first build runs in a request; later
+rebuilds run in a background thread while requests keep reading the previous
+snapshot, so a write never makes the next map request wait on a full-table
+read.
+
+A viewport returns raw points only while it holds no more than MAX_POINTS
+(MAX_ZOOMED_POINTS from POINT_ZOOM up); a denser one is returned as clusters,
+never as a cut-off list of points. From POINT_ZOOM up, where viewports are a
+few streets across, those clusters are computed from the viewport's points.
+"""
+
+import logging
+import threading
+import time
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Property
+
+logger = logging.getLogger(__name__)
+
+# Grid cells are a quarter of a 256px web-mercator tile (~64px) at each zoom
+CELLS_PER_TILE = 4
+# At or above this zoom the map shows raw points instead of clusters
+POINT_ZOOM = 15
+# Below POINT_ZOOM, viewports with no more than this many points are sent raw
+MAX_POINTS = 500
+# From POINT_ZOOM up; denser viewports (a condo block) still get clusters
+MAX_ZOOMED_POINTS = 2000
+MAX_INDEX_AGE = 60
+
+
+def _cell_size(zoom):
+    return 360.0 / (2 ** zoom) / CELLS_PER_TILE
+
+
+def _cells(lat, lng, zoom):
+    cell = _cell_size(zoom)
+    return (np.floor((lng + 180.0) / cell).astype(np.int64),
+            np.floor((lat + 90.0) / cell).astype(np.int64))
+
+
+def _aggregate(keys, lat, lng):
+    """Count and coordinate sums per distinct key. Returns (first index, count, sum_lat, sum_lng)."""
+    _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+    return first, counts, np.bincount(inverse, weights=lat), np.bincount(inverse, weights=lng)
+
+
+def _cluster_list(counts, sum_lat, sum_lng):
+    return [{
+        'count': int(c),
+        'lat': float(la / c),
+        'lng': float(ln / c),
+    } for c, la, ln in zip(counts, sum_lat, sum_lng)]
+
+
+def _build_grid(idx, zoom):
+    """Per-(cell, scenario, registered) aggregates for one zoom, sorted by cell row."""
+    cx, cy = _cells(idx['lat'], idx['lng'], zoom)
+    group = idx['scenario'].astype(np.int64) * 2 + idx['registered']
+    # 10 groups per cell; cy major so a latitude band is one contiguous slice
+    keys = (cy * (cx.max() + 1 if cx.size else 1) + cx) * 10 + group
+    first, counts, sum_lat, sum_lng = _aggregate(keys, idx['lat'], idx['lng'])
+    order = np.argsort(cy[first], kind='stable')
+    first = first[order]
+    return {
+        'cx': cx[first],
+        'cy': cy[first],
+        'scenario': idx['scenario'][first],
+        'registered': idx['registered'][first],
+        'count': counts[order],
+        'sum_lat': sum_lat[order],
+        'sum_lng': sum_lng[order],
+    }
+
+
+class GridIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._built_at = 0.0
+        self._generation = 0
+        self._built_generation = -1
+
+    def mark_stale(self, *args):
+        """Call after committing a Property write the map should show."""
+        self._generation += 1
+
+    def _build(self):
+        rows = db.session.execute(
+            select(Property.id, Property.lat, Property.lng,
+                   Property.compliance_scenario, Property.is_registered)
+            .where(Property.lat.isnot(None), Property.lng.isnot(None))
+        ).all()
+
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        lat = np.fromiter((r[1] for r in rows), dtype=np.float64, count=len(rows))
+        lng = np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows))
+        scenario = np.fromiter((r[3] or 0 for r in rows), dtype=np.int8, count=len(rows))
+        registered = np.fromiter((bool(r[4]) for r in rows), dtype=bool, count=len(rows))
+
+        order = np.argsort(lat, kind='stable')
+        idx = {
+            'id': ids[order],
+            'lat': lat[order],
+            'lng': lng[order],
+            'scenario': scenario[order],
+            'registered': registered[order],
+        }
+        idx['grids'] = [_build_grid(idx, zoom) for zoom in range(POINT_ZOOM)]
+        return idx
+
+    def _is_current(self):
+        return (self._built_generation == self._generation
+                and time.monotonic() - self._built_at <= MAX_INDEX_AGE)
+
+    def snapshot(self):
+        """Return the current index, building it in the caller only the first time."""
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    generation = self._generation
+                    self._snapshot = self._build()
+                    self._built_at = time.monotonic()
+                    self._built_generation = generation
+        elif not self._is_current():
+            self._start_rebuild()
+        return self._snapshot
+
+    def _start_rebuild(self):
+        # The lock is held for the whole rebuild, so at most one runs at a time
+        if not self._lock.acquire(blocking=False):
+            return
+        app = current_app._get_current_object()
+        threading.Thread(target=self._rebuild, args=(app,), name='grid-index-rebuild', daemon=True).start()
+
+    def _rebuild(self, app):
+        generation = self._generation
+        try:
+            with app.app_context():
+                try:
+                    snapshot = self._build()
+                finally:
+                    db.session.remove()
+            self._snapshot = snapshot
+            self._built_at = time.monotonic()
+            self._built_generation = generation
+        except Exception:
+            logger.exception('Map index rebuild failed; still serving the previous snapshot')
+        finally:
+            self._lock.release()
+
+    def query(self, west, south, east, north, zoom, scenario=None, registered=None):
+        """Return ('clusters', total, [...]) or ('points', total, [ids]) for the viewport."""
+        idx = self.snapshot()
+
+        lo = np.searchsorted(idx['lat'], south, side='left')
+        hi = np.searchsorted(idx['lat'], north, side='right')
+        mask = self._mask(idx['lng'][lo:hi], west, east)
+        if scenario is not None:
+            mask &= idx['scenario'][lo:hi] == scenario
+        if registered is not None:
+            mask &= idx['registered'][lo:hi] == registered
+        total = int(np.count_nonzero(mask))
+
+        if total <= (MAX_ZOOMED_POINTS if zoom >= POINT_ZOOM else MAX_POINTS):
+            return 'points', total, idx['id'][lo:hi][mask].tolist()
+
+        if zoom >= POINT_ZOOM:
+            lat = idx['lat'][lo:hi][mask]
+            lng = idx['lng'][lo:hi][mask]
+            cx, cy = _cells(lat, lng, zoom)
+            _, counts, sum_lat, sum_lng = _aggregate(cx * (int(cy.max()) + 1) + cy, lat, lng)
+            return 'clusters', total, _cluster_list(counts, sum_lat, sum_lng)
+
+        grid = idx['grids'][zoom]
+        (cell_west, cell_east), (cell_south, cell_north) = _cells(
+            np.array([south, north]), np.array([west, east]), zoom)
+        lo = np.searchsorted(grid['cy'], cell_south, side='left')
+        hi = np.searchsorted(grid['cy'], cell_north, side='right')
+        if cell_west <= cell_east:
+            mask = (grid['cx'][lo:hi] >= cell_west) & (grid['cx'][lo:hi] <= cell_east)
+        else:
+            mask = (grid['cx'][lo:hi] >= cell_west) | (grid['cx'][lo:hi] <= cell_east)
+        if scenario is not None:
+            mask &= grid['scenario'][lo:hi] == scenario
+        if registered is not None:
+            mask &= grid['registered'][lo:hi] == registered
+
+        # Merge each cell's groups: a handful of rows per cell in the viewport
+        cx = grid['cx'][lo:hi][mask]
+        cy = grid['cy'][lo:hi][mask]
+        if not cx.size:
+            return 'clusters', total, []
+        _, inverse = np.unique(cx * (int(cy.max()) + 1) + cy, return_inverse=True)
+        counts = np.bincount(inverse, weights=grid['count'][lo:hi][mask])
+        sum_lat = np.bincount(inverse, weights=grid['sum_lat'][lo:hi][mask])
+        sum_lng = np.bincount(inverse, weights=grid['sum_lng'][lo:hi][mask])
+        return 'clusters', total, _cluster_list(counts, sum_lat, sum_lng)
+
+    @staticmethod
+    def _mask(lng, west, east):
+        if west <= east:
+            return (lng >= west) & (lng <= east)
+        # Viewport crosses the antimeridian
+        return (lng >= west) | (lng <= east)
+
+
+grid_index = GridIndex()
+
+
+def _note_property_write(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info['grid_index_stale'] = True
+
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Property, _event, _note_property_write)
+
+
+# Flush-time events can't mark the index stale: a rebuild starting before the commit
+# would read the old rows and count as current. Mark it once the write is visible.
+@event.listens_for(Session, 'after_commit')
+def _mark_stale_after_commit(session):
+    if session.info.pop('grid_index_stale', False):
+        grid_index.mark_stale()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_writes(session):
+    session.info.pop('grid_index_stale', None)
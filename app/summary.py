@@ -0,0 +1,217 @@
+"""
+Incrementally maintained compliance summary for the dashboard and /api/v1/stats.
+
+A single `compliance_summary` row holds the property/registration/scenario
+counts, the payment count and the total TDT collected. ORM inserts, updates
+and deletes of Property and TDTPayment apply their delta to that row on the
+same connection during flush, so the summary commits or rolls back together
+with the write.
+
+The tracked attributes load their committed value when set (active
+history), so a change to an expired or never-loaded attribute still knows
+what it moved from. A delta applied while the row doesn't exist yet builds the
+row from the tables, which already include the write.
+
+Bulk statements (`Query.delete()`, raw SQL, the Supabase importer) bypass the
+mapper events; run scripts/rebuild_summary.py afterwards to re-derive it.
+"""
+
+from sqlalchemy import case, event, func, insert, inspect, select, update
+
+from app import db
+from app.models import ComplianceSummary, Property, TDTPayment
+
+SUMMARY_ID = 1
+SCENARIOS = (1, 2, 3, 4)
+AMOUNT_TOLERANCE = 0.005
+
+
+def compute_summary(connection=None):
+    """Derive the summary from scratch: one pass over properties, one over payments."""
+    connection = connection if connection is not None else db.session
+    row = connection.execute(
+        select(
+            func.count(Property.id),
+            func.sum(case((Property.is_registered.is_(True), 1), else_=0)),
+            *[func.sum(case((Property.compliance_scenario == i, 1), else_=0)) for i in SCENARIOS]
+        )
+    ).one()
+    total_payments, total_collected = connection.execute(
+        select(func.count(TDTPayment.id), func.sum(TDTPayment.amount))
+    ).one()
+
+    summary = {
+        'total_properties': row[0] or 0,
+        'registered_properties': row[1] or 0,
+        'total_payments': total_payments or 0,
+        'total_tdt_collected': float(total_collected or 0),
+    }
+    for i, count in zip(SCENARIOS, row[2:]):
+        summary[f'scenario_{i}'] = count or 0
+    return summary
+
+
+def _as_dict(row):
+    return {
+        'total_properties': row.total_properties,
+        'registered_properties': row.registered_properties,
+        'scenario_1': row.scenario_1,
+        'scenario_2': row.scenario_2,
+        'scenario_3': row.scenario_3,
+        'scenario_4': row.scenario_4,
+        'total_payments': row.total_payments,
+        'total_tdt_collected': row.total_tdt_collected,
+    }
+
+
+def check_drift():
+    """Recompute the summary without storing it. Returns (summary, drift) where
+    drift maps each field that disagrees with the stored row to (stored, actual)."""
+    actual = compute_summary()
+    row = db.session.get(ComplianceSummary, SUMMARY_ID)
+    if row is None:
+        return actual, {}
+
+    stored = _as_dict(row)
+    drift = {}
+    for key, value in actual.items():
+        if key == 'total_tdt_collected':
+            if abs(stored[key] - value) > AMOUNT_TOLERANCE:
+                drift[key] = (stored[key], value)
+        elif stored[key] != value:
+            drift[key] = (stored[key], value)
+    return actual, drift
+
+
+def rebuild_summary():
+    """Recompute and store the summary. Returns the same (summary, drift) as check_drift."""
+    actual, drift = check_drift()
+    row = db.session.get(ComplianceSummary, SUMMARY_ID)
+    if row is None:
+        row = ComplianceSummary(id=SUMMARY_ID)
+        db.session.add(row)
+
+    for key, value in actual.items():
+        setattr(row, key, value)
+    db.session.commit()
+    return actual, drift
+
+
+def get_summary():
+    """Return the current summary, building it on first use."""
+    row = db.session.get(ComplianceSummary, SUMMARY_ID)
+    if row is None:
+        summary, _ = rebuild_summary()
+        return summary
+    return _as_dict(row)
+
+
+def _apply(connection, deltas):
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+    table = ComplianceSummary.__table__
+    result = connection.execute(
+        update(table)
+        .where(table.c.id == SUMMARY_ID)
+        .values({k: table.c[k] + v for k, v in deltas.items()})
+    )
+    if result.rowcount == 0:
+        # No row yet: derive it on this connection, which already sees the write being applied
+        connection.execute(insert(table).values(id=SUMMARY_ID, **compute_summary(connection)))
+
+
+def record_bulk_payments(count, total_amount):
+    """Apply payments written with a bulk INSERT, which skips the mapper events."""
+    _apply(db.session.connection(), {'total_payments': count, 'total_tdt_collected': float(total_amount)})
+
+
+def record_registrations(count):
+    """Apply registrations written with a bulk UPDATE (app.registration)."""
+    _apply(db.session.connection(), {'registered_properties': count})
+
+
+def record_scenario_changes(removed, added):
+    """Apply scenario moves written with a Core UPDATE (the compliance engine).
+    `removed`/`added` map scenario (or None) to the number of properties leaving/entering it."""
+    deltas = {}
+    for scenario, count in removed.items():
+        if scenario in SCENARIOS:
+            deltas[f'scenario_{scenario}'] = deltas.get(f'scenario_{scenario}', 0) - count
+    for scenario, count in added.items():
+        if scenario in SCENARIOS:
+            deltas[f'scenario_{scenario}'] = deltas.get(f'scenario_{scenario}', 0) + count
+    _apply(db.session.connection(), deltas)
+
+
+def _property_deltas(registered, scenario, sign):
+    deltas = {'total_properties': sign, 'registered_properties': sign if registered else 0}
+    if scenario in SCENARIOS:
+        deltas[f'scenario_{scenario}'] = sign
+    return deltas
+
+
+def _merge(*dicts):
+    merged = {}
+    for d in dicts:
+        for k, v in d.items():
+            merged[k] = merged.get(k, 0) + v
+    return merged
+
+
+def _old_value(state, attr):
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    # Changed with no committed value recorded: it was NULL (active history loads it otherwise)
+    return None
+
+
+def _load_old_value_on_set(target, value, oldvalue, initiator):
+    pass  # Registered with active_history=True, which is what loads the old value
+
+
+for _attr in (Property.is_registered, Property.compliance_scenario, TDTPayment.amount):
+    event.listen(_attr, 'set', _load_old_value_on_set, active_history=True)
+
+
+@event.listens_for(Property, 'after_insert')
+def _property_inserted(mapper, connection, target):
+    _apply(connection, _property_deltas(target.is_registered, target.compliance_scenario, 1))
+
+
+@event.listens_for(Property, 'after_update')
+def _property_updated(mapper, connection, target):
+    state = inspect(target)
+    if not (state.attrs.is_registered.history.has_changes()
+            or state.attrs.compliance_scenario.history.has_changes()):
+        return
+    old = _property_deltas(_old_value(state, 'is_registered'), _old_value(state, 'compliance_scenario'), -1)
+    new = _property_deltas(target.is_registered, target.compliance_scenario, 1)
+    _apply(connection, _merge(old, new))
+
+
+@event.listens_for(Property, 'after_delete')
+def _property_deleted(mapper, connection, target):
+    _apply(connection, _property_deltas(target.is_registered, target.compliance_scenario, -1))
+
+
+@event.listens_for(TDTPayment, 'after_insert')
+def _payment_inserted(mapper, connection, target):
+    _apply(connection, {'total_payments': 1, 'total_tdt_collected': float(target.amount or 0)})
+
+
+@event.listens_for(TDTPayment, 'after_update')
+def _payment_updated(mapper, connection, target):
+    state = inspect(target)
+    if not state.attrs.amount.history.has_changes():
+        return
+    old = float(_old_value(state, 'amount') or 0)
+    _apply(connection, {'total_tdt_collected': float(target.amount or 0) - old})
+
+
+@event.listens_for(TDTPayment, 'after_delete')
+def _payment_deleted(mapper, connection, target):
+    _apply(connection, {'total_payments': -1, 'total_tdt_collected': -float(target.amount or 0)})
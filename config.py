@@ -8,4 +8,5 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///tdt.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
+    COMPLIANCE_WORKER_ENABLED = os.getenv('COMPLIANCE_WORKER_ENABLED', 'true').lower() == 'true'
 
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Fill in property_id on sales, buildings, land, property_values and exemptions
+rows that were written without it, by matching parcel_id to properties.
+
+The app adds the column and backfills it once on startup; run this after
+loading child rows ahead of their properties. Safe to re-run.
+
+Usage:
+    python scripts/backfill_property_ids.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    from app import create_app
+    from app.migrations import backfill_property_ids, unresolved_counts
+
+    app = create_app()
+
+    with app.app_context():
+        updated = backfill_property_ids()
+        unresolved = unresolved_counts()
+
+    for table, count in updated.items():
+        print(f"{table}: {count} rows backfilled, {unresolved[table]} without a matching property")
+
+
+if __name__ == '__main__':
+    main()
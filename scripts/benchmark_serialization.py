@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark the API list serialization paths on a synthetic property roll.
+
+Compares the original ORM path (Property.query.all() -> dict per object ->
+jsonify) with the column-tuple path used by the list endpoints, encoded as a
+JSON list of objects, columnar JSON and (if installed) msgpack.
+
+Runs against a throwaway in-memory SQLite database; nothing is written to the
+configured DATABASE_URL.
+
+Usage:
+    python scripts/benchmark_serialization.py [--rows 100000] [--repeat 3]
+"""
+
+import os
+import sys
+import argparse
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ['DATABASE_URL'] = 'sqlite://'
+
+FIELDS = ('id', 'parcel_id', 'address', 'city', 'zip_code', 'lat', 'lng',
+          'tdt_number', 'is_registered', 'compliance_scenario')
+
+
+def seed(db, Property, rows):
+    records = []
+    for i in range(rows):
+        registered = random.random() > 0.3
+        records.append({
+            'parcel_id': f'{i:010d}',
+            'address': f'{random.randint(1, 9999)} Gulf of Mexico Dr',
+            'city': random.choice(['Sarasota', 'Venice', 'Siesta Key', 'North Port']),
+            'zip_code': random.choice(['34236', '34285', '34242', '34287']),
+            'lat': 27.0 + random.random() * 0.6,
+            'lng': -82.8 + random.random() * 0.6,
+            'tdt_number': f'TDT-2025-{i:07d}' if registered else None,
+            'is_registered': registered,
+            'compliance_scenario': random.choice([None, 1, 2, 3, 4]),
+        })
+    db.session.execute(db.insert(Property), records)
+    db.session.commit()
+
+
+def best_of(repeat, fn, session):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = fn()
+        timings.append(time.perf_counter() - start)
+        session.expunge_all()
+    return min(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API list serialization paths')
+    parser.add_argument('--rows', type=int, default=100000, help='Number of synthetic properties')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per path (best is reported)')
+    args = parser.parse_args()
+
+    from flask import jsonify
+    from sqlalchemy import select
+    from app import create_app, db
+    from app.models import Property
+    from app.serializers import msgpack, orjson, rows_response
+
+    app = create_app()
+
+    with app.app_context():
+        print(f"Seeding {args.rows:,} properties...")
+        seed(db, Property, args.rows)
+
+        def orm_jsonify():
+            with app.test_request_context('/'):
+                properties = Property.query.all()
+                return len(jsonify([{f: getattr(p, f) for f in FIELDS} for p in properties]).get_data())
+
+        def tuples(accept):
+            def run():
+                with app.test_request_context('/', headers={'Accept': accept}):
+                    rows = db.session.execute(select(*[Property.__table__.c[f] for f in FIELDS])).all()
+                    return len(rows_response(FIELDS, rows).get_data())
+            return run
+
+        paths = [
+            ('ORM objects + jsonify (previous)', orm_jsonify),
+            (f"column tuples + {'orjson' if orjson else 'json'} objects", tuples('application/json')),
+            ('column tuples + columnar JSON', tuples('application/vnd.tdt.columnar+json')),
+        ]
+        if msgpack is not None:
+            paths.append(('column tuples + columnar msgpack', tuples('application/x-msgpack')))
+
+        print(f"\n{'path':<42} {'seconds':>9} {'MB':>8} {'speedup':>8}")
+        baseline = None
+        for label, fn in paths:
+            seconds, size = best_of(args.repeat, fn, db.session)
+            baseline = baseline or seconds
+            print(f"{label:<42} {seconds:>9.3f} {size / 1e6:>8.1f} {baseline / seconds:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Report months of a tax year with no payment (gaps) or more than one payment
+(overlaps) for every registered property.
+
+Usage:
+    python scripts/coverage_report.py --year 2024
+    python scripts/coverage_report.py --year 2025 --through 6 --csv coverage_2025.csv
+"""
+
+import os
+import sys
+import argparse
+import csv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report payment coverage gaps and overlaps')
+    parser.add_argument('--year', type=int, required=True, help='Tax year to check')
+    parser.add_argument('--through', type=int, help='Last month to check (default: last full month)')
+    parser.add_argument('--csv', help='Write flagged properties to this CSV file')
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.coverage import build_coverage_report, mask_to_months
+
+    app = create_app()
+
+    with app.app_context():
+        report = build_coverage_report(args.year, args.through)
+
+    print(f"Year: {report['year']} (months 1-{report['through']})")
+    print(f"Registered properties: {report['properties']}")
+    print(f"Fully covered: {report['fully_covered']}")
+    print(f"With gaps: {report['with_gaps']}")
+    print(f"With overlaps: {report['with_overlaps']}")
+    print(f"Completed in {report['seconds']}s")
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['property_id', 'parcel_id', 'gap_months', 'overlap_months'])
+            for property_id, parcel_id, gap_mask, overlap_mask in report['rows']:
+                writer.writerow([
+                    property_id, parcel_id,
+                    ' '.join(map(str, mask_to_months(gap_mask))),
+                    ' '.join(map(str, mask_to_months(overlap_mask))),
+                ])
+        print(f"Wrote {len(report['rows'])} rows to {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,407 +1,497 @@
 import os
 import sys
 import argparse
+import codecs
+import json
+import time
+import numpy as np
 import pandas as pd
+from collections import deque, namedtuple
 from datetime import datetime
 from pathlib import Path
-from supabase_client import get_supabase_client, batch_insert
+from supabase_client import get_supabase_client, batch_insert, fetch_all
 
 DATA_DIR = Path(__file__).parent.parent / "data" / "Sarasota County" / "SCPA_Detailed_Data"
 
-def clean_value(value):
-    if pd.isna(value) or value == '' or value == '""':
-        return None
-    if isinstance(value, str):
-        value = value.strip().strip('"')
-        if value == '':
-            return None
-    return value
-
-def parse_date(date_str):
-    if not date_str or pd.isna(date_str):
-        return None
-    try:
-        if isinstance(date_str, str):
-            date_str = date_str.strip().strip('"')
-            if date_str:
-                return pd.to_datetime(date_str).isoformat()
-    except:
-        pass
-    return None
-
-def read_csv_with_fallback(file_path):
-    """Try reading CSV with multiple encodings"""
-    encodings = ['utf-8', 'windows-1252', 'latin-1', 'iso-8859-1']
-    
-    for encoding in encodings:
+# Rows per DataFrame read from disk; with the upload batch this bounds memory, not the file size
+READ_CHUNK_SIZE = 10000
+# Encoding is sniffed from at most ENCODING_SAMPLE_BLOCKS blocks of this size, not the whole file
+ENCODING_BLOCK_SIZE = 1 << 20
+ENCODING_SAMPLE_BLOCKS = 8
+
+# Per-run state kept next to the data: encodings.json caches detect_encoding by file size and mtime,
+# checkpoints/<table>.json records how many of its file's rows a table's import has committed
+STATE_DIR = DATA_DIR / '.import_state'
+ENCODING_CACHE = STATE_DIR / 'encodings.json'
+CHECKPOINT_DIR = STATE_DIR / 'checkpoints'
+CHECKPOINT_SECONDS = 10
+
+# kind: 'text' (stripped, '' -> null), 'number', 'integer' or 'date' (ISO timestamp); unparseable -> null
+Column = namedtuple('Column', ['source', 'target', 'kind', 'default'], defaults=['text', None])
+# child: resolve property_id from parcel_id; derive: {target: fn(cleaned DataFrame) -> Series};
+# natural_key: columns rows are upserted on (default: key), backed by a unique constraint in the database
+Table = namedtuple('Table', ['label', 'file', 'table', 'columns', 'key', 'child', 'derive', 'batch_size', 'natural_key'],
+                   defaults=['parcel_id', False, {}, 1000, None])
+
+def _property_address(df):
+    return (df['street_number'].fillna('0') + ' ' + df['loc_description'].fillna('')).str.strip()
+
+PROPERTIES = Table('Properties', 'PropertyOwnerLegal.txt', 'properties', [
+    Column('ParcelID', 'parcel_id'),
+    Column('UserAccount', 'user_account'),
+    Column('name1', 'owner_name'),
+    Column('name2', 'owner_name2'),
+    Column('name3', 'owner_name3'),
+    Column('CuOStreet1', 'owner_street1'),
+    Column('CuOStreet2', 'owner_street2'),
+    Column('CuOCity', 'owner_city'),
+    Column('CuOState', 'owner_state'),
+    Column('CuOPostal', 'owner_postal'),
+    Column('CuOCountyCode', 'owner_county_code'),
+    Column('StreetNumber', 'street_number'),
+    Column('LOCDescription', 'loc_description'),
+    Column('LocUnit', 'loc_unit'),
+    Column('locdirprefix', 'loc_dir_prefix'),
+    Column('locdirsuffix', 'loc_dir_suffix'),
+    Column('LocCity', 'city', default='Sarasota'),
+    Column('LocState', 'loc_state'),
+    Column('LocZip', 'zip_code', default='00000'),
+    Column('LUC', 'land_use_code'),
+    Column('NBC', 'neighborhood_code'),
+    Column('LocationState', 'location_state'),
+    Column('PriorID1a', 'prior_id1'),
+    Column('PriorID2a', 'prior_id2'),
+    Column('PriorID3a', 'prior_id3'),
+    Column('Census', 'census'),
+    Column('Utilities1', 'utilities1'),
+    Column('Utilities2', 'utilities2'),
+    Column('GulfBay', 'gulf_bay'),
+    Column('Description', 'description'),
+    Column('LegalDescription1', 'legal_description1'),
+    Column('LegalDescription2', 'legal_description2'),
+    Column('LegalDescription3', 'legal_description3'),
+    Column('LegalDescription4', 'legal_description4'),
+    Column('TotalLand', 'total_land', 'number'),
+    Column('LandUnitType', 'land_unit_type'),
+    Column('Zoning1', 'zoning1'),
+    Column('Zoning2', 'zoning2'),
+    Column('Zoning3', 'zoning3'),
+    Column('status', 'property_status'),
+], derive={'address': _property_address})
+
+SALES = Table('Sales', 'Sales.txt', 'sales', [
+    Column('parcelid', 'parcel_id'),
+    Column('saledate', 'sale_date', 'date'),
+    Column('sequence', 'sequence', 'integer'),
+    Column('saleprice', 'sale_price', 'number'),
+    Column('legalreference', 'legal_reference'),
+    Column('book', 'book'),
+    Column('page', 'page'),
+    Column('nalcode', 'nal_code'),
+    Column('deedtype', 'deed_type'),
+    Column('recordingdate', 'recording_date', 'date'),
+    Column('docstamps', 'doc_stamps', 'number'),
+], child=True, natural_key=('parcel_id', 'sequence'))
+
+BUILDINGS = Table('Buildings', 'Building.txt', 'buildings', [
+    Column('parcelid', 'parcel_id'),
+    Column('cardnumber', 'card_number'),
+    Column('avghtfl', 'avg_height_floor', 'number'),
+    Column('primeintwall', 'prime_int_wall'),
+    Column('secintwall', 'sec_int_wall'),
+    Column('secintwallpercent', 'sec_int_wall_percent', 'number'),
+    Column('primaryfloors', 'primary_floors'),
+    Column('secfloors', 'sec_floors'),
+    Column('secfloorspercent', 'sec_floors_percent', 'number'),
+    Column('insulation', 'insulation'),
+    Column('heattype', 'heat_type'),
+    Column('percentairconditioned', 'percent_air_conditioned', 'number'),
+    Column('exttype', 'ext_type'),
+    Column('storyhgt', 'story_height', 'number'),
+    Column('foundation', 'foundation'),
+    Column('units', 'units', 'number'),
+    Column('frame', 'frame'),
+    Column('primewall', 'prime_wall'),
+    Column('secwall', 'sec_wall'),
+    Column('secwallpercent', 'sec_wall_percent', 'number'),
+    Column('roofstruct', 'roof_struct'),
+    Column('roofcover', 'roof_cover'),
+    Column('view_', 'view_type'),
+    Column('grade', 'grade'),
+    Column('yearblt', 'year_built', 'integer'),
+    Column('effyearblt', 'eff_year_built', 'integer'),
+    Column('condofloor', 'condo_floor'),
+    Column('condocomplexname', 'condo_complex_name'),
+    Column('fullbath', 'full_bath', 'number'),
+    Column('fullbathrating', 'full_bath_rating'),
+    Column('halfbath', 'half_bath', 'number'),
+    Column('halfbathrating', 'half_bath_rating'),
+    Column('otherfixtures', 'other_fixtures', 'number'),
+    Column('otherfixturesrating', 'other_fixtures_rating'),
+    Column('fireplaces', 'fireplaces'),
+    Column('fireplacerating', 'fireplace_rating'),
+    Column('parkingspaces', 'parking_spaces'),
+    Column('percentsprinkled', 'percent_sprinkled'),
+], child=True, natural_key=('parcel_id', 'card_number'))
+
+LAND = Table('Land', 'Land.txt', 'land', [
+    Column('parcelid', 'parcel_id'),
+    Column('seeqnumber', 'seq_number'),
+    Column('linetype', 'line_type'),
+    Column('numofunits', 'num_of_units', 'number'),
+    Column('unittype', 'unit_type'),
+    Column('landtype', 'land_type'),
+    Column('neighmod', 'neigh_mod'),
+], child=True, natural_key=('parcel_id', 'seq_number'))
+
+VALUES = Table('Property Values', 'Values.txt', 'property_values', [
+    Column('ParcelID', 'parcel_id'),
+    Column('TotalValue', 'total_value', 'number'),
+    Column('Land', 'land_value', 'number'),
+    Column('Building', 'building_value', 'number'),
+    Column('SFYI', 'sfyi_value', 'number'),
+    Column('AssessedValue', 'assessed_value', 'number'),
+    Column('TaxableValue', 'taxable_value', 'number'),
+    Column('Deletions', 'deletions', 'number'),
+    Column('NewConst', 'new_const', 'number'),
+    Column('NewLand', 'new_land', 'number'),
+    Column('AgCredit', 'ag_credit', 'number'),
+], child=True)
+
+EXEMPTIONS = Table('Exemptions', 'Exemptions.txt', 'exemptions', [
+    Column('parcelid', 'parcel_id'),
+    Column('exemptioncode', 'exemption_code'),
+    Column('amountofftotalassessment', 'amount_off_total_assessment', 'number'),
+    Column('appcode', 'app_code'),
+], child=True, natural_key=('parcel_id', 'exemption_code'))
+
+LOOKUP_COLUMNS = [Column('Code', 'code'), Column('Description', 'description')]
+LOOKUPS = [
+    Table(f'Lookup {file_name}', file_name, table_name, LOOKUP_COLUMNS, key='code', batch_size=100)
+    for table_name, file_name in [
+        ('lookup_land_use_codes', 'LookupLandUseCodes.txt'),
+        ('lookup_deed_types', 'LookupDeedType.txt'),
+        ('lookup_neighborhood_codes', 'LookupNeighborhoodCode.txt'),
+        ('lookup_exemption_codes', 'LookupExemptionCode.txt'),
+    ]
+]
+
+# --table name -> tables it imports, in --all order
+IMPORTS = {
+    'lookups': LOOKUPS,
+    'properties': [PROPERTIES],
+    'sales': [SALES],
+    'buildings': [BUILDINGS],
+    'land': [LAND],
+    'values': [VALUES],
+    'exemptions': [EXEMPTIONS],
+}
+
+def clean_text(raw):
+    values = raw.astype(object).str.strip().str.strip('"')
+    return values.where(values != '')
+
+def clean_number(raw):
+    return pd.to_numeric(clean_text(raw).str.replace(',', '', regex=False), errors='coerce')
+
+def clean_integer(raw):
+    return clean_number(raw).round().astype('Int64')
+
+def clean_date(raw):
+    values = clean_text(raw)
+    # One inferred format parses the whole column in C; only leftovers in another format go value by value
+    parsed = pd.to_datetime(values, errors='coerce')
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], errors='coerce', format='mixed')
+    iso = np.datetime_as_string(parsed.to_numpy(dtype='datetime64[s]'))
+    return pd.Series(iso, index=values.index, dtype=object).where(parsed.notna())
+
+CLEANERS = {'text': clean_text, 'number': clean_number, 'integer': clean_integer, 'date': clean_date}
+
+def transform(chunk, spec):
+    """Apply a table's column map to a raw chunk, column by column. Drops rows without the key."""
+    cleaned = {}
+    for column in spec.columns:
+        raw = chunk[column.source] if column.source in chunk else pd.Series(None, index=chunk.index, dtype=object)
+        values = CLEANERS[column.kind](raw)
+        if column.default is not None:
+            values = values.fillna(column.default)
+        cleaned[column.target] = values
+    df = pd.DataFrame(cleaned, index=chunk.index)
+    for target, derive in spec.derive.items():
+        df[target] = derive(df)
+    return df[df[spec.key].notna()]
+
+def to_records(df):
+    """JSON-ready dicts: missing values become None, numpy scalars become Python ones"""
+    columns = [df[name].astype(object).where(df[name].notna(), None).tolist() for name in df.columns]
+    return [dict(zip(df.columns, row)) for row in zip(*columns)]
+
+def sample_blocks(file_path, size):
+    """Up to ENCODING_SAMPLE_BLOCKS whole-line blocks spread evenly across the file"""
+    blocks = []
+    with open(file_path, 'rb') as f:
+        count = min(ENCODING_SAMPLE_BLOCKS, max(1, -(-size // ENCODING_BLOCK_SIZE)))
+        for i in range(count):
+            offset = (size - ENCODING_BLOCK_SIZE) * i // max(1, count - 1) if count > 1 else 0
+            f.seek(offset)
+            block = f.read(ENCODING_BLOCK_SIZE)
+            # Cut at newlines, which never fall inside a multi-byte character
+            if offset > 0:
+                block = block.partition(b'\n')[2]
+            if offset + ENCODING_BLOCK_SIZE < size:
+                block = block.rpartition(b'\n')[0]
+            blocks.append(block)
+    return blocks
+
+def sniff_encoding(blocks):
+    """utf-8 if the sample decodes as it, else windows-1252; latin-1 decodes anything"""
+    for encoding in ['utf-8', 'windows-1252']:
         try:
-            print(f"Trying {encoding} encoding...")
-            df = pd.read_csv(file_path, dtype=str, encoding=encoding, low_memory=False)
-            print(f"Successfully read with {encoding} encoding")
-            return df
+            for block in blocks:
+                block.decode(encoding)
+            return encoding
         except UnicodeDecodeError:
             continue
-        except Exception as e:
-            print(f"Error with {encoding}: {e}")
-            continue
-    
-    raise ValueError(f"Could not read {file_path} with any supported encoding")
+    return 'latin-1'
 
-def import_properties(client, dry_run=False):
-    print("\n=== Importing Properties ===")
-    file_path = DATA_DIR / "PropertyOwnerLegal.txt"
-    
-    if not file_path.exists():
-        print(f"File not found: {file_path}")
-        return
-    
-    print(f"Reading {file_path}...")
-    df = read_csv_with_fallback(file_path)
-    print(f"Found {len(df)} records")
-    
-    records = []
-    for _, row in df.iterrows():
-        record = {
-            'parcel_id': clean_value(row.get('ParcelID')),
-            'user_account': clean_value(row.get('UserAccount')),
-            'owner_name': clean_value(row.get('name1')),
-            'owner_name2': clean_value(row.get('name2')),
-            'owner_name3': clean_value(row.get('name3')),
-            'owner_street1': clean_value(row.get('CuOStreet1')),
-            'owner_street2': clean_value(row.get('CuOStreet2')),
-            'owner_city': clean_value(row.get('CuOCity')),
-            'owner_state': clean_value(row.get('CuOState')),
-            'owner_postal': clean_value(row.get('CuOPostal')),
-            'owner_county_code': clean_value(row.get('CuOCountyCode')),
-            'street_number': clean_value(row.get('StreetNumber')),
-            'loc_description': clean_value(row.get('LOCDescription')),
-            'loc_unit': clean_value(row.get('LocUnit')),
-            'loc_dir_prefix': clean_value(row.get('locdirprefix')),
-            'loc_dir_suffix': clean_value(row.get('locdirsuffix')),
-            'city': clean_value(row.get('LocCity')) or 'Sarasota',
-            'loc_state': clean_value(row.get('LocState')),
-            'zip_code': clean_value(row.get('LocZip')) or '00000',
-            'land_use_code': clean_value(row.get('LUC')),
-            'neighborhood_code': clean_value(row.get('NBC')),
-            'location_state': clean_value(row.get('LocationState')),
-            'prior_id1': clean_value(row.get('PriorID1a')),
-            'prior_id2': clean_value(row.get('PriorID2a')),
-            'prior_id3': clean_value(row.get('PriorID3a')),
-            'census': clean_value(row.get('Census')),
-            'utilities1': clean_value(row.get('Utilities1')),
-            'utilities2': clean_value(row.get('Utilities2')),
-            'gulf_bay': clean_value(row.get('GulfBay')),
-            'description': clean_value(row.get('Description')),
-            'legal_description1': clean_value(row.get('LegalDescription1')),
-            'legal_description2': clean_value(row.get('LegalDescription2')),
-            'legal_description3': clean_value(row.get('LegalDescription3')),
-            'legal_description4': clean_value(row.get('LegalDescription4')),
-            'total_land': clean_value(row.get('TotalLand')),
-            'land_unit_type': clean_value(row.get('LandUnitType')),
-            'zoning1': clean_value(row.get('Zoning1')),
-            'zoning2': clean_value(row.get('Zoning2')),
-            'zoning3': clean_value(row.get('Zoning3')),
-            'property_status': clean_value(row.get('status')),
-        }
-        
-        street_num = clean_value(row.get('StreetNumber')) or '0'
-        loc_desc = clean_value(row.get('LOCDescription')) or ''
-        record['address'] = f"{street_num} {loc_desc}".strip()
-        
-        if record['parcel_id']:
-            records.append(record)
-    
-    print(f"Prepared {len(records)} valid records")
-    
-    if not dry_run:
-        inserted, errors = batch_insert(client, 'properties', records)
-        print(f"Successfully inserted {inserted} properties")
-        if errors:
-            print(f"Encountered {len(errors)} errors")
-    else:
-        print("DRY RUN: Would have inserted records")
-        print("Sample record:", records[0] if records else None)
+def read_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-def import_sales(client, dry_run=False):
-    print("\n=== Importing Sales ===")
-    file_path = DATA_DIR / "Sales.txt"
-    
-    if not file_path.exists():
-        print(f"File not found: {file_path}")
-        return
-    
-    print(f"Reading {file_path}...")
-    df = read_csv_with_fallback(file_path)
-    print(f"Found {len(df)} records")
-    
-    records = []
-    for _, row in df.iterrows():
-        record = {
-            'parcel_id': clean_value(row.get('parcelid')),
-            'sale_date': parse_date(row.get('saledate')),
-            'sequence': clean_value(row.get('sequence')),
-            'sale_price': clean_value(row.get('saleprice')),
-            'legal_reference': clean_value(row.get('legalreference')),
-            'book': clean_value(row.get('book')),
-            'page': clean_value(row.get('page')),
-            'nal_code': clean_value(row.get('nalcode')),
-            'deed_type': clean_value(row.get('deedtype')),
-            'recording_date': parse_date(row.get('recordingdate')),
-            'doc_stamps': clean_value(row.get('docstamps')),
-        }
-        
-        if record['parcel_id']:
-            records.append(record)
-    
-    print(f"Prepared {len(records)} valid records")
-    
-    if not dry_run:
-        inserted, errors = batch_insert(client, 'sales', records)
-        print(f"Successfully inserted {inserted} sales records")
-        if errors:
-            print(f"Encountered {len(errors)} errors")
-    else:
-        print("DRY RUN: Would have inserted records")
-        print("Sample record:", records[0] if records else None)
+def write_state(path, state):
+    """Replace a JSON state file atomically; a read-only data directory only costs the cache"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: could not write {path}: {e}")
 
-def import_buildings(client, dry_run=False):
-    print("\n=== Importing Buildings ===")
-    file_path = DATA_DIR / "Building.txt"
-    
-    if not file_path.exists():
-        print(f"File not found: {file_path}")
-        return
-    
-    print(f"Reading {file_path}...")
-    df = read_csv_with_fallback(file_path)
-    print(f"Found {len(df)} records")
-    
-    records = []
-    for _, row in df.iterrows():
-        record = {
-            'parcel_id': clean_value(row.get('parcelid')),
-            'card_number': clean_value(row.get('cardnumber')),
-            'avg_height_floor': clean_value(row.get('avghtfl')),
-            'prime_int_wall': clean_value(row.get('primeintwall')),
-            'sec_int_wall': clean_value(row.get('secintwall')),
-            'sec_int_wall_percent': clean_value(row.get('secintwallpercent')),
-            'primary_floors': clean_value(row.get('primaryfloors')),
-            'sec_floors': clean_value(row.get('secfloors')),
-            'sec_floors_percent': clean_value(row.get('secfloorspercent')),
-            'insulation': clean_value(row.get('insulation')),
-            'heat_type': clean_value(row.get('heattype')),
-            'percent_air_conditioned': clean_value(row.get('percentairconditioned')),
-            'ext_type': clean_value(row.get('exttype')),
-            'story_height': clean_value(row.get('storyhgt')),
-            'foundation': clean_value(row.get('foundation')),
-            'units': clean_value(row.get('units')),
-            'frame': clean_value(row.get('frame')),
-            'prime_wall': clean_value(row.get('primewall')),
-            'sec_wall': clean_value(row.get('secwall')),
-            'sec_wall_percent': clean_value(row.get('secwallpercent')),
-            'roof_struct': clean_value(row.get('roofstruct')),
-            'roof_cover': clean_value(row.get('roofcover')),
-            'view_type': clean_value(row.get('view_')),
-            'grade': clean_value(row.get('grade')),
-            'year_built': clean_value(row.get('yearblt')),
-            'eff_year_built': clean_value(row.get('effyearblt')),
-            'condo_floor': clean_value(row.get('condofloor')),
-            'condo_complex_name': clean_value(row.get('condocomplexname')),
-            'full_bath': clean_value(row.get('fullbath')),
-            'full_bath_rating': clean_value(row.get('fullbathrating')),
-            'half_bath': clean_value(row.get('halfbath')),
-            'half_bath_rating': clean_value(row.get('halfbathrating')),
-            'other_fixtures': clean_value(row.get('otherfixtures')),
-            'other_fixtures_rating': clean_value(row.get('otherfixturesrating')),
-            'fireplaces': clean_value(row.get('fireplaces')),
-            'fireplace_rating': clean_value(row.get('fireplacerating')),
-            'parking_spaces': clean_value(row.get('parkingspaces')),
-            'percent_sprinkled': clean_value(row.get('percentsprinkled')),
-        }
-        
-        if record['parcel_id']:
-            records.append(record)
-    
-    print(f"Prepared {len(records)} valid records")
-    
-    if not dry_run:
-        inserted, errors = batch_insert(client, 'buildings', records)
-        print(f"Successfully inserted {inserted} building records")
-        if errors:
-            print(f"Encountered {len(errors)} errors")
-    else:
-        print("DRY RUN: Would have inserted records")
-        print("Sample record:", records[0] if records else None)
+def detect_encoding(file_path):
+    """Encoding of a file, sniffed from a bounded sample and cached until its size or mtime changes"""
+    stat = os.stat(file_path)
+    key = str(Path(file_path).resolve())
+    cache = read_state(ENCODING_CACHE)
+    entry = cache.get(key)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        print(f"Using cached {entry['encoding']} encoding")
+        return entry['encoding']
 
-def import_land(client, dry_run=False):
-    print("\n=== Importing Land ===")
-    file_path = DATA_DIR / "Land.txt"
-    
-    if not file_path.exists():
-        print(f"File not found: {file_path}")
-        return
-    
-    print(f"Reading {file_path}...")
-    df = read_csv_with_fallback(file_path)
-    print(f"Found {len(df)} records")
-    
-    records = []
-    for _, row in df.iterrows():
-        record = {
-            'parcel_id': clean_value(row.get('parcelid')),
-            'seq_number': clean_value(row.get('seeqnumber')),
-            'line_type': clean_value(row.get('linetype')),
-            'num_of_units': clean_value(row.get('numofunits')),
-            'unit_type': clean_value(row.get('unittype')),
-            'land_type': clean_value(row.get('landtype')),
-            'neigh_mod': clean_value(row.get('neighmod')),
-        }
-        
-        if record['parcel_id']:
-            records.append(record)
-    
-    print(f"Prepared {len(records)} valid records")
-    
-    if not dry_run:
-        inserted, errors = batch_insert(client, 'land', records)
-        print(f"Successfully inserted {inserted} land records")
-        if errors:
-            print(f"Encountered {len(errors)} errors")
-    else:
-        print("DRY RUN: Would have inserted records")
-        print("Sample record:", records[0] if records else None)
+    encoding = sniff_encoding(sample_blocks(file_path, stat.st_size))
+    print(f"Detected {encoding} encoding")
+    cache[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'encoding': encoding}
+    write_state(ENCODING_CACHE, cache)
+    return encoding
 
-def import_values(client, dry_run=False):
-    print("\n=== Importing Property Values ===")
-    file_path = DATA_DIR / "Values.txt"
-    
-    if not file_path.exists():
-        print(f"File not found: {file_path}")
-        return
-    
-    print(f"Reading {file_path}...")
-    df = read_csv_with_fallback(file_path)
-    print(f"Found {len(df)} records")
-    
-    records = []
-    for _, row in df.iterrows():
-        record = {
-            'parcel_id': clean_value(row.get('ParcelID')),
-            'total_value': clean_value(row.get('TotalValue')),
-            'land_value': clean_value(row.get('Land')),
-            'building_value': clean_value(row.get('Building')),
-            'sfyi_value': clean_value(row.get('SFYI')),
-            'assessed_value': clean_value(row.get('AssessedValue')),
-            'taxable_value': clean_value(row.get('TaxableValue')),
-            'deletions': clean_value(row.get('Deletions')),
-            'new_const': clean_value(row.get('NewConst')),
-            'new_land': clean_value(row.get('NewLand')),
-            'ag_credit': clean_value(row.get('AgCredit')),
-        }
-        
-        if record['parcel_id']:
-            records.append(record)
-    
-    print(f"Prepared {len(records)} valid records")
-    
-    if not dry_run:
-        inserted, errors = batch_insert(client, 'property_values', records)
-        print(f"Successfully inserted {inserted} property value records")
-        if errors:
-            print(f"Encountered {len(errors)} errors")
-    else:
+_replaced_chars = 0
+
+def _replace_and_count(error):
+    global _replaced_chars
+    _replaced_chars += 1
+    return '\ufffd', error.end
+
+codecs.register_error('county_import_replace', _replace_and_count)
+
+def replacement_counts(chunk):
+    """U+FFFD characters per row"""
+    counts = np.zeros(len(chunk), dtype=np.int64)
+    for name in chunk.columns:
+        counts += chunk[name].str.count('\ufffd').fillna(0).to_numpy(dtype=np.int64)
+    return counts
+
+def read_csv_chunks(file_path, chunksize=None, encoding=None, skip_rows=0):
+    """Yield the file as DataFrames of at most `chunksize` rows, decoded in one pass.
+
+    The first `skip_rows` data rows are skipped by the parser, without being
+    converted. Bytes the encoding can't decode become U+FFFD instead of
+    failing the import; rows are only scanned for them while the decoder has
+    replaced more characters than have been found so far.
+    """
+    global _replaced_chars
+    encoding = encoding or detect_encoding(file_path)
+    _replaced_chars = 0
+    found = 0
+    bad_rows = 0
+    header = {}
+    if skip_rows:
+        names = pd.read_csv(file_path, nrows=0, encoding=encoding, encoding_errors='county_import_replace').columns
+        header = {'header': None, 'names': list(names), 'skiprows': skip_rows + 1}
+    with pd.read_csv(file_path, dtype=str, encoding=encoding, encoding_errors='county_import_replace',
+                     chunksize=chunksize or READ_CHUNK_SIZE, **header) as reader:
+        for chunk in reader:
+            if _replaced_chars > found:
+                counts = replacement_counts(chunk)
+                found += int(counts.sum())
+                bad_rows += int(np.count_nonzero(counts))
+            yield chunk
+    if bad_rows:
+        print(f"Warning: {bad_rows} rows had bytes that are not valid {encoding}; "
+              f"they were replaced with U+FFFD (use --encoding to override)")
+
+def load_records(client, table_name, records, dry_run, batch_size=1000, max_in_flight=4,
+                 on_conflict=None, start_offset=0, on_progress=None):
+    """Upsert a stream of records batch by batch, or just count them on a dry run"""
+    if dry_run:
+        count = 0
+        sample = None
+        for record in records:
+            if sample is None:
+                sample = record
+            count += 1
+        print(f"Prepared {count} valid records")
         print("DRY RUN: Would have inserted records")
-        print("Sample record:", records[0] if records else None)
+        print("Sample record:", sample)
+        return count, []
+
+    inserted, errors = batch_insert(client, table_name, records, batch_size=batch_size, max_in_flight=max_in_flight,
+                                    on_conflict=on_conflict, start_offset=start_offset, on_progress=on_progress)
+    print(f"Successfully inserted {inserted} records into {table_name}")
+    if errors:
+        print(f"Encountered {len(errors)} errors")
+    return inserted, errors
+
+_property_ids = None
+
+def get_property_ids(client):
+    """parcel_id -> properties.id, read once per run"""
+    global _property_ids
+    if _property_ids is None:
+        print("Loading property ids...")
+        rows = fetch_all(client, 'properties', 'id,parcel_id')
+        _property_ids = {row['parcel_id']: row['id'] for row in rows}
+        print(f"Loaded {len(_property_ids)} property ids")
+    return _property_ids
+
+def table_records(client, spec, file_path, encoding=None, skip_rows=0, chunks=None):
+    """Stream a file through its column map as upload-ready records, starting after `skip_rows` rows.
+    Appends (records before the chunk, file row of each record, rows read) per chunk to `chunks`."""
+    property_ids = get_property_ids(client) if spec.child else None
+    unresolved = 0
+    records = 0
+    rows_read = skip_rows
+
+    for chunk in read_csv_chunks(file_path, encoding=encoding, skip_rows=skip_rows):
+        df = transform(chunk, spec)
+        if property_ids is not None:
+            df['property_id'] = df['parcel_id'].map(property_ids).astype('Int64')
+            unresolved += int(df['property_id'].isna().sum())
+        if chunks is not None:
+            chunks.append((records, rows_read + df.index.to_numpy() - chunk.index[0], rows_read + len(chunk)))
+        records += len(df)
+        rows_read += len(chunk)
+        yield from to_records(df)
+
+    if unresolved:
+        print(f"Warning: {unresolved} records have no matching property (import properties first, "
+              f"or re-run supabase/add_child_property_ids.sql afterwards)")
+
+def checkpoint_path(spec):
+    return CHECKPOINT_DIR / f"{spec.table}.json"
+
+def load_checkpoint(spec, file_path):
+    """(file rows already committed, whether the import finished) from an earlier run on this file"""
+    state = read_state(checkpoint_path(spec))
+    if not state:
+        return 0, False
+    stat = os.stat(file_path)
+    if state.get('size') != stat.st_size or state.get('mtime_ns') != stat.st_mtime_ns:
+        print(f"{file_path.name} changed since its checkpoint; starting over")
+        return 0, False
+    if 'rows_done' not in state:
+        print(f"{checkpoint_path(spec).name} predates row checkpoints; starting over")
+        return 0, False
+    return state['rows_done'], state['complete']
+
+def rows_settled(chunks, committed, skip_rows):
+    """File rows below the first uncommitted record; drops chunks wholly below it"""
+    while len(chunks) > 1 and chunks[1][0] <= committed:
+        chunks.popleft()
+    if not chunks:
+        return skip_rows
+    records_before, rows, rows_read = chunks[0]
+    index = committed - records_before
+    return int(rows[index]) if index < len(rows) else rows_read
+
+def checkpoint_writer(spec, file_path, chunks, skip_rows=0):
+    """on_progress callback saving the committed file row, at most every CHECKPOINT_SECONDS until the end.
+    `chunks` is the row map table_records fills in; record offsets count from `skip_rows`."""
+    path = checkpoint_path(spec)
+    stat = os.stat(file_path)
+    last_write = 0.0
+
+    def save(committed, end):
+        nonlocal last_write
+        if end is None and time.monotonic() - last_write < CHECKPOINT_SECONDS:
+            return
+        last_write = time.monotonic()
+        write_state(path, {
+            'file': str(file_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'rows_done': rows_settled(chunks, committed, skip_rows),
+            'complete': end is not None and committed == end,
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+        })
+
+    return save
+
+def import_table(client, spec, dry_run=False, encoding=None, max_in_flight=4, resume=False):
+    global _property_ids
+    print(f"\n=== Importing {spec.label} ===")
+    file_path = DATA_DIR / spec.file
 
-def import_exemptions(client, dry_run=False):
-    print("\n=== Importing Exemptions ===")
-    file_path = DATA_DIR / "Exemptions.txt"
-    
     if not file_path.exists():
         print(f"File not found: {file_path}")
         return
-    
-    print(f"Reading {file_path}...")
-    df = read_csv_with_fallback(file_path)
-    print(f"Found {len(df)} records")
-    
-    records = []
-    for _, row in df.iterrows():
-        record = {
-            'parcel_id': clean_value(row.get('parcelid')),
-            'exemption_code': clean_value(row.get('exemptioncode')),
-            'amount_off_total_assessment': clean_value(row.get('amountofftotalassessment')),
-            'app_code': clean_value(row.get('appcode')),
-        }
-        
-        if record['parcel_id']:
-            records.append(record)
-    
-    print(f"Prepared {len(records)} valid records")
-    
-    if not dry_run:
-        inserted, errors = batch_insert(client, 'exemptions', records)
-        print(f"Successfully inserted {inserted} exemption records")
-        if errors:
-            print(f"Encountered {len(errors)} errors")
-    else:
-        print("DRY RUN: Would have inserted records")
-        print("Sample record:", records[0] if records else None)
-
-def import_lookups(client, dry_run=False):
-    print("\n=== Importing Lookup Tables ===")
-    
-    lookup_files = {
-        'lookup_land_use_codes': 'LookupLandUseCodes.txt',
-        'lookup_deed_types': 'LookupDeedType.txt',
-        'lookup_neighborhood_codes': 'LookupNeighborhoodCode.txt',
-        'lookup_exemption_codes': 'LookupExemptionCode.txt',
-    }
-    
-    for table_name, file_name in lookup_files.items():
-        file_path = DATA_DIR / file_name
-        
-        if not file_path.exists():
-            print(f"File not found: {file_path}")
-            continue
-        
-        print(f"\nReading {file_name}...")
-        df = read_csv_with_fallback(file_path)
-        print(f"Found {len(df)} records")
-        
-        records = []
-        for _, row in df.iterrows():
-            record = {
-                'code': clean_value(row.get('Code')),
-                'description': clean_value(row.get('Description')),
-            }
-            
-            if record['code']:
-                records.append(record)
-        
-        print(f"Prepared {len(records)} valid records for {table_name}")
-        
-        if not dry_run:
-            inserted, errors = batch_insert(client, table_name, records, batch_size=100)
-            print(f"Successfully inserted {inserted} records into {table_name}")
-            if errors:
-                print(f"Encountered {len(errors)} errors")
-        else:
-            print("DRY RUN: Would have inserted records")
+
+    skip = 0
+    if resume and not dry_run:
+        skip, complete = load_checkpoint(spec, file_path)
+        if complete:
+            print(f"Already imported (see {checkpoint_path(spec)})")
+            return
+
+    print(f"Streaming {file_path}...")
+    if skip:
+        print(f"Resuming after {skip} committed rows")
+    chunks = None if dry_run else deque()
+    records = table_records(client, spec, file_path, encoding, skip_rows=skip, chunks=chunks)
+
+    inserted, _ = load_records(client, spec.table, records, dry_run,
+                               batch_size=spec.batch_size, max_in_flight=max_in_flight,
+                               on_conflict=','.join(spec.natural_key or (spec.key,)),
+                               on_progress=None if dry_run else checkpoint_writer(spec, file_path, chunks, skip))
+    if spec is PROPERTIES and inserted and not dry_run:
+        _property_ids = None  # child imports reload it with the new ids
 
 def main():
     parser = argparse.ArgumentParser(description='Import Sarasota County property data to Supabase')
-    parser.add_argument('--table', type=str, help='Specific table to import (properties, sales, buildings, land, values, exemptions, lookups)')
+    parser.add_argument('--table', type=str, help=f"Specific table to import ({', '.join(IMPORTS)})")
     parser.add_argument('--all', action='store_true', help='Import all tables')
     parser.add_argument('--dry-run', action='store_true', help='Run without actually inserting data')
-    
+    parser.add_argument('--encoding', type=str, help='Read every file with this encoding instead of detecting it')
+    parser.add_argument('--workers', type=int, default=4, help='Insert batches in flight at once (default: 4)')
+    parser.add_argument('--resume', action='store_true', help='Continue each table from its last checkpoint')
+
     args = parser.parse_args()
-    
+
     if not args.all and not args.table:
         parser.print_help()
         print("\nPlease specify --all or --table <table_name>")
         sys.exit(1)
-    
+
+    if args.table and args.table not in IMPORTS:
+        print(f"Unknown table: {args.table}")
+        print(f"Available tables: {', '.join(IMPORTS)}")
+        sys.exit(1)
+
     print("Connecting to Supabase...")
     try:
         client = get_supabase_client()
@@ -409,42 +499,20 @@ def main():
     except Exception as e:
         print(f"Error connecting to Supabase: {e}")
         sys.exit(1)
-    
+
     if args.dry_run:
         print("\n*** DRY RUN MODE - No data will be inserted ***\n")
-    
+
     start_time = datetime.now()
-    
-    if args.all:
-        import_lookups(client, args.dry_run)
-        import_properties(client, args.dry_run)
-        import_sales(client, args.dry_run)
-        import_buildings(client, args.dry_run)
-        import_land(client, args.dry_run)
-        import_values(client, args.dry_run)
-        import_exemptions(client, args.dry_run)
-    elif args.table:
-        table_map = {
-            'properties': import_properties,
-            'sales': import_sales,
-            'buildings': import_buildings,
-            'land': import_land,
-            'values': import_values,
-            'exemptions': import_exemptions,
-            'lookups': import_lookups,
-        }
-        
-        if args.table in table_map:
-            table_map[args.table](client, args.dry_run)
-        else:
-            print(f"Unknown table: {args.table}")
-            print(f"Available tables: {', '.join(table_map.keys())}")
-            sys.exit(1)
-    
+
+    names = list(IMPORTS) if args.all else [args.table]
+    for name in names:
+        for spec in IMPORTS[name]:
+            import_table(client, spec, args.dry_run, args.encoding, args.workers, args.resume)
+
     end_time = datetime.now()
     duration = end_time - start_time
     print(f"\n=== Import completed in {duration} ===")
 
 if __name__ == '__main__':
     main()
-
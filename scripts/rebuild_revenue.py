@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Rebuild the city x zip x dealer x month revenue rollup behind /api/v1/revenue
+from the payments table. Run after bulk loads that bypass the write hooks.
+
+Usage:
+    python scripts/rebuild_revenue.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    from app import create_app
+    from app.revenue import query_revenue, rebuild_revenue
+    
+    app = create_app()
+    
+    with app.app_context():
+        cells = rebuild_revenue()
+        (amount, count), = query_revenue()
+    
+    print(f"Rollup cells: {cells}")
+    print(f"Payments: {count or 0}")
+    print(f"Total revenue: ${amount or 0:,.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Re-derive the compliance summary used by the dashboard and /api/v1/stats
+from the properties and payments tables, reporting any drift from the
+incrementally maintained row.
+
+Usage:
+    python scripts/rebuild_summary.py          # rebuild and report drift
+    python scripts/rebuild_summary.py --check  # report drift, exit 1 if any, don't store
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the compliance summary and check for drift')
+    parser.add_argument('--check', action='store_true', help='Only report drift; do not store the rebuilt summary')
+    args = parser.parse_args()
+    
+    from app import create_app
+    from app.summary import check_drift, rebuild_summary
+    
+    app = create_app()
+    
+    with app.app_context():
+        if args.check:
+            summary, drift = check_drift()
+        else:
+            summary, drift = rebuild_summary()
+        
+        for key, value in summary.items():
+            print(f"{key}: {value}")
+        
+        if drift:
+            print(f"\nDrift detected in {len(drift)} field(s):")
+            for key, (stored, actual) in drift.items():
+                print(f"  {key}: stored={stored} actual={actual}")
+        else:
+            print("\nNo drift.")
+        
+        if args.check and drift:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Recompute Property.compliance_scenario for the whole roll in one set-based
+SQL pass (app.compliance), or only for properties changed since the last run.
+
+Usage:
+    python scripts/recompute_compliance.py                # full pass
+    python scripts/recompute_compliance.py --incremental  # only properties touched since the last run
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute property compliance scenarios')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only check properties updated or paid since the last completed run')
+    args = parser.parse_args()
+    
+    from app import create_app
+    from app.compliance import recompute_compliance
+    from app.summary import get_summary
+    
+    app = create_app()
+    
+    with app.app_context():
+        stats = recompute_compliance(incremental=args.incremental)
+        summary = get_summary()
+    
+    print(f"Mode: {stats['mode']}")
+    print(f"Properties checked: {stats['checked']}")
+    print(f"Properties changed: {stats['changed']}")
+    for i in range(1, 5):
+        print(f"Scenario {i}: {summary[f'scenario_{i}']} properties")
+    print(f"Completed in {stats['seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Reconcile TDT payments against their expected amounts per property and month,
+and store under- and over-payments in the payment_reconciliations table.
+
+Usage:
+    python scripts/reconcile_payments.py                  # every payment
+    python scripts/reconcile_payments.py --year 2024      # only months in 2024
+    python scripts/reconcile_payments.py --tolerance 5    # ignore differences up to $5
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reconcile expected vs actual TDT payments')
+    parser.add_argument('--year', type=int, help='Only reconcile months in this year')
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help='Largest difference in dollars that is not flagged (default 1.00)')
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.reconciliation import DEFAULT_TOLERANCE, reconcile_payments
+
+    app = create_app()
+
+    with app.app_context():
+        tolerance = DEFAULT_TOLERANCE if args.tolerance is None else args.tolerance
+        stats = reconcile_payments(year=args.year, tolerance=tolerance)
+
+    print(f"Scope: {stats['year'] or 'all years'}")
+    print(f"Payments read: {stats['payments']}")
+    print(f"Property-months reconciled: {stats['periods']}")
+    print(f"Underpaid: {stats['underpaid']}")
+    print(f"Overpaid: {stats['overpaid']}")
+    print(f"Completed in {stats['seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Register properties in bulk, in one transaction, with block-allocated TDT numbers.
+
+The web app's compliance worker isn't running here, so the registered
+properties' compliance scenarios are recomputed before the script exits.
+
+Usage:
+    python scripts/register_properties.py --parcel-file parcels.txt    # one parcel ID per line
+    python scripts/register_properties.py --ids 12 57 1034             # property IDs
+    python scripts/register_properties.py --parcel-file parcels.txt --year 2025 --output issued.csv
+"""
+
+import os
+import sys
+import argparse
+import csv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def read_parcel_ids(path):
+    with open(path, newline='') as f:
+        return [line.strip().strip('"') for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Register properties and issue TDT numbers')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--parcel-file', help='Text file with one parcel ID per line')
+    source.add_argument('--ids', type=int, nargs='+', help='Property IDs')
+    parser.add_argument('--year', type=int, help='Year of the TDT numbers (default: this year)')
+    parser.add_argument('--output', help='Write property_id,parcel_id,status,tdt_number rows to this CSV')
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.compliance import recompute_compliance
+    from app.registration import register_properties
+
+    app = create_app()
+
+    with app.app_context():
+        if args.parcel_file:
+            results = register_properties(read_parcel_ids(args.parcel_file), key_field='parcel_id', year=args.year)
+        else:
+            results = register_properties(args.ids, key_field='id', year=args.year)
+
+        registered_ids = [r['property_id'] for r in results if r['status'] == 'registered']
+        stats = recompute_compliance(property_ids=registered_ids) if registered_ids else None
+
+    counts = {'registered': 0, 'already_registered': 0, 'not_found': 0}
+    for result in results:
+        counts[result['status']] += 1
+
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['property_id', 'parcel_id', 'status', 'tdt_number'])
+            writer.writeheader()
+            writer.writerows(results)
+
+    print(f"Registered: {counts['registered']}")
+    print(f"Already registered: {counts['already_registered']}")
+    print(f"Not found: {counts['not_found']}")
+    if stats:
+        print(f"Compliance scenarios changed: {stats['changed']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Score every property for how likely it is to be an unregistered vacation
+rental and store the scores in rental_risk_scores.
+
+Usage:
+    python scripts/score_rental_risk.py             # rescore the roll
+    python scripts/score_rental_risk.py --top 25    # and list the 25 highest unregistered
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score properties for unregistered rental risk')
+    parser.add_argument('--top', type=int, default=0, help='List this many top-scoring unregistered properties')
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.rental_risk import HIGH_RISK_SCORE, score_properties, signal_names, top_risk
+
+    app = create_app()
+
+    with app.app_context():
+        stats = score_properties()
+        top = top_risk(args.top) if args.top else []
+
+    print(f"Properties scored: {stats['properties']}")
+    for name, count in stats['signals'].items():
+        print(f"  {name}: {count}")
+    print(f"Unregistered with score >= {HIGH_RISK_SCORE}: {stats['high_risk_unregistered']}")
+    print(f"Completed in {stats['seconds']}s")
+
+    for row in top:
+        print(f"{row.score:>4}  {row.parcel_id:<15} {row.address}, {row.city}  ({', '.join(signal_names(row.signals))})")
+
+
+if __name__ == '__main__':
+    main()
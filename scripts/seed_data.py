@@ -173,11 +173,11 @@ def generate_parcel_id():
     return f"{random.randint(1000, 9999)}-{random.randint(10, 99)}-{random.randint(1000, 9999)}"
 
 
-def generate_tdt_number(year=None):
-    """Generate a TDT number."""
-    if not year:
-        year = random.choice([2022, 2023, 2024, 2025])
-    return f"TDT-{year}-{random.randint(100000, 999999)}"
+def generate_tdt_number():
+    """Issue a TDT number for a random recent year from the app's allocator, so it
+    can't collide with numbers the app issues later."""
+    from app.id_allocator import next_tdt_numbers
+    return next_tdt_numbers(1, random.choice([2022, 2023, 2024, 2025]))[0]
 
 
 def assign_compliance_scenario(is_registered, has_payments, payment_correct):
@@ -278,13 +278,29 @@ def create_property_from_data(db, Property, TDTPayment, dealer_objects, addr_dat
 def seed_database():
     """Main seeding function."""
     from app import create_app, db
-    from app.models import Property, Dealer, TDTPayment
+    from app.models import (
+        Property, Dealer, TDTPayment, PaymentIdempotencyKey, PaymentReconciliation, RentalRiskScore,
+        ComplianceRun,
+    )
+    from app.migrations import CHILD_MODELS
+    from app.summary import rebuild_summary
+    from app.revenue import rebuild_revenue
     
     app = create_app()
     
     with app.app_context():
         print("Clearing existing data...")
+        # Children before parents: Query.delete() doesn't cascade, and PostgreSQL
+        # enforces the foreign keys
+        PaymentIdempotencyKey.query.delete()
+        PaymentReconciliation.query.delete()
+        RentalRiskScore.query.delete()
+        ComplianceRun.query.delete()
         TDTPayment.query.delete()
+        # County rows stay, unlinked; backfill_property_ids() relinks them by parcel_id
+        for model in CHILD_MODELS:
+            model.query.filter(model.property_id.isnot(None)) \
+                .update({model.property_id: None}, synchronize_session=False)
         Property.query.delete()
         Dealer.query.delete()
         db.session.commit()
@@ -360,6 +376,10 @@ def seed_database():
         
         db.session.commit()
         
+        # Query.delete() above bypasses the summary and revenue write hooks
+        rebuild_summary()
+        rebuild_revenue()
+        
         print(f"\n{'='*50}")
         print("SEEDING COMPLETE")
         print(f"{'='*50}")
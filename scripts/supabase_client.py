@@ -1,4 +1,10 @@
 import os
+import json
+import random
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
@@ -13,23 +19,254 @@ def get_supabase_client() -> Client:
     
     return create_client(url, key)
 
-def batch_insert(client: Client, table_name: str, records: list, batch_size: int = 1000):
-    total = len(records)
-    inserted = 0
-    errors = []
-    
-    for i in range(0, total, batch_size):
-        batch = records[i:i + batch_size]
-        try:
-            response = client.table(table_name).insert(batch).execute()
-            inserted += len(batch)
-            print(f"Inserted {inserted}/{total} records into {table_name}")
-        except Exception as e:
-            error_msg = f"Error inserting batch {i//batch_size + 1} into {table_name}: {str(e)}"
-            print(error_msg)
-            errors.append(error_msg)
-    
-    return inserted, errors
+# SQLSTATE classes: rows the database rejected (data exceptions, constraint violations),
+# and conditions worth retrying (connection, transaction rollback, resources, operator intervention)
+ROW_ERROR_CLASSES = ('22', '23')
+TRANSIENT_ERROR_CLASSES = ('08', '40', '53', '57')
+
+def error_class(error):
+    """'row', 'transient' or 'fatal' for an insert failure.
+
+    PostgREST errors carry the SQLSTATE in `code`; anything without one
+    (timeouts, dropped connections, gateway errors) is treated as transient.
+    """
+    code = str(getattr(error, 'code', None) or '')
+    if code[:2] in ROW_ERROR_CLASSES:
+        return 'row'
+    if not code or code[:2] in TRANSIENT_ERROR_CLASSES:
+        return 'transient'
+    return 'fatal'
+
+# offset: position of the first row in the record stream; fresh: cut from the stream, not a bisected half;
+# siblings: the _Siblings this half belongs to, for halves of a bisected batch
+_Batch = namedtuple('_Batch', ['offset', 'rows', 'attempt', 'fresh', 'siblings'], defaults=[None])
+
+class _Siblings:
+    """The halves of one bisected batch, and how each of them ended.
+
+    A half that fails with its parent's SQLSTATE waits for its sibling: if the
+    sibling fails with that code too the error is one every row shares, and
+    both are failed whole; otherwise the bad rows are in this half and it is
+    bisected further.
+    """
+
+    def __init__(self, code):
+        self.code = code
+        self.open = 2  # halves not yet stored or failed
+        self.waiting = []  # (half, error) for halves that failed with `code`
+
+class BatchUploader:
+    """Inserts a stream of records with a bounded number of batches in flight.
+
+    Transient failures are retried with exponential backoff, re-cut to the
+    reduced batch size. Batches the database rejects are bisected down to
+    the bad rows, so the rest still land. When both halves of a batch fail
+    with the batch's own code, the error is one every row shares (a type or
+    schema mismatch) and both are failed whole, rather than costing a request
+    and a log line per row. The batch size grows while requests return well
+    under `target_seconds` and shrinks when they are slower than that or
+    their payload passes `max_payload_bytes`.
+
+    With `on_conflict` (PostgREST's comma-separated key columns) rows are
+    upserted on that key instead of inserted, so sending a row twice is
+    harmless. A key repeated within one batch is sent once, as its last row
+    in the batch; across batches, which run concurrently, the row stored last
+    for a key is whichever batch finished last. `inserted` counts the rows
+    sent after that per-batch dedupe. `on_progress(committed, end)` is called whenever the stream
+    position below which every row is settled advances; rows count as
+    settled once stored or rejected on their own, and a batch that fails
+    for any other reason holds the position back. `end` is None until the
+    stream is exhausted, then its final offset. Offsets start at
+    `start_offset`.
+    """
+
+    def __init__(self, client: Client, table_name: str, batch_size: int = 1000, max_in_flight: int = 4,
+                 max_retries: int = 4, backoff_seconds: float = 0.5, target_seconds: float = 2.0,
+                 max_payload_bytes: int = 4 << 20, min_batch_size: int = 50, max_batch_size: int = 10000,
+                 on_conflict: str = None, start_offset: int = 0, on_progress=None):
+        self.client = client
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.target_seconds = target_seconds
+        self.max_payload_bytes = max_payload_bytes
+        self.min_batch_size = min(min_batch_size, batch_size)
+        self.max_batch_size = max(max_batch_size, batch_size)
+        self.on_conflict = on_conflict
+        self.start_offset = start_offset
+        self.on_progress = on_progress
+        self.committed = start_offset
+        self._settled = {}
+        self.inserted = 0
+        self.errors = []
+
+    def run(self, records):
+        total = len(records) if hasattr(records, '__len__') else None
+        iterator = iter(records)
+        offset = self.start_offset
+        exhausted = False
+        retries = deque()
+        pending = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            while True:
+                while len(pending) < self.max_in_flight:
+                    if retries:
+                        batch = retries.popleft()
+                    elif not exhausted:
+                        rows = list(islice(iterator, self.batch_size))
+                        if not rows:
+                            exhausted = True
+                            continue
+                        batch = _Batch(offset, rows, 0, True)
+                        offset += len(rows)
+                    else:
+                        break
+                    pending[pool.submit(self._send, batch)] = batch
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = pending.pop(future)
+                    try:
+                        elapsed, payload_bytes, sent = future.result()
+                    except Exception as e:
+                        self._failed(batch, e, retries)
+                        continue
+                    self.inserted += sent
+                    self._sibling_done(batch, retries)
+                    if batch.fresh:
+                        self._adapt(len(batch.rows), elapsed, payload_bytes)
+                    progress = f"{self.inserted}/{total}" if total is not None else f"{self.inserted}"
+                    print(f"Inserted {progress} records into {self.table_name} (batch size {self.batch_size})")
+                    self._settle(batch)
+
+        if self.on_progress:
+            self.on_progress(self.committed, offset)
+        return self.inserted, self.errors
+
+    def _send(self, batch):
+        if batch.attempt:
+            time.sleep(self.backoff_seconds * 2 ** (batch.attempt - 1) * random.uniform(0.5, 1.5))
+        rows = batch.rows
+        table = self.client.table(self.table_name)
+        if self.on_conflict:
+            # A key twice in one upsert is an error; keep the last row for each key in this batch
+            columns = self.on_conflict.split(',')
+            rows = list({tuple(row.get(c) for c in columns): row for row in rows}.values())
+        payload_bytes = len(json.dumps(rows, default=str))
+        started = time.perf_counter()
+        if self.on_conflict:
+            table.upsert(rows, on_conflict=self.on_conflict).execute()
+        else:
+            table.insert(rows).execute()
+        return time.perf_counter() - started, payload_bytes, len(rows)
+
+    def _failed(self, batch, error, retries):
+        kind = error_class(error)
+        code = str(getattr(error, 'code', None) or '')
+        siblings = batch.siblings
+        if kind == 'row' and siblings is not None and code == siblings.code:
+            siblings.open -= 1
+            siblings.waiting.append((batch, error))
+            if len(siblings.waiting) == 2:
+                # Both halves share their parent's error: fail them whole
+                for half, half_error in siblings.waiting:
+                    self._give_up(half, half_error, kind)
+            elif siblings.open == 0:
+                self._bisect(batch, code, error, retries)
+            # Otherwise wait for the sibling's outcome
+        elif kind == 'row':
+            self._sibling_done(batch, retries)
+            self._bisect(batch, code, error, retries)
+        elif kind == 'transient' and batch.attempt < self.max_retries:
+            first, last = batch.offset, batch.offset + len(batch.rows) - 1
+            print(f"Retrying records {first}-{last} of {self.table_name} after error: {error}")
+            # Slow or oversized requests time out; resend this one, and cut later ones, smaller.
+            # A bisected half is resent whole so it still pairs with its sibling.
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+            size = len(batch.rows) if siblings is not None else self.batch_size
+            for start in range(0, len(batch.rows), size):
+                retries.append(batch._replace(offset=batch.offset + start,
+                                              rows=batch.rows[start:start + size],
+                                              attempt=batch.attempt + 1))
+        else:
+            self._sibling_done(batch, retries)
+            self._give_up(batch, error, kind)
+
+    def _bisect(self, batch, code, error, retries):
+        if len(batch.rows) == 1:
+            self._give_up(batch, error, 'row')
+            return
+        half = len(batch.rows) // 2
+        siblings = _Siblings(code)
+        retries.appendleft(_Batch(batch.offset + half, batch.rows[half:], 0, False, siblings))
+        retries.appendleft(_Batch(batch.offset, batch.rows[:half], 0, False, siblings))
+
+    def _sibling_done(self, batch, retries):
+        """Record that a half ended other than by failing with its parent's code; a sibling
+        waiting on that outcome holds the bad rows and is bisected."""
+        siblings = batch.siblings
+        if siblings is None:
+            return
+        siblings.open -= 1
+        if siblings.open == 0 and len(siblings.waiting) == 1:
+            waiting, error = siblings.waiting[0]
+            self._bisect(waiting, siblings.code, error, retries)
+
+    def _give_up(self, batch, error, kind):
+        first, last = batch.offset, batch.offset + len(batch.rows) - 1
+        span = f"record {first}" if first == last else f"records {first}-{last}"
+        error_msg = f"Error inserting {span} into {self.table_name}: {str(error)}"
+        print(error_msg)
+        self.errors.append(error_msg)
+        if kind == 'row':
+            self._settle(batch)
+
+    def _settle(self, batch):
+        self._settled[batch.offset] = batch.offset + len(batch.rows)
+        committed = self.committed
+        while committed in self._settled:
+            committed = self._settled.pop(committed)
+        if committed != self.committed:
+            self.committed = committed
+            if self.on_progress:
+                self.on_progress(committed, None)
+
+    def _adapt(self, rows, elapsed, payload_bytes):
+        size = self.batch_size
+        if elapsed > self.target_seconds or payload_bytes > self.max_payload_bytes:
+            size = size // 2
+        elif elapsed < self.target_seconds / 2:
+            size = size * 3 // 2
+        # Keep the next payload under the cap at this batch's bytes per row
+        size = min(size, self.max_payload_bytes * rows // max(payload_bytes, 1))
+        self.batch_size = max(self.min_batch_size, min(self.max_batch_size, size))
+
+def batch_insert(client: Client, table_name: str, records, batch_size: int = 1000, max_in_flight: int = 4,
+                 on_conflict: str = None, start_offset: int = 0, on_progress=None):
+    """Insert (or upsert on `on_conflict`) a list or a generator of records; see BatchUploader.
+
+    Returns (inserted, errors).
+    """
+    uploader = BatchUploader(client, table_name, batch_size=batch_size, max_in_flight=max_in_flight,
+                             on_conflict=on_conflict, start_offset=start_offset, on_progress=on_progress)
+    return uploader.run(records)
+
+def fetch_all(client: Client, table_name: str, columns: str, page_size: int = 1000):
+    """Read every row of a table, page by page (PostgREST caps each response)."""
+    rows = []
+    start = 0
+    while True:
+        response = client.table(table_name).select(columns).order('id').range(start, start + page_size - 1).execute()
+        rows.extend(response.data)
+        if len(response.data) < page_size:
+            return rows
+        start += page_size
 
 def truncate_table(client: Client, table_name: str):
     try:
@@ -0,0 +1,48 @@
+-- Migration: Add an integer property_id to the parcel child tables
+-- Run this in Supabase SQL Editor. Safe to re-run: existing columns and indexes
+-- are skipped and the backfill only touches rows that don't have property_id yet.
+-- Mirrors app/migrations.py; parcel_id stays on every row as the county key.
+
+ALTER TABLE sales ADD COLUMN IF NOT EXISTS property_id INTEGER REFERENCES properties(id) ON DELETE CASCADE;
+ALTER TABLE buildings ADD COLUMN IF NOT EXISTS property_id INTEGER REFERENCES properties(id) ON DELETE CASCADE;
+ALTER TABLE land ADD COLUMN IF NOT EXISTS property_id INTEGER REFERENCES properties(id) ON DELETE CASCADE;
+ALTER TABLE property_values ADD COLUMN IF NOT EXISTS property_id INTEGER REFERENCES properties(id) ON DELETE CASCADE;
+ALTER TABLE exemptions ADD COLUMN IF NOT EXISTS property_id INTEGER REFERENCES properties(id) ON DELETE CASCADE;
+
+-- Backfill from parcel_id
+UPDATE sales c SET property_id = p.id FROM properties p
+    WHERE p.parcel_id = c.parcel_id AND c.property_id IS NULL;
+UPDATE buildings c SET property_id = p.id FROM properties p
+    WHERE p.parcel_id = c.parcel_id AND c.property_id IS NULL;
+UPDATE land c SET property_id = p.id FROM properties p
+    WHERE p.parcel_id = c.parcel_id AND c.property_id IS NULL;
+UPDATE property_values c SET property_id = p.id FROM properties p
+    WHERE p.parcel_id = c.parcel_id AND c.property_id IS NULL;
+UPDATE exemptions c SET property_id = p.id FROM properties p
+    WHERE p.parcel_id = c.parcel_id AND c.property_id IS NULL;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_sales_property') THEN
+        CREATE INDEX idx_sales_property ON sales(property_id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_buildings_property') THEN
+        CREATE INDEX idx_buildings_property ON buildings(property_id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_land_property') THEN
+        CREATE INDEX idx_land_property ON land(property_id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_values_property') THEN
+        CREATE INDEX idx_values_property ON property_values(property_id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_exemptions_property') THEN
+        CREATE INDEX idx_exemptions_property ON exemptions(property_id);
+    END IF;
+END $$;
+
+-- Child rows whose parcel has no property (should be 0 after a full import)
+SELECT 'sales' AS table_name, COUNT(*) AS unresolved FROM sales WHERE property_id IS NULL
+UNION ALL SELECT 'buildings', COUNT(*) FROM buildings WHERE property_id IS NULL
+UNION ALL SELECT 'land', COUNT(*) FROM land WHERE property_id IS NULL
+UNION ALL SELECT 'property_values', COUNT(*) FROM property_values WHERE property_id IS NULL
+UNION ALL SELECT 'exemptions', COUNT(*) FROM exemptions WHERE property_id IS NULL;
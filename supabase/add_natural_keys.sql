@@ -0,0 +1,37 @@
+-- Migration: Unique natural keys on the county tables, for idempotent imports
+-- Run this in Supabase SQL Editor before importing with the upserting
+-- scripts/import_county_data.py. Safe to re-run: existing indexes are skipped.
+-- Rows imported more than once by earlier plain-insert runs are collapsed to the
+-- most recently inserted copy first, or the unique indexes could not be built.
+-- NULLS NOT DISTINCT (PostgreSQL 15+) so rows missing part of the key still match.
+-- properties.parcel_id and the lookup codes are already unique.
+
+DELETE FROM sales a USING sales b
+    WHERE a.parcel_id = b.parcel_id AND a.sequence IS NOT DISTINCT FROM b.sequence AND a.id < b.id;
+DELETE FROM buildings a USING buildings b
+    WHERE a.parcel_id = b.parcel_id AND a.card_number IS NOT DISTINCT FROM b.card_number AND a.id < b.id;
+DELETE FROM land a USING land b
+    WHERE a.parcel_id = b.parcel_id AND a.seq_number IS NOT DISTINCT FROM b.seq_number AND a.id < b.id;
+DELETE FROM property_values a USING property_values b
+    WHERE a.parcel_id = b.parcel_id AND a.id < b.id;
+DELETE FROM exemptions a USING exemptions b
+    WHERE a.parcel_id = b.parcel_id AND a.exemption_code IS NOT DISTINCT FROM b.exemption_code AND a.id < b.id;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'uq_sales_natural_key') THEN
+        CREATE UNIQUE INDEX uq_sales_natural_key ON sales(parcel_id, sequence) NULLS NOT DISTINCT;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'uq_buildings_natural_key') THEN
+        CREATE UNIQUE INDEX uq_buildings_natural_key ON buildings(parcel_id, card_number) NULLS NOT DISTINCT;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'uq_land_natural_key') THEN
+        CREATE UNIQUE INDEX uq_land_natural_key ON land(parcel_id, seq_number) NULLS NOT DISTINCT;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'uq_values_natural_key') THEN
+        CREATE UNIQUE INDEX uq_values_natural_key ON property_values(parcel_id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'uq_exemptions_natural_key') THEN
+        CREATE UNIQUE INDEX uq_exemptions_natural_key ON exemptions(parcel_id, exemption_code) NULLS NOT DISTINCT;
+    END IF;
+END $$;
@@ -0,0 +1,81 @@
+-- Migration: Add indexes for the hot read paths
+-- Run this in Supabase SQL Editor. Safe to re-run: existing indexes are skipped.
+-- Same names as the indexes the Flask app creates on startup (app/indexes.py)
+
+DO $$ 
+BEGIN
+    -- Compliance filters and dashboard counts
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_properties_compliance') THEN
+        CREATE INDEX idx_properties_compliance ON properties(compliance_scenario);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_properties_registered') THEN
+        CREATE INDEX idx_properties_registered ON properties(is_registered);
+    END IF;
+    -- Map viewport queries
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_properties_lat_lng') THEN
+        CREATE INDEX idx_properties_lat_lng ON properties(lat, lng);
+    END IF;
+    -- Incremental compliance runs
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_properties_updated_at') THEN
+        CREATE INDEX idx_properties_updated_at ON properties(updated_at);
+    END IF;
+    -- Property list sorts
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_properties_address_id') THEN
+        CREATE INDEX idx_properties_address_id ON properties(address, id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_properties_city_id') THEN
+        CREATE INDEX idx_properties_city_id ON properties(city, id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_properties_tdt_number_id') THEN
+        CREATE INDEX idx_properties_tdt_number_id ON properties(tdt_number, id);
+    END IF;
+    -- Short typeahead prefixes
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_properties_address_lower') THEN
+        CREATE INDEX idx_properties_address_lower ON properties(lower(address));
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_properties_parcel_lower') THEN
+        CREATE INDEX idx_properties_parcel_lower ON properties(lower(parcel_id));
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_properties_tdt_number_lower') THEN
+        CREATE INDEX idx_properties_tdt_number_lower ON properties(lower(tdt_number));
+    END IF;
+    
+    -- Payment history, ledger filters and recent transactions
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_payments_property') THEN
+        CREATE INDEX idx_payments_property ON payments(property_id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_payments_created_at') THEN
+        CREATE INDEX idx_payments_created_at ON payments(created_at);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_payments_dealer_created') THEN
+        CREATE INDEX idx_payments_dealer_created ON payments(dealer_id, created_at, id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_payments_verified_created') THEN
+        CREATE INDEX idx_payments_verified_created ON payments(verified, created_at, id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_payments_period') THEN
+        CREATE INDEX idx_payments_period ON payments(period_end, period_start);
+    END IF;
+    -- Superseded by idx_payments_dealer_created, which leads with dealer_id
+    DROP INDEX IF EXISTS idx_payments_dealer;
+    
+    -- County data joined to properties on parcel_id
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_sales_parcel') THEN
+        CREATE INDEX idx_sales_parcel ON sales(parcel_id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_buildings_parcel') THEN
+        CREATE INDEX idx_buildings_parcel ON buildings(parcel_id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_land_parcel') THEN
+        CREATE INDEX idx_land_parcel ON land(parcel_id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_values_parcel') THEN
+        CREATE INDEX idx_values_parcel ON property_values(parcel_id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_exemptions_parcel') THEN
+        CREATE INDEX idx_exemptions_parcel ON exemptions(parcel_id);
+    END IF;
+END $$;
+
+ANALYZE properties;
+ANALYZE payments;
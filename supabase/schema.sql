@@ -92,6 +92,7 @@ CREATE TABLE payments (
 -- Sales table
 CREATE TABLE sales (
     id SERIAL PRIMARY KEY,
+    property_id INTEGER REFERENCES properties(id) ON DELETE CASCADE,
     parcel_id VARCHAR(50) NOT NULL,
     sale_date TIMESTAMP WITH TIME ZONE,
     sequence INTEGER,
@@ -110,6 +111,7 @@ CREATE TABLE sales (
 -- Buildings table
 CREATE TABLE buildings (
     id SERIAL PRIMARY KEY,
+    property_id INTEGER REFERENCES properties(id) ON DELETE CASCADE,
     parcel_id VARCHAR(50) NOT NULL,
     card_number VARCHAR(10),
     avg_height_floor DECIMAL(6, 2),
@@ -155,6 +157,7 @@ CREATE TABLE buildings (
 -- Land table
 CREATE TABLE land (
     id SERIAL PRIMARY KEY,
+    property_id INTEGER REFERENCES properties(id) ON DELETE CASCADE,
     parcel_id VARCHAR(50) NOT NULL,
     seq_number VARCHAR(10),
     line_type VARCHAR(10),
@@ -169,6 +172,7 @@ CREATE TABLE land (
 -- Values table
 CREATE TABLE property_values (
     id SERIAL PRIMARY KEY,
+    property_id INTEGER REFERENCES properties(id) ON DELETE CASCADE,
     parcel_id VARCHAR(50) NOT NULL,
     total_value DECIMAL(12, 2),
     land_value DECIMAL(12, 2),
@@ -187,6 +191,7 @@ CREATE TABLE property_values (
 -- Exemptions table
 CREATE TABLE exemptions (
     id SERIAL PRIMARY KEY,
+    property_id INTEGER REFERENCES properties(id) ON DELETE CASCADE,
     parcel_id VARCHAR(50) NOT NULL,
     exemption_code VARCHAR(10),
     amount_off_total_assessment DECIMAL(12, 2),
@@ -222,14 +227,37 @@ CREATE INDEX idx_properties_registered ON properties(is_registered);
 CREATE INDEX idx_properties_parcel ON properties(parcel_id);
 CREATE INDEX idx_properties_land_use ON properties(land_use_code);
 CREATE INDEX idx_properties_neighborhood ON properties(neighborhood_code);
+CREATE INDEX idx_properties_address_id ON properties(address, id);
+CREATE INDEX idx_properties_city_id ON properties(city, id);
+CREATE INDEX idx_properties_tdt_number_id ON properties(tdt_number, id);
+CREATE INDEX idx_properties_lat_lng ON properties(lat, lng);
+CREATE INDEX idx_properties_updated_at ON properties(updated_at);
+CREATE INDEX idx_properties_address_lower ON properties(lower(address));
+CREATE INDEX idx_properties_parcel_lower ON properties(lower(parcel_id));
+CREATE INDEX idx_properties_tdt_number_lower ON properties(lower(tdt_number));
 CREATE INDEX idx_payments_property ON payments(property_id);
-CREATE INDEX idx_payments_dealer ON payments(dealer_id);
+CREATE INDEX idx_payments_created_at ON payments(created_at);
+CREATE INDEX idx_payments_dealer_created ON payments(dealer_id, created_at, id);
+CREATE INDEX idx_payments_verified_created ON payments(verified, created_at, id);
+CREATE INDEX idx_payments_period ON payments(period_end, period_start);
 CREATE INDEX idx_sales_parcel ON sales(parcel_id);
+CREATE INDEX idx_sales_property ON sales(property_id);
 CREATE INDEX idx_sales_date ON sales(sale_date);
 CREATE INDEX idx_buildings_parcel ON buildings(parcel_id);
+CREATE INDEX idx_buildings_property ON buildings(property_id);
 CREATE INDEX idx_land_parcel ON land(parcel_id);
+CREATE INDEX idx_land_property ON land(property_id);
 CREATE INDEX idx_values_parcel ON property_values(parcel_id);
+CREATE INDEX idx_values_property ON property_values(property_id);
 CREATE INDEX idx_exemptions_parcel ON exemptions(parcel_id);
+CREATE INDEX idx_exemptions_property ON exemptions(property_id);
+
+-- Natural keys the county import upserts on (supabase/add_natural_keys.sql)
+CREATE UNIQUE INDEX uq_sales_natural_key ON sales(parcel_id, sequence) NULLS NOT DISTINCT;
+CREATE UNIQUE INDEX uq_buildings_natural_key ON buildings(parcel_id, card_number) NULLS NOT DISTINCT;
+CREATE UNIQUE INDEX uq_land_natural_key ON land(parcel_id, seq_number) NULLS NOT DISTINCT;
+CREATE UNIQUE INDEX uq_values_natural_key ON property_values(parcel_id);
+CREATE UNIQUE INDEX uq_exemptions_natural_key ON exemptions(parcel_id, exemption_code) NULLS NOT DISTINCT;
 
 -- Enable Row Level Security (optional but recommended)
 ALTER TABLE dealers ENABLE ROW LEVEL SECURITY;
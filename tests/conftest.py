@@ -0,0 +1,28 @@
+import os
+
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['COMPLIANCE_WORKER_ENABLED'] = 'false'
+
+import pytest
+
+from app import create_app, db
+from app.http_cache import response_cache
+from app.lookup_cache import lookup_cache
+
+
+@pytest.fixture
+def app():
+    # Process-wide caches would otherwise serve another test's database
+    response_cache.clear()
+    lookup_cache.clear()
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,56 @@
+import json
+
+from app import db
+from app.http_cache import bump_data_version
+from app.models import Property
+
+
+def add_properties(count):
+    db.session.execute(db.insert(Property), [
+        {'parcel_id': f'P{i:04d}', 'address': f'{i} MAIN ST', 'city': 'Sarasota', 'zip_code': '34236'}
+        for i in range(count)
+    ])
+    bump_data_version('properties')
+    db.session.commit()
+
+
+def test_keyset_pages_walk_every_property_once(client):
+    add_properties(25)
+
+    seen, after, pages = [], 0, 0
+    while True:
+        response = client.get(f'/api/v1/properties?after={after}&limit=10')
+        assert response.status_code == 200
+        seen.extend(row['id'] for row in response.json)
+        pages += 1
+        if 'X-Next-Cursor' not in response.headers:
+            break
+        after = int(response.headers['X-Next-Cursor'])
+        assert f'after={after}' in response.headers['Link']
+
+    assert pages == 3
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) == 25
+
+
+def test_fields_projects_columns_and_always_includes_id(client):
+    add_properties(3)
+
+    response = client.get('/api/v1/properties?fields=parcel_id,city')
+    assert [set(row) for row in response.json] == [{'id', 'parcel_id', 'city'}] * 3
+
+    response = client.get('/api/v1/properties?fields=parcel_id,nope')
+    assert response.status_code == 400
+    assert 'nope' in response.json['error']
+
+
+def test_ndjson_streams_every_row_after_the_cursor(client):
+    add_properties(12)
+    first = client.get('/api/v1/properties?limit=5')
+    after = first.headers['X-Next-Cursor']
+
+    response = client.get(f'/api/v1/properties?after={after}&format=ndjson&fields=parcel_id')
+    rows = [json.loads(line) for line in response.data.splitlines()]
+
+    assert response.mimetype == 'application/x-ndjson'
+    assert [row['parcel_id'] for row in rows] == [f'P{i:04d}' for i in range(5, 12)]
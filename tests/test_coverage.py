@@ -0,0 +1,57 @@
+from datetime import date, timedelta
+
+from app import db
+from app.coverage import build_coverage_report, mask_to_months
+from app.models import Property, TDTPayment
+
+
+def add_property(parcel_id, periods):
+    prop = Property(parcel_id=parcel_id, address=f'{parcel_id} MAIN ST', city='Sarasota',
+                    zip_code='34236', is_registered=True)
+    db.session.add(prop)
+    db.session.flush()
+    for start, end in periods:
+        db.session.add(TDTPayment(property_id=prop.id, amount=100.0, period_start=start, period_end=end))
+    db.session.commit()
+    return prop.id
+
+
+def report_for(property_id, through=3):
+    report = build_coverage_report(2025, through=through)
+    for pid, _, gap_mask, overlap_mask in report['rows']:
+        if pid == property_id:
+            return mask_to_months(gap_mask), mask_to_months(overlap_mask)
+    return [], []
+
+
+def test_weekly_periods_tiling_the_quarter_have_no_gaps_or_overlaps(app):
+    periods = []
+    start = date(2025, 1, 1)
+    while start <= date(2025, 3, 31):
+        end = min(start + timedelta(days=6), date(2025, 3, 31))
+        periods.append((start, end))
+        start = end + timedelta(days=1)
+    pid = add_property('WEEKLY', periods)
+
+    assert report_for(pid) == ([], [])
+
+
+def test_semi_monthly_periods_have_no_gaps_or_overlaps(app):
+    periods = []
+    for month, last_day in ((1, 31), (2, 28), (3, 31)):
+        periods.append((date(2025, month, 1), date(2025, month, 14)))
+        periods.append((date(2025, month, 15), date(2025, month, last_day)))
+    pid = add_property('SEMIMONTHLY', periods)
+
+    assert report_for(pid) == ([], [])
+
+
+def test_missing_day_is_a_gap_and_doubled_day_is_an_overlap(app):
+    pid = add_property('PARTIAL', [
+        (date(2025, 1, 1), date(2025, 1, 30)),      # Jan 31 uncovered
+        (date(2025, 2, 1), date(2025, 2, 15)),
+        (date(2025, 2, 15), date(2025, 2, 28)),     # Feb 15 paid twice
+        (date(2025, 3, 1), date(2025, 3, 31)),
+    ])
+
+    assert report_for(pid) == ([1], [2])
@@ -0,0 +1,57 @@
+from app import db
+from app.http_cache import get_data_versions, response_cache
+from app.models import Dealer, Property
+
+
+def add_property(parcel_id):
+    db.session.add(Property(parcel_id=parcel_id, address=f'{parcel_id} MAIN ST', city='Sarasota',
+                            zip_code='34236'))
+    db.session.commit()
+
+
+def test_matching_etag_gets_304_until_the_scope_changes(client):
+    add_property('A')
+    first = client.get('/api/v1/properties')
+    etag = first.headers['ETag']
+
+    assert client.get('/api/v1/properties', headers={'If-None-Match': etag}).status_code == 304
+
+    add_property('B')
+    changed = client.get('/api/v1/properties', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert [row['parcel_id'] for row in changed.json] == ['A', 'B']
+
+
+def test_orm_writes_bump_only_their_scope_and_rollbacks_bump_nothing(app):
+    before = get_data_versions(('properties', 'dealers'))
+
+    db.session.add(Property(parcel_id='A', address='1 MAIN ST', city='Sarasota', zip_code='34236'))
+    db.session.flush()
+    db.session.rollback()
+    assert get_data_versions(('properties', 'dealers')) == before
+
+    db.session.add(Dealer(name='Airbnb', dealer_type='platform'))
+    db.session.commit()
+    assert get_data_versions(('properties', 'dealers')) == (before[0], before[1] + 1)
+
+
+def test_unchanged_data_is_served_from_the_response_cache(client):
+    add_property('A')
+    client.get('/api/v1/properties')
+    hits = response_cache.hits
+
+    response = client.get('/api/v1/properties')
+
+    assert response_cache.hits == hits + 1
+    assert response.json[0]['parcel_id'] == 'A'
+
+
+def test_representations_get_their_own_etag(client):
+    add_property('A')
+
+    as_json = client.get('/api/v1/properties', headers={'Accept': 'application/json'})
+    as_msgpack = client.get('/api/v1/properties', headers={'Accept': 'application/x-msgpack'})
+
+    assert as_json.headers['ETag'] != as_msgpack.headers['ETag']
+    assert as_msgpack.mimetype == 'application/x-msgpack'
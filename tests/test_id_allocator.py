@@ -0,0 +1,56 @@
+import re
+
+from app import db
+from app.id_allocator import next_tdt_numbers, next_transaction_ids
+from app.models import Property
+
+
+def add_property(parcel_id, **kwargs):
+    prop = Property(parcel_id=parcel_id, address=f'{parcel_id} MAIN ST', city='Sarasota',
+                    zip_code='34236', **kwargs)
+    db.session.add(prop)
+    db.session.commit()
+    return prop
+
+
+def test_tdt_numbers_continue_past_the_highest_issued_that_year(app):
+    add_property('A', tdt_number='TDT-2031-100500', is_registered=True)
+    add_property('B', tdt_number='TDT-2030-900000', is_registered=True)
+
+    numbers = next_tdt_numbers(3, year=2031)
+
+    assert numbers == ['TDT-2031-100501', 'TDT-2031-100502', 'TDT-2031-100503']
+
+
+def test_blocks_span_calls_and_a_rollback_never_reissues_committed_numbers(app):
+    committed = next_tdt_numbers(150, year=2031)
+    db.session.commit()
+    next_tdt_numbers(5, year=2031)
+    db.session.rollback()
+
+    later = next_tdt_numbers(10, year=2031)
+
+    assert len(set(committed)) == 150
+    assert not set(committed) & set(later)
+
+
+def test_transaction_ids_are_unique_formatted_and_not_consecutive(app):
+    ids = next_transaction_ids(2000)
+
+    assert len(set(ids)) == 2000
+    assert all(re.fullmatch(r'[0-9A-Z]{4}(-[0-9A-Z]{4}){3}', i) for i in ids)
+    assert ids[0][:4] != ids[1][:4]
+
+
+def test_batch_registration_numbers_each_new_property_once(client):
+    add_property('A')
+    add_property('B', tdt_number='TDT-2031-100000', is_registered=True)
+
+    response = client.post('/api/v1/properties/register/batch',
+                           json={'parcel_ids': ['A', 'B', 'C', 'A'], 'year': 2031})
+
+    assert response.status_code == 201
+    assert (response.json['registered'], response.json['already_registered'], response.json['not_found']) == (1, 1, 1)
+    registered = db.session.scalar(db.select(Property).where(Property.parcel_id == 'A'))
+    assert registered.is_registered
+    assert registered.tdt_number == 'TDT-2031-100001'
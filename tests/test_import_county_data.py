@@ -0,0 +1,127 @@
+import os
+import sys
+from collections import deque
+
+import pandas as pd
+import pytest
+
+# The repo's supabase/ SQL directory imports as an empty namespace package without the client
+if not hasattr(pytest.importorskip('supabase'), 'create_client'):
+    pytest.skip('supabase client not installed', allow_module_level=True)
+pytest.importorskip('dotenv')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import import_county_data as importer  # noqa: E402
+
+
+def test_column_map_cleans_each_kind_and_drops_rows_without_the_key():
+    chunk = pd.DataFrame({
+        'parcelid': [' 0001 ', '', '"0003"'],
+        'saledate': ['01/15/2020', '2020-02-01', 'not a date'],
+        'sequence': ['1', '2', '3.0'],
+        'saleprice': ['1,250,000', '', 'n/a'],
+    }, dtype=str)
+
+    records = importer.to_records(importer.transform(chunk, importer.SALES))
+
+    assert [r['parcel_id'] for r in records] == ['0001', '0003']
+    assert records[0]['sale_date'] == '2020-01-15T00:00:00'
+    assert records[1]['sale_date'] is None
+    assert [r['sequence'] for r in records] == [1, 3]
+    assert type(records[0]['sequence']) is int
+    assert records[0]['sale_price'] == 1250000.0
+    assert records[1]['sale_price'] is None
+    assert records[0]['book'] is None
+
+
+def test_defaults_and_derived_columns_fill_the_properties_map():
+    chunk = pd.DataFrame({
+        'ParcelID': ['0001', '0002'],
+        'StreetNumber': ['12', ''],
+        'LOCDescription': ['GULF OF MEXICO DR', 'MAIN ST'],
+        'LocCity': ['VENICE', ''],
+        'LocZip': ['', '34236'],
+    }, dtype=str)
+
+    records = importer.to_records(importer.transform(chunk, importer.PROPERTIES))
+
+    assert [r['address'] for r in records] == ['12 GULF OF MEXICO DR', '0 MAIN ST']
+    assert [r['city'] for r in records] == ['VENICE', 'Sarasota']
+    assert [r['zip_code'] for r in records] == ['00000', '34236']
+
+
+class FakeTable:
+    def __init__(self, client):
+        self.client = client
+        self.rows = None
+
+    def upsert(self, rows, on_conflict):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        self.client.stored.extend(row['n'] for row in self.rows)
+
+
+class FakeClient:
+    def __init__(self):
+        self.stored = []
+
+    def table(self, name):
+        return FakeTable(self)
+
+
+NUMBERED = importer.Table('Numbered', 'Numbered.txt', 'numbered', [
+    importer.Column('ParcelID', 'parcel_id'),
+    importer.Column('N', 'n', 'integer'),
+], batch_size=5)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(importer, 'ENCODING_CACHE', tmp_path / 'state' / 'encodings.json')
+    monkeypatch.setattr(importer, 'CHECKPOINT_DIR', tmp_path / 'state' / 'checkpoints')
+    monkeypatch.setattr(importer, 'READ_CHUNK_SIZE', 7)
+    # Every fourth row has no parcel ID, so records and file rows drift apart
+    lines = ['ParcelID,N'] + [f'{"" if i % 4 == 3 else f"P{i}"},{i}' for i in range(50)]
+    (tmp_path / NUMBERED.file).write_text('\n'.join(lines) + '\n')
+    return tmp_path
+
+
+def kept(rows):
+    return [i for i in rows if i % 4 != 3]
+
+
+def test_checkpoint_maps_committed_records_to_file_rows(data_dir, capsys):
+    chunks = deque()
+    records = list(importer.table_records(None, NUMBERED, data_dir / NUMBERED.file, 'utf-8', chunks=chunks))
+
+    for committed in (0, 3, 6, 10, len(records) - 1):
+        assert importer.rows_settled(deque(chunks), committed, 0) == records[committed]['n']
+    assert importer.rows_settled(deque(chunks), len(records), 0) == 50
+
+
+def test_resume_reads_only_rows_after_the_checkpoint(data_dir, capsys, monkeypatch):
+    client = FakeClient()
+    importer.import_table(client, NUMBERED)
+    state = importer.read_state(importer.checkpoint_path(NUMBERED))
+    assert client.stored == kept(range(50))
+    assert (state['rows_done'], state['complete']) == (50, True)
+
+    importer.write_state(importer.checkpoint_path(NUMBERED), {**state, 'rows_done': 22, 'complete': False})
+    transformed = []
+    transform = importer.transform
+
+    def spy(chunk, spec):
+        transformed.extend(chunk['N'])
+        return transform(chunk, spec)
+
+    monkeypatch.setattr(importer, 'transform', spy)
+    client = FakeClient()
+    importer.import_table(client, NUMBERED, resume=True)
+
+    assert transformed == [str(i) for i in range(22, 50)]
+    assert client.stored == kept(range(22, 50))
+    assert importer.read_state(importer.checkpoint_path(NUMBERED))['complete']
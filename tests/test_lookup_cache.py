@@ -0,0 +1,58 @@
+from app import db
+from app.lookup_cache import lookup_cache
+from app.models import Property
+
+
+def add_property(parcel_id, **kwargs):
+    prop = Property(parcel_id=parcel_id, address=f'{parcel_id} MAIN ST', city='Sarasota',
+                    zip_code='34236', **kwargs)
+    db.session.add(prop)
+    db.session.commit()
+    return prop
+
+
+def test_repeat_lookups_are_served_from_the_cache(client):
+    add_property('A', tdt_number='TDT-1')
+
+    first = client.get('/api/v1/properties/lookup?parcel_id=A')
+    hits = lookup_cache.hits
+    second = client.get('/api/v1/properties/lookup?parcel_id=A')
+
+    assert first.json == second.json
+    assert second.json['tdt_number'] == 'TDT-1'
+    assert lookup_cache.hits == hits + 1
+
+
+def test_an_update_invalidates_both_the_old_and_new_keys(client):
+    prop = add_property('A', tdt_number='TDT-1', is_registered=False)
+    client.get('/api/v1/properties/lookup?parcel_id=A')
+    client.get('/api/v1/properties/lookup?tdt_number=TDT-1')
+
+    prop.tdt_number = 'TDT-2'
+    prop.is_registered = True
+    db.session.commit()
+
+    assert client.get('/api/v1/properties/lookup?parcel_id=A').json['is_registered'] is True
+    assert client.get('/api/v1/properties/lookup?tdt_number=TDT-1').status_code == 404
+    assert client.get('/api/v1/properties/lookup?tdt_number=TDT-2').json['parcel_id'] == 'A'
+
+
+def test_misses_are_not_cached(client):
+    assert client.get('/api/v1/properties/lookup?parcel_id=A').status_code == 404
+
+    add_property('A')
+
+    assert client.get('/api/v1/properties/lookup?parcel_id=A').status_code == 200
+
+
+def test_batch_lookup_maps_every_value_and_counts_misses(client):
+    add_property('A', tdt_number='TDT-1')
+    add_property('B')
+
+    response = client.post('/api/v1/properties/lookup/batch',
+                           json={'parcel_ids': ['A', 'B', 'C'], 'tdt_numbers': ['TDT-1']})
+
+    assert response.json['found'] == 3
+    assert response.json['not_found'] == 1
+    assert response.json['parcel_ids']['C'] is None
+    assert response.json['tdt_numbers']['TDT-1']['parcel_id'] == 'A'
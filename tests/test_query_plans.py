@@ -0,0 +1,209 @@
+"""
+Query-plan regression tests for the hot read paths.
+
+Seeds an in-memory SQLite database once per module, requests each hot page
+and API endpoint through the test client, captures every SELECT it issues and
+runs EXPLAIN QUERY PLAN on it. A statement that falls back to a full table
+scan fails its path, so a dropped index or a rewritten query shows up here
+before it shows up at county scale.
+
+A plan step counts as a full scan when it is `SCAN <table>`, with or without
+an index (`USING INDEX` / `USING COVERING INDEX` still reads every entry).
+The one general exception is an unfiltered page: a statement with a LIMIT, no
+WHERE clause and no sort of the whole result (`USE TEMP B-TREE FOR ORDER BY`)
+walks an index in order and stops at the LIMIT. Any filter on a walked index
+can read most of the table before the page fills, so it needs an index that
+matches it, unless the path is listed in DENSE_WALKS. Tiny lookup tables in
+SMALL_TABLES are ignored, and an unfiltered read of a ROLLUP_TABLES table is
+the whole answer.
+"""
+
+import random
+import re
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from app.coverage import get_coverage_report
+from app.models import Building, Dealer, Exemption, Land, Property, PropertyValue, Sale, TDTPayment
+from app.rental_risk import score_properties
+from app.spatial import grid_index
+from app.summary import get_summary
+
+PROPERTIES = 2000
+PAYMENTS_PER_PROPERTY = 3
+
+# Single-row or handful-of-rows tables where a scan is the right plan
+SMALL_TABLES = {'dealers', 'data_versions', 'compliance_summary'}
+
+# Pre-aggregated tables (app.revenue), where a request without filters totals every row
+ROLLUP_TABLES = {'revenue_rollup'}
+
+# Filtered pages allowed to walk a table in ORDER BY order. The filter matches
+# too much of the table for an index on it to beat the walk: a month is about a
+# twelfth of the ledger, so a 50-row page is found within a few hundred rows.
+# The page's count query still has to use an index.
+DENSE_WALKS = {
+    'payments ledger by period': {'tdt_payments'},
+}
+
+HOT_PATHS = [
+    ('dashboard', 'GET', '/', None),
+    ('property list', 'GET', '/properties/', None),
+    ('property list by scenario', 'GET', '/properties/?scenario=2', None),
+    ('property list by address', 'GET', '/properties/?sort=address', None),
+    ('property list by city', 'GET', '/properties/?sort=city', None),
+    ('property list by parcel', 'GET', '/properties/?sort=parcel_id', None),
+    ('property list by tdt number', 'GET', '/properties/?sort=tdt_number', None),
+    ('property search', 'GET', '/properties/?search=Gulf', None),
+    ('property detail page', 'GET', '/properties/{property_id}', None),
+    ('payments ledger', 'GET', '/payments/', None),
+    ('payments ledger by dealer', 'GET', '/payments/?dealer={dealer_id}', None),
+    ('payments ledger by period', 'GET', '/payments/?period=2024-02', None),
+    ('payments ledger by verified', 'GET', '/payments/?verified=yes', None),
+    ('payment form', 'GET', '/payments/add?property_id={property_id}', None),
+    ('api property page', 'GET', '/api/v1/properties?limit=100', None),
+    ('api property page after cursor', 'GET', '/api/v1/properties?after=500&limit=100', None),
+    ('api property', 'GET', '/api/v1/properties/{property_id}', None),
+    ('api property full', 'GET', '/api/v1/properties/{property_id}/full', None),
+    ('api lookup by parcel', 'GET', '/api/v1/properties/lookup?parcel_id={parcel_id}', None),
+    ('api lookup by tdt number', 'GET', '/api/v1/properties/lookup?tdt_number={tdt_number}', None),
+    ('api typeahead', 'GET', '/api/v1/properties/typeahead?q=Gulf', None),
+    ('api typeahead short', 'GET', '/api/v1/properties/typeahead?q=12', None),
+    ('api batch lookup', 'POST', '/api/v1/properties/lookup/batch', {'parcel_ids': '{parcel_ids}'}),
+    ('api map viewport', 'GET', '/api/v1/properties/map?bbox=-82.6,27.2,-82.5,27.3&zoom=16', None),
+    ('api stats', 'GET', '/api/v1/stats', None),
+    ('api dealers', 'GET', '/api/v1/dealers', None),
+    ('api coverage', 'GET', '/api/v1/coverage?year=2024&through=12', None),
+    ('api revenue', 'GET', '/api/v1/revenue', None),
+    ('api revenue by month', 'GET', '/api/v1/revenue?group_by=month&from=2024-01&to=2024-06', None),
+    ('api rental risk', 'GET', '/api/v1/risk?limit=100', None),
+]
+
+SCAN = re.compile(r'^SCAN (\w+)')
+
+
+def seed():
+    random.seed(0)
+
+    dealers = [{'name': f'Dealer {i}', 'dealer_type': 'platform'} for i in range(5)]
+    db.session.execute(db.insert(Dealer), dealers)
+
+    properties, children = [], {Sale: [], Building: [], PropertyValue: [], Exemption: [], Land: []}
+    for i in range(PROPERTIES):
+        parcel_id = f'{i:010d}'
+        registered = random.random() > 0.3
+        properties.append({
+            'parcel_id': parcel_id, 'address': f'{i} Gulf of Mexico Dr', 'city': 'Sarasota',
+            'zip_code': '34236', 'lat': 27.0 + random.random() * 0.6, 'lng': -82.8 + random.random() * 0.6,
+            'tdt_number': f'TDT-2025-{i:06d}' if registered else None, 'is_registered': registered,
+            'compliance_scenario': random.choice([None, 1, 2, 3, 4]),
+        })
+        keys = {'property_id': i + 1, 'parcel_id': parcel_id}
+        for k in range(3):
+            children[Sale].append({**keys, 'sale_date': datetime(2000 + k, 1, 1), 'sale_price': 100000})
+        children[Building].append({**keys, 'year_built': 1990})
+        children[PropertyValue].append({**keys, 'total_value': 250000})
+        children[Exemption].append({**keys, 'exemption_code': 'HX'})
+        children[Land].append({**keys, 'land_type': 'R'})
+    db.session.execute(db.insert(Property), properties)
+    for model, rows in children.items():
+        db.session.execute(db.insert(model), rows)
+
+    payments = []
+    for property_id in range(1, PROPERTIES + 1):
+        for k in range(PAYMENTS_PER_PROPERTY):
+            start = date(2024, 1, 1) + timedelta(days=30 * k)
+            payments.append({
+                'transaction_id': f'T{property_id:08d}{k}', 'property_id': property_id,
+                'dealer_id': random.choice([None, 1, 2, 3]), 'amount': 100.0,
+                'period_start': start, 'period_end': start + timedelta(days=29),
+                'created_at': datetime(2024, 1, 1) + timedelta(minutes=property_id * 3 + k),
+            })
+    db.session.execute(db.insert(TDTPayment), payments)
+    db.session.commit()
+
+
+def full_scans(plan, statement, walks=()):
+    """Return the plan steps that are full table scans. `walks` are the tables
+    this path's pages may walk under a filter (DENSE_WALKS)."""
+    details = [row[-1] for row in plan]
+    sorts_everything = any('USE TEMP B-TREE FOR ORDER BY' in d for d in details)
+    filtered = re.search(r'\bWHERE\b', statement, re.IGNORECASE) is not None
+    page = re.search(r'\bLIMIT\b', statement, re.IGNORECASE) is not None and not sorts_everything
+    offending = []
+    for detail in details:
+        match = SCAN.match(detail)
+        if not match or 'VIRTUAL TABLE' in detail or 'CONSTANT ROW' in detail:
+            continue
+        table = re.sub(r'_\d+$', '', match.group(1))
+        if table in SMALL_TABLES:
+            continue
+        if page and (not filtered or table in walks):
+            continue
+        if table in ROLLUP_TABLES and not filtered:
+            continue
+        offending.append(detail)
+    return offending
+
+
+@pytest.fixture(scope='module')
+def seeded():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        seed()
+        score_properties()
+        db.session.execute(db.text('ANALYZE'))
+        prop = db.session.get(Property, PROPERTIES // 2)
+        registered = Property.query.filter(Property.tdt_number.isnot(None)).first()
+        params = {
+            'property_id': prop.id, 'parcel_id': prop.parcel_id, 'tdt_number': registered.tdt_number,
+            'dealer_id': 1, 'parcel_ids': [f'{i:010d}' for i in range(0, PROPERTIES, 40)],
+        }
+        # Built once per process (map index), once per database (summary) or once per data
+        # version (coverage report), not per request. The map index may hold another test's
+        # database, and a background rebuild would show up as a scan here.
+        grid_index._snapshot = None
+        grid_index.snapshot()
+        get_summary()
+        get_coverage_report(2024, 12)
+        engine = db.engine
+        db.session.remove()
+
+    yield app, engine, params
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.mark.parametrize('label,method,path,body', HOT_PATHS, ids=[path[0] for path in HOT_PATHS])
+def test_hot_path_uses_indexes(seeded, label, method, path, body):
+    app, engine, params = seeded
+    url = path.format(**params)
+    if body is not None:
+        body = {k: params[v.strip('{}')] for k, v in body.items()}
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        response = app.test_client().open(url, method=method, json=body)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    assert response.status_code < 400
+    problems = []
+    with engine.connect() as conn:
+        for statement, parameters in captured:
+            plan = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+            for detail in full_scans(plan, statement, DENSE_WALKS.get(label, ())):
+                problems.append(f'{detail}: {" ".join(statement.split())[:160]}')
+    assert not problems, '\n'.join(problems)
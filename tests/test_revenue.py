@@ -0,0 +1,80 @@
+from datetime import date
+
+from app import db
+from app.models import Dealer, Property, TDTPayment
+from app.revenue import DIMENSIONS, query_revenue, rebuild_revenue
+
+
+def add_property(parcel_id, city='Sarasota', zip_code='34236'):
+    prop = Property(parcel_id=parcel_id, address=f'{parcel_id} MAIN ST', city=city, zip_code=zip_code)
+    db.session.add(prop)
+    db.session.commit()
+    return prop
+
+
+def add_payment(prop, amount, start, dealer=None):
+    payment = TDTPayment(property_id=prop.id, dealer_id=dealer.id if dealer else None, amount=amount,
+                         period_start=start, period_end=start)
+    db.session.add(payment)
+    db.session.commit()
+    return payment
+
+
+def cells():
+    # Cells emptied by moves and deletes stay in the rollup at zero; a rebuild drops them
+    return [tuple(row) for row in query_revenue(DIMENSIONS) if row[-1]]
+
+
+def assert_matches_rebuild():
+    maintained = cells()
+    rebuild_revenue()
+    assert maintained == cells()
+
+
+def test_orm_writes_keep_the_rollup_equal_to_a_rebuild(app):
+    dealer = Dealer(name='Airbnb', dealer_type='platform')
+    db.session.add(dealer)
+    a, b = add_property('A'), add_property('B', city='Venice', zip_code='34285')
+    add_payment(a, 100.0, date(2024, 1, 5), dealer)
+    moved = add_payment(a, 50.0, date(2024, 1, 20))
+    gone = add_payment(b, 25.0, date(2024, 2, 1), dealer)
+    assert_matches_rebuild()
+
+    moved.period_start = date(2024, 3, 1)
+    moved.dealer_id = dealer.id
+    db.session.delete(gone)
+    db.session.commit()
+    assert_matches_rebuild()
+
+    a.city, a.zip_code = 'Venice', '34285'
+    db.session.commit()
+    assert_matches_rebuild()
+
+
+def test_editing_expired_payments_and_properties_moves_the_old_cells(app):
+    prop = add_property('A')
+    payment = add_payment(prop, 100.0, date(2024, 1, 5))
+    db.session.expire(payment)
+    db.session.expire(prop)
+
+    payment.amount = 80.0
+    payment.period_start = date(2024, 2, 5)
+    prop.city = 'Venice'
+    db.session.commit()
+
+    assert cells() == [('Venice', '34236', 0, date(2024, 2, 1), 80.0, 1)]
+    assert_matches_rebuild()
+
+
+def test_revenue_endpoint_groups_and_filters_cells(client):
+    prop = add_property('A')
+    add_payment(prop, 100.0, date(2024, 1, 5))
+    add_payment(prop, 40.0, date(2024, 2, 5))
+    add_payment(prop, 10.0, date(2024, 3, 5))
+
+    response = client.get('/api/v1/revenue?group_by=month&from=2024-02&to=2024-03')
+
+    assert response.json['total'] == 50.0
+    assert [(c['month'], c['amount'], c['payment_count']) for c in response.json['cells']] == [
+        ('2024-02-01', 40.0, 1), ('2024-03-01', 10.0, 1)]
+    assert client.get('/api/v1/revenue?group_by=planet').status_code == 400
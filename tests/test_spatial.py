@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+
+from app import db
+from app.models import Property
+from app.spatial import MAX_POINTS, GridIndex, _cells, grid_index
+
+BBOX = (-82.7, 27.0, -82.2, 27.5)
+
+
+def add_properties(count, seed=7):
+    rng = random.Random(seed)
+    props = [Property(parcel_id=f'P{i}', address=f'{i} MAIN ST', city='Sarasota', zip_code='34236',
+                      lat=rng.uniform(27.0, 27.5), lng=rng.uniform(-82.7, -82.2),
+                      compliance_scenario=rng.randint(1, 4), is_registered=rng.random() < 0.3)
+             for i in range(count)]
+    db.session.add_all(props)
+    db.session.commit()
+    return props
+
+
+def brute_force_clusters(props, zoom):
+    lat = np.array([p.lat for p in props])
+    lng = np.array([p.lng for p in props])
+    cells = {}
+    for key, la, ln in zip(zip(*_cells(lat, lng, zoom)), lat, lng):
+        count, sum_lat, sum_lng = cells.get(key, (0, 0.0, 0.0))
+        cells[key] = (count + 1, sum_lat + la, sum_lng + ln)
+    return sorted((c, round(la / c, 9), round(ln / c, 9)) for c, la, ln in cells.values())
+
+
+def as_sorted(clusters):
+    return sorted((c['count'], round(c['lat'], 9), round(c['lng'], 9)) for c in clusters)
+
+
+def test_precomputed_clusters_match_clustering_the_points(app):
+    props = add_properties(MAX_POINTS * 3)
+    index = GridIndex()
+
+    for zoom in (6, 10, 12):
+        mode, total, clusters = index.query(*BBOX, zoom)
+        assert mode == 'clusters'
+        assert total == len(props)
+        assert as_sorted(clusters) == brute_force_clusters(props, zoom)
+
+
+def test_filtered_clusters_only_count_matching_properties(app):
+    props = add_properties(MAX_POINTS * 3)
+    index = GridIndex()
+
+    for scenario in (1, 2, 3, 4):
+        matching = [p for p in props if p.compliance_scenario == scenario and not p.is_registered]
+        mode, total, result = index.query(*BBOX, 11, scenario=scenario, registered=False)
+        assert total == len(matching)
+        if mode == 'clusters':
+            assert as_sorted(result) == brute_force_clusters(matching, 11)
+        else:
+            assert sorted(result) == sorted(p.id for p in matching)
+
+
+def test_index_goes_stale_when_a_write_commits_not_when_it_flushes(app):
+    grid_index.snapshot()
+    generation = grid_index._generation
+
+    db.session.add(Property(parcel_id='A', address='1 MAIN ST', city='Sarasota', zip_code='34236',
+                            lat=27.3, lng=-82.5))
+    db.session.flush()
+    assert grid_index._generation == generation
+
+    db.session.rollback()
+    db.session.commit()
+    assert grid_index._generation == generation
+
+    add_properties(1)
+    assert grid_index._generation == generation + 1
+    assert not grid_index._is_current()
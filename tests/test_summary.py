@@ -0,0 +1,53 @@
+from app import db
+from app.models import ComplianceSummary, Property, TDTPayment
+from app.summary import SUMMARY_ID, check_drift, get_summary
+
+
+def add_property(parcel_id, **kwargs):
+    prop = Property(parcel_id=parcel_id, address=f'{parcel_id} MAIN ST', city='Sarasota',
+                    zip_code='34236', **kwargs)
+    db.session.add(prop)
+    db.session.commit()
+    return prop
+
+
+def test_orm_writes_keep_the_summary_in_step(app):
+    get_summary()
+    prop = add_property('A', compliance_scenario=1)
+    db.session.add(TDTPayment(property_id=prop.id, amount=125.0,
+                              period_start=prop.created_at.date(), period_end=prop.created_at.date()))
+    db.session.commit()
+
+    summary = get_summary()
+    assert summary['total_properties'] == 1
+    assert summary['scenario_1'] == 1
+    assert summary['total_payments'] == 1
+    assert summary['total_tdt_collected'] == 125.0
+    assert check_drift()[1] == {}
+
+
+def test_editing_a_property_with_expired_attributes_moves_the_counts(app):
+    get_summary()
+    prop = add_property('A', is_registered=False, compliance_scenario=1)
+    db.session.expire(prop)
+
+    prop.is_registered = True
+    prop.compliance_scenario = 3
+    db.session.commit()
+
+    summary = get_summary()
+    assert summary['registered_properties'] == 1
+    assert summary['scenario_1'] == 0
+    assert summary['scenario_3'] == 1
+    assert check_drift()[1] == {}
+
+
+def test_a_missing_summary_row_is_rebuilt_instead_of_dropping_the_delta(app):
+    assert db.session.get(ComplianceSummary, SUMMARY_ID) is None
+
+    add_property('A', is_registered=True)
+    add_property('B', compliance_scenario=2)
+
+    row = db.session.get(ComplianceSummary, SUMMARY_ID)
+    assert row is not None
+    assert (row.total_properties, row.registered_properties, row.scenario_2) == (2, 1, 1)
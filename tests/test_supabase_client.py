@@ -0,0 +1,85 @@
+import os
+import sys
+
+import pytest
+
+# The repo's supabase/ SQL directory imports as an empty namespace package without the client
+if not hasattr(pytest.importorskip('supabase'), 'create_client'):
+    pytest.skip('supabase client not installed', allow_module_level=True)
+pytest.importorskip('dotenv')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from supabase_client import BatchUploader  # noqa: E402
+
+
+class APIError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeTable:
+    def __init__(self, client):
+        self.client = client
+        self.rows = None
+
+    def insert(self, rows):
+        self.rows = rows
+        return self
+
+    def upsert(self, rows, on_conflict):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        self.client.calls += 1
+        for row in self.rows:
+            if self.client.rejects(row):
+                raise APIError('22P02', 'invalid input syntax for type integer')
+        self.client.stored.extend(self.rows)
+
+
+class FakeClient:
+    def __init__(self, rejects):
+        self.rejects = rejects
+        self.calls = 0
+        self.stored = []
+
+    def table(self, name):
+        return FakeTable(self)
+
+
+def upload(client, records, **kwargs):
+    uploader = BatchUploader(client, 't', backoff_seconds=0, **kwargs)
+    return uploader.run(records)
+
+
+def test_one_bad_row_in_a_large_batch_lands_every_other_row(capsys):
+    client = FakeClient(lambda row: row['id'] == 637)
+
+    inserted, errors = upload(client, [{'id': i} for i in range(1000)])
+
+    assert inserted == 999
+    assert sorted(row['id'] for row in client.stored) == [i for i in range(1000) if i != 637]
+    assert errors == ['Error inserting record 637 into t: invalid input syntax for type integer']
+
+
+def test_error_every_row_shares_fails_the_batch_without_bisecting_to_rows(capsys):
+    client = FakeClient(lambda row: True)
+
+    inserted, errors = upload(client, [{'id': i} for i in range(1000)])
+
+    assert inserted == 0
+    assert client.calls == 3
+    assert len(errors) == 2
+
+
+def test_inserted_counts_rows_sent_after_dedupe(capsys):
+    client = FakeClient(lambda row: False)
+    records = [{'id': i % 10, 'n': i} for i in range(30)]
+
+    inserted, errors = upload(client, records, batch_size=30, on_conflict='id')
+
+    assert inserted == 10
+    assert {row['id']: row['n'] for row in client.stored} == {i: 20 + i for i in range(10)}